@@ -12,4 +12,17 @@ app.config_from_object("django.conf:settings", namespace="CELERY")
 app.autodiscover_tasks()
 
 # Schedule Tasks
-app.conf.beat_schedule = {}
+app.conf.beat_schedule = {
+    "compact_service_status": {
+        "task": "apps.cel.tasks.monitor.compact_service_status",
+        "schedule": crontab(minute="*"),
+    },
+    "rotate_status_partitions": {
+        "task": "apps.cel.tasks.monitor.rotate_status_partitions",
+        "schedule": crontab(minute=0),
+    },
+    "archive_service_status": {
+        "task": "apps.cel.tasks.monitor.archive_service_status",
+        "schedule": crontab(minute=30),
+    },
+}
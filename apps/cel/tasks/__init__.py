@@ -1,7 +1,13 @@
 from apps.cel.tasks.debug import celery_debug
-from apps.cel.tasks.monitor import run_monitor
+from apps.cel.tasks.monitor import (
+    compact_service_status,
+    run_monitor,
+    run_monitor_batch,
+)
 
 __all__ = [
     "celery_debug",
+    "compact_service_status",
     "run_monitor",
+    "run_monitor_batch",
 ]
@@ -1,7 +1,16 @@
+from typing import List
+
+from ovinc_client.core.lock import task_lock
 from ovinc_client.core.logger import celery_logger
 
 from apps.cel import app
+from apps.monitor.archives import StatusArchiver
+from apps.monitor.engine import ProbeEngine
+from apps.monitor.lease import DispatchLease
 from apps.monitor.models import MonitorConfig
+from apps.monitor.partitions import StatusPartitionManager
+from apps.monitor.rollups import StatusRollupCompactor
+from apps.service.models import Service
 
 
 @app.task(bind=True)
@@ -11,5 +20,48 @@ def run_monitor(self, monitor_config_id: str):
     if not monitor_config:
         celery_logger.error("monitor config with id %s not found", monitor_config_id)
         return
+    # the lease is released with the result, never run beside a dispatched check
+    if not DispatchLease(monitor_config.id, monitor_config.check_timeout, monitor_config.check_retry).acquire(
+        queued=False
+    ):
+        celery_logger.info("[CheckServiceStatus] Leased %s %s", self.request.id, monitor_config_id)
+        return
     monitor_config.run()
     celery_logger.info("[CheckServiceStatus] End %s %s", self.request.id, monitor_config_id)
+
+
+@app.task(bind=True)
+def run_monitor_batch(self, monitor_configs: List[dict]):
+    celery_logger.info("[CheckServiceStatusBatch] Start %s %d", self.request.id, len(monitor_configs))
+    monitor_configs = [MonitorConfig.from_snapshot(snapshot) for snapshot in monitor_configs]
+    for monitor_config in monitor_configs:
+        DispatchLease(monitor_config.id, monitor_config.check_timeout, monitor_config.check_retry).renew()
+    ProbeEngine().run(monitor_configs)
+    celery_logger.info("[CheckServiceStatusBatch] End %s %d", self.request.id, len(monitor_configs))
+
+
+@app.task(bind=True)
+@task_lock()
+def compact_service_status(self):
+    celery_logger.info("[CompactServiceStatus] Start %s", self.request.id)
+    compactor = StatusRollupCompactor()
+    compactor.run()
+    compactor.purge()
+    compactor.purge_runs()
+    celery_logger.info("[CompactServiceStatus] End %s", self.request.id)
+
+
+@app.task(bind=True)
+@task_lock()
+def rotate_status_partitions(self):
+    celery_logger.info("[RotateStatusPartitions] Start %s", self.request.id)
+    StatusPartitionManager().rotate()
+    celery_logger.info("[RotateStatusPartitions] End %s", self.request.id)
+
+
+@app.task(bind=True)
+@task_lock()
+def archive_service_status(self):
+    celery_logger.info("[ArchiveServiceStatus] Start %s", self.request.id)
+    StatusArchiver().run(Service.objects.values_list("id", flat=True))
+    celery_logger.info("[ArchiveServiceStatus] End %s", self.request.id)
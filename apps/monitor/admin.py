@@ -1,12 +1,61 @@
 from django.contrib import admin
 
-from apps.monitor.models import MonitorConfig, ServiceStatus
+from apps.monitor.models import (
+    Incident,
+    InternedValue,
+    MonitorConfig,
+    ServiceLatestStatus,
+    ServiceStatus,
+    ServiceStatusExtra,
+    ServiceStatusRun,
+    StatusArchive,
+)
 from common.admin import NicknameMixinAdmin
 
 
 @admin.register(ServiceStatus)
 class ServiceStatusAdmin(admin.ModelAdmin):
-    list_display = ["id", "service", "duration", "status", "status_msg", "datetime"]
+    list_display = ["id", "service", "duration", "status", "status_msg", "timestamp"]
+    list_select_related = ["status_msg_ref"]
+    list_filter = ["service"]
+    ordering = ["-id"]
+
+
+@admin.register(ServiceStatusExtra)
+class ServiceStatusExtraAdmin(admin.ModelAdmin):
+    list_display = ["id", "service", "timestamp"]
+    list_filter = ["service"]
+    ordering = ["-id"]
+
+
+@admin.register(InternedValue)
+class InternedValueAdmin(admin.ModelAdmin):
+    list_display = ["id", "digest", "value"]
+    search_fields = ["digest"]
+
+
+@admin.register(ServiceStatusRun)
+class ServiceStatusRunAdmin(admin.ModelAdmin):
+    list_display = ["id", "service", "status", "start_time", "end_time", "sample_count"]
+    list_filter = ["service"]
+    ordering = ["-id"]
+
+
+@admin.register(StatusArchive)
+class StatusArchiveAdmin(admin.ModelAdmin):
+    list_display = ["id", "service", "day", "path", "point_count", "updated_at"]
+    list_filter = ["service"]
+    ordering = ["-id"]
+
+
+@admin.register(ServiceLatestStatus)
+class ServiceLatestStatusAdmin(admin.ModelAdmin):
+    list_display = ["service", "duration", "status", "status_msg", "timestamp", "failure_count"]
+
+
+@admin.register(Incident)
+class IncidentAdmin(admin.ModelAdmin):
+    list_display = ["id", "service", "status", "started_at", "ended_at", "failure_count"]
     list_filter = ["service"]
 
 
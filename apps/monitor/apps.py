@@ -6,3 +6,7 @@ class MonitorConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.monitor"
     verbose_name = gettext_lazy("Monitor Module")
+
+    def ready(self):
+        # pylint: disable=C0415,W0611
+        from apps.monitor import signals  # noqa: F401
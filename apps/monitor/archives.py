@@ -0,0 +1,153 @@
+import datetime
+import gzip
+import json
+from typing import Dict, List
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import Storage, storages
+from django.db.models import QuerySet
+from django.utils import timezone
+from ovinc_client.core.logger import logger
+
+from apps.monitor.models import (
+    InternedValue,
+    ServiceStatus,
+    StatusArchive,
+    StatusRollupWatermark,
+)
+from apps.monitor.rollups import DAY_SECONDS, StatusRollupCompactor
+
+
+class StatusArchiveStore:
+    """
+    status points of one service day as gzipped parallel json arrays
+    """
+
+    columns = [
+        "id",
+        "timestamp",
+        "status",
+        "status_msg",
+        "duration_us",
+        "connect_time",
+        "tls_time",
+        "ttfb_time",
+        "body_time",
+    ]
+
+    def __init__(self, storage: Storage = None) -> None:
+        self.storage = storage or storages["status_archive"]
+
+    def path(self, service_id: str, day: int) -> str:
+        return f"{service_id}/{datetime.datetime.fromtimestamp(day, tz=datetime.timezone.utc):%Y-%m-%d}.json.gz"
+
+    def write(self, path: str, points: List[dict]) -> str:
+        data = {column: [point[column] for point in points] for column in self.columns}
+        content = gzip.compress(json.dumps(data, ensure_ascii=False).encode())
+        # storages rename on conflict, a rewritten day replaces its file
+        if self.storage.exists(path):
+            self.storage.delete(path)
+        return self.storage.save(path, ContentFile(content))
+
+    def read(self, path: str) -> List[dict]:
+        with self.storage.open(path, "rb") as file, gzip.GzipFile(fileobj=file) as archive:
+            data = json.load(archive)
+        # files written before a column existed read it as null
+        size = len(data["timestamp"])
+        return [
+            dict(zip(self.columns, values))
+            for values in zip(*(data.get(column) or [None] * size for column in self.columns))
+        ]
+
+
+class StatusArchiver:
+    """
+    move compacted status points older than cutoff into day files, then delete them in chunks
+    """
+
+    def __init__(self, before_days: int = None, store: StatusArchiveStore = None) -> None:
+        self.before_days = settings.SVC_STATUS_ARCHIVE_AFTER_DAYS if before_days is None else before_days
+        self.store = store or StatusArchiveStore()
+
+    def run(self, service_ids: List[str]) -> int:
+        if not self.before_days:
+            return 0
+        watermark = StatusRollupWatermark.objects.filter(name=StatusRollupCompactor.watermark_name).first()
+        if not watermark:
+            return 0
+        now = int(timezone.now().timestamp())
+        cutoff = now - now % DAY_SECONDS - self.before_days * DAY_SECONDS
+        total = 0
+        for service_id in service_ids:
+            # rollups keep the aggregates, only compacted points leave the table
+            points = ServiceStatus.objects.filter(
+                service_id=service_id, timestamp__lt=cutoff, id__lte=watermark.last_id
+            )
+            while True:
+                first = points.order_by("timestamp").values_list("timestamp", flat=True).first()
+                if first is None:
+                    break
+                day = first - first % DAY_SECONDS
+                total += self.archive_day(service_id, day, points.filter(timestamp__lt=day + DAY_SECONDS))
+        logger.info("[StatusArchiver] Archived %s", total)
+        return total
+
+    def archive_day(self, service_id: str, day: int, points: QuerySet) -> int:
+        """
+        points left by an interrupted run are merged into the existing file
+        """
+
+        rows = list(
+            points.order_by("timestamp", "id").values(
+                "status_msg_ref__value", *[column for column in self.store.columns if column != "status_msg"]
+            )
+        )
+        for row in rows:
+            row["status_msg"] = row.pop("status_msg_ref__value") or ""
+        # keyed by id, checks within the same second are all kept
+        archive = StatusArchive.objects.filter(service_id=service_id, day=day).first()
+        merged = self.store.read(archive.path) if archive else []
+        archived_ids = {point["id"] for point in merged}
+        merged.extend(row for row in rows if row["id"] not in archived_ids)
+        merged.sort(key=lambda point: (point["timestamp"], point["id"] or 0))
+        path = self.store.write(self.store.path(service_id, day), merged)
+        StatusArchive.objects.update_or_create(
+            service_id=service_id, day=day, defaults={"path": path, "point_count": len(merged)}
+        )
+
+        # delete only after the file is in place, extras are not archived
+        points = [(row["id"], service_id, row["timestamp"]) for row in rows]
+        for index in range(0, len(points), settings.SVC_STATUS_PURGE_CHUNK_SIZE):
+            StatusRollupCompactor.delete_points(points[index : index + settings.SVC_STATUS_PURGE_CHUNK_SIZE])
+        logger.info("[StatusArchiver] %s %s Archived %s", service_id, path, len(rows))
+        return len(rows)
+
+
+class StatusArchiveQuery:
+    """
+    read archived status points of service within range
+    """
+
+    def __init__(self, service_id: str, start_time: int, end_time: int, store: StatusArchiveStore = None) -> None:
+        self.service_id = service_id
+        self.start_time = start_time
+        self.end_time = end_time
+        self.store = store or StatusArchiveStore()
+
+    def load_points(self, with_status_msg: bool) -> List[ServiceStatus]:
+        archives = StatusArchive.objects.filter(
+            service_id=self.service_id, day__gt=self.start_time - DAY_SECONDS, day__lte=self.end_time
+        ).order_by("day")
+        points = []
+        messages: Dict[str, InternedValue] = {}
+        for archive in archives:
+            for point in self.store.read(archive.path):
+                if not self.start_time <= point["timestamp"] <= self.end_time:
+                    continue
+                status_msg = point.pop("status_msg")
+                status = ServiceStatus(service_id=self.service_id, **point)
+                if with_status_msg and status_msg:
+                    status.status_msg_ref = messages.setdefault(status_msg, InternedValue(value=status_msg))
+                points.append(status)
+        return points
@@ -29,6 +29,65 @@ class OnlineStatus(IntegerChoices):
     UNKNOWN = 3, gettext_lazy("Unknown")
 
 
+class RollupResolution(IntegerChoices):
+    """
+    bucket size of status rollup in seconds
+    """
+
+    MINUTE = 60, gettext_lazy("1 Minute")
+    FIVE_MINUTES = 60 * 5, gettext_lazy("5 Minutes")
+    HOUR = 60 * 60, gettext_lazy("1 Hour")
+    DAY = 60 * 60 * 24, gettext_lazy("1 Day")
+
+
+class SLAWindow(IntegerChoices):
+    """
+    sla window in seconds
+    """
+
+    DAY = 60 * 60 * 24, gettext_lazy("24 Hours")
+    WEEK = 60 * 60 * 24 * 7, gettext_lazy("7 Days")
+    MONTH = 60 * 60 * 24 * 30, gettext_lazy("30 Days")
+    QUARTER = 60 * 60 * 24 * 90, gettext_lazy("90 Days")
+
+
+class PartitionPeriod(IntegerChoices):
+    """
+    range of service status partition
+    """
+
+    DAY = 60 * 60 * 24, gettext_lazy("1 Day")
+    WEEK = 60 * 60 * 24 * 7, gettext_lazy("1 Week")
+
+
+class StatusLayout(TextChoices):
+    """
+    layout of status points response
+    """
+
+    ROWS = "rows", gettext_lazy("Rows")
+    COLUMNAR = "columnar", gettext_lazy("Columnar")
+    RUNS = "runs", gettext_lazy("Runs")
+
+
+class StatusStorageMode(TextChoices):
+    """
+    how status points of service are kept
+    """
+
+    RAW = "raw", gettext_lazy("Raw Points")
+    RUN_LENGTH = "run_length", gettext_lazy("Run Length")
+
+
+class StatusSubscribeAction(TextChoices):
+    """
+    websocket subscription action
+    """
+
+    SUBSCRIBE = "subscribe", gettext_lazy("Subscribe")
+    UNSUBSCRIBE = "unsubscribe", gettext_lazy("Unsubscribe")
+
+
 class HTTPMethod(TextChoices):
     """
     http method
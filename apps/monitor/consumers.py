@@ -0,0 +1,72 @@
+from types import SimpleNamespace
+from typing import List, Set
+
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from django.conf import settings
+
+from apps.monitor.constants import StatusSubscribeAction
+from apps.monitor.serializers import SubscribeServiceStatusSerializer
+from apps.service.models import Service
+from apps.service.permissions import PublicServicePermission
+
+
+def status_group_name(service_id: str) -> str:
+    return f"service-status-{service_id}"
+
+
+class ServiceStatusConsumer(AsyncJsonWebsocketConsumer):
+    """
+    push new service status to subscribed clients
+    """
+
+    async def connect(self) -> None:
+        self.service_ids: Set[str] = set()
+        await self.accept()
+
+    async def disconnect(self, code) -> None:
+        for service_id in self.service_ids:
+            await self.channel_layer.group_discard(status_group_name(service_id), self.channel_name)
+        self.service_ids = set()
+
+    async def receive_json(self, content, **kwargs) -> None:
+        request_serializer = SubscribeServiceStatusSerializer(data=content)
+        if not request_serializer.is_valid():
+            await self.send_json({"type": "error", "errors": request_serializer.errors})
+            return
+        request_data = request_serializer.validated_data
+
+        # unsubscribe
+        if request_data["action"] == StatusSubscribeAction.UNSUBSCRIBE:
+            for service_id in set(request_data["service_ids"]) & self.service_ids:
+                await self.channel_layer.group_discard(status_group_name(service_id), self.channel_name)
+                self.service_ids.discard(service_id)
+            await self.send_json({"type": "subscription", "service_ids": sorted(self.service_ids)})
+            return
+
+        # subscribe to readable services only
+        service_ids = await database_sync_to_async(self.load_readable_service_ids)(request_data["service_ids"])
+        service_ids = service_ids[: max(settings.MONITOR_STATUS_PUSH_MAX_SUBSCRIPTIONS - len(self.service_ids), 0)]
+        for service_id in service_ids:
+            await self.channel_layer.group_add(status_group_name(service_id), self.channel_name)
+            self.service_ids.add(service_id)
+        await self.send_json({"type": "subscription", "service_ids": sorted(self.service_ids)})
+
+    def load_readable_service_ids(self, service_ids: List[str]) -> List[str]:
+        """
+        apply the same rules as service status viewset
+        """
+
+        request = SimpleNamespace(user=self.scope["user"])
+        permission = PublicServicePermission()
+        return [
+            service.id
+            for service in Service.objects.filter(id__in=service_ids).exclude(id__in=self.service_ids)
+            if permission.has_object_permission(request, self, service)
+        ]
+
+    async def service_status(self, event: dict) -> None:
+        data = dict(event["data"])
+        if not self.scope["user"].is_superuser:
+            data["status_msg"] = ""
+        await self.send_json({"type": "status", "data": data})
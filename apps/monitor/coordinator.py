@@ -0,0 +1,129 @@
+import os
+import socket
+import uuid
+import zlib
+from typing import List, Set
+
+from django.conf import settings
+from django_redis import get_redis_connection
+from ovinc_client.core.logger import logger
+from redis import Redis
+from redis.exceptions import WatchError
+
+
+class SchedulerCoordinator:
+    """
+    split config ids into shards among live scheduler replicas, shards are held by redis leases
+    """
+
+    members_key = "monitor-scheduler:members"
+    shard_key_prefix = "monitor-scheduler:shard"
+
+    def __init__(self, client: Redis = None, member_id: str = None, shard_count: int = None) -> None:
+        self.client = client or get_redis_connection("default")
+        self.member_id = member_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.shard_count = shard_count or settings.MONITOR_SCHEDULER_SHARDS
+        self.ttl = settings.MONITOR_SCHEDULER_MEMBER_TTL
+        self.owned: Set[int] = set()
+
+    def shard_key(self, shard: int) -> str:
+        return f"{self.shard_key_prefix}:{shard}"
+
+    def shard(self, config_id: str) -> int:
+        return zlib.crc32(config_id.encode()) % self.shard_count
+
+    def owns(self, config_id: str) -> bool:
+        return self.shard(config_id) in self.owned
+
+    def heartbeat(self, now: float) -> bool:
+        """
+        refresh membership and shard leases, return True when owned shards changed
+        """
+
+        members = self.load_members(now)
+        # every replica derives the same assignment from the sorted member list
+        desired = {shard for shard in range(self.shard_count) if members[shard % len(members)] == self.member_id}
+        # give up shards first so the new owner can take them on its next heartbeat
+        for shard in self.owned - desired:
+            self.release(shard)
+        owned = {shard for shard in desired if self.acquire(shard)}
+        changed = owned != self.owned
+        if changed:
+            logger.info("[SchedulerCoordinator] %s Members %s Shards %s", self.member_id, len(members), sorted(owned))
+        self.owned = owned
+        return changed
+
+    def load_members(self, now: float) -> List[str]:
+        pipeline = self.client.pipeline(transaction=False)
+        pipeline.zadd(self.members_key, {self.member_id: now})
+        pipeline.zremrangebyscore(self.members_key, "-inf", now - self.ttl)
+        pipeline.zrange(self.members_key, 0, -1)
+        *_, members = pipeline.execute()
+        return sorted(member.decode() if isinstance(member, bytes) else member for member in members)
+
+    def acquire(self, shard: int) -> bool:
+        """
+        take a free shard or extend the lease held by this replica
+        """
+
+        if self.client.set(self.shard_key(shard), self.member_id, nx=True, ex=self.ttl):
+            return True
+        return self.compare_and_apply(shard, lambda pipeline, key: pipeline.expire(key, self.ttl))
+
+    def release(self, shard: int) -> bool:
+        return self.compare_and_apply(shard, lambda pipeline, key: pipeline.delete(key))
+
+    def compare_and_apply(self, shard: int, command: callable) -> bool:
+        """
+        run command on shard lease only when this replica holds it
+        """
+
+        key = self.shard_key(shard)
+        with self.client.pipeline() as pipeline:
+            try:
+                pipeline.watch(key)
+                holder = pipeline.get(key)
+                if (holder.decode() if isinstance(holder, bytes) else holder) != self.member_id:
+                    pipeline.unwatch()
+                    return False
+                pipeline.multi()
+                command(pipeline, key)
+                pipeline.execute()
+                return True
+            except WatchError:
+                return False
+
+    def leave(self) -> None:
+        """
+        release shards and membership so other replicas take over without waiting for ttl
+        """
+
+        for shard in self.owned:
+            self.release(shard)
+        self.owned = set()
+        self.client.zrem(self.members_key, self.member_id)
+
+
+class ConfigDeleteFeed:
+    """
+    ids of deleted monitor configs, incremental sync cannot see deleted rows
+    """
+
+    key = "monitor-scheduler:deleted"
+
+    def __init__(self, client: Redis = None) -> None:
+        self.client = client or get_redis_connection("default")
+        # anything older has been seen by a full sync
+        self.retention = settings.MONITOR_SCHEDULER_FULL_SYNC_INTERVAL * 2
+
+    def publish(self, config_ids: List[str], now: float) -> None:
+        pipeline = self.client.pipeline(transaction=False)
+        pipeline.zadd(self.key, {config_id: now for config_id in config_ids})
+        pipeline.zremrangebyscore(self.key, "-inf", now - self.retention)
+        pipeline.execute()
+
+    def load(self, since: float) -> List[str]:
+        return [
+            config_id.decode() if isinstance(config_id, bytes) else config_id
+            for config_id in self.client.zrangebyscore(self.key, since, "+inf")
+        ]
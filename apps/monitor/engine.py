@@ -0,0 +1,66 @@
+import asyncio
+import traceback
+from typing import List
+
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.utils import timezone
+from ovinc_client.core.logger import logger
+
+from apps.monitor.constants import CheckType, OnlineStatus
+from apps.monitor.models import MonitorConfig
+from apps.monitor.results import CheckResult, submit_results
+
+
+class ProbeEngine:
+    """
+    run checks concurrently on a process-wide event loop
+    """
+
+    _loop: asyncio.AbstractEventLoop = None
+
+    def __init__(self, concurrency: int = None) -> None:
+        self.concurrency = concurrency or settings.MONITOR_PROBE_CONCURRENCY
+
+    @classmethod
+    def get_loop(cls) -> asyncio.AbstractEventLoop:
+        if cls._loop is None or cls._loop.is_closed():
+            cls._loop = asyncio.new_event_loop()
+        return cls._loop
+
+    def run(self, monitor_configs: List[MonitorConfig]) -> None:
+        self.get_loop().run_until_complete(self.arun(monitor_configs))
+
+    async def arun(self, monitor_configs: List[MonitorConfig]) -> None:
+        """
+        submit results as probes finish, a slow probe never holds back the results and leases of fast ones
+        """
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        pending = {asyncio.ensure_future(self.probe(semaphore, monitor_config)) for monitor_config in monitor_configs}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            await database_sync_to_async(submit_results)([task.result() for task in done])
+
+    async def probe(self, semaphore: asyncio.Semaphore, monitor_config: MonitorConfig) -> CheckResult:
+        async with semaphore:
+            try:
+                handler = CheckType.get_handler(monitor_config.check_type)
+                return await handler(monitor_config=monitor_config).aprobe()
+            except Exception as err:  # pylint: disable=W0718
+                logger.exception("[ProbeEngine] Failed %s", monitor_config.id)
+                return self.to_error_result(monitor_config, err)
+
+    def to_error_result(self, monitor_config: MonitorConfig, err: Exception) -> CheckResult:
+        """
+        a crashed handler is recorded as a failed check, so the lease is released and the schedule moves on
+        """
+
+        return CheckResult(
+            monitor_config_id=monitor_config.id,
+            service_id=monitor_config.service_id,
+            timestamp=int(timezone.now().timestamp()),
+            status=OnlineStatus.UNKNOWN,
+            status_msg=str(err),
+            extra={"traceback": traceback.format_exc()},
+        )
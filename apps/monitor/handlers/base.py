@@ -1,12 +1,19 @@
 import abc
+import asyncio
+import random
+import time
 import traceback
 from dataclasses import asdict
 
-from django.db import transaction
+from asgiref.sync import sync_to_async
+from channels.db import database_sync_to_async
+from django.conf import settings
 from django.utils import timezone
 
 from apps.monitor.constants import OnlineStatus
-from apps.monitor.models import MonitorConfig, ServiceStatus, StatusExtra
+from apps.monitor.lease import DispatchLease
+from apps.monitor.models import MonitorConfig, StatusExtra, StatusTimings
+from apps.monitor.results import CheckResult, submit_results
 
 
 class BaseHandler:
@@ -16,37 +23,126 @@ class BaseHandler:
 
     def __init__(self, monitor_config: MonitorConfig) -> None:
         self.monitor_config = monitor_config
+        self.attempts = []
+        self.reset()
+
+    # pylint: disable=W0201
+    def reset(self) -> None:
+        """
+        clear state of the previous attempt
+        """
+
         self.status = OnlineStatus.UNKNOWN
         self.status_msg = ""
         self.duration = None
         self.extra = StatusExtra()
+        self.timings = StatusTimings()
 
     def run(self) -> None:
-        try:
-            self.check()
-        except Exception as e:  # pylint: disable=W0718
-            self.status = OnlineStatus.UNKNOWN
-            self.status_msg = str(e)
-            self.extra.traceback = traceback.format_exc()
-        finally:
-            self.save_db()
+        submit_results([self.probe()])
+
+    async def arun(self) -> None:
+        result = await self.aprobe()
+        await database_sync_to_async(submit_results)([result])
+
+    def probe(self) -> CheckResult:
+        deadline = time.monotonic() + self.retry_budget
+        for attempt in range(self.monitor_config.check_retry + 1):
+            self.reset()
+            start_time = time.monotonic()
+            try:
+                self.check()
+            except Exception as e:  # pylint: disable=W0718
+                self.handle_exception(e)
+            self.record_attempt(start_time)
+            backoff = self.retry_backoff(attempt)
+            if not self.should_retry(attempt, deadline - time.monotonic() - backoff):
+                break
+            time.sleep(backoff)
+        return self.to_result()
+
+    async def aprobe(self) -> CheckResult:
+        deadline = time.monotonic() + self.retry_budget
+        for attempt in range(self.monitor_config.check_retry + 1):
+            self.reset()
+            start_time = time.monotonic()
+            try:
+                await self.acheck()
+            except Exception as e:  # pylint: disable=W0718
+                self.handle_exception(e)
+            self.record_attempt(start_time)
+            backoff = self.retry_backoff(attempt)
+            if not self.should_retry(attempt, deadline - time.monotonic() - backoff):
+                break
+            await asyncio.sleep(backoff)
+        return self.to_result()
+
+    @property
+    def retry_budget(self) -> float:
+        """
+        all attempts and backoff fit in the dispatch lease
+        """
+
+        return DispatchLease(
+            self.monitor_config.id, self.monitor_config.check_timeout, self.monitor_config.check_retry
+        ).retry_budget
+
+    def retry_backoff(self, attempt: int) -> float:
+        """
+        exponential backoff with jitter, spreads retries of services failing together
+        """
+
+        backoff = min(settings.MONITOR_CHECK_RETRY_BACKOFF * 2**attempt, settings.MONITOR_CHECK_RETRY_MAX_BACKOFF)
+        return random.uniform(backoff / 2, backoff)
+
+    def should_retry(self, attempt: int, remaining: float) -> bool:
+        """
+        retry failed attempts while another full attempt fits in the budget
+        """
+
+        return (
+            self.status != OnlineStatus.ONLINE
+            and attempt < self.monitor_config.check_retry
+            and remaining >= self.monitor_config.check_timeout
+        )
+
+    def record_attempt(self, start_time: float) -> None:
+        self.attempts.append(
+            {
+                "status": int(self.status),
+                "status_msg": self.status_msg,
+                "elapsed": round((time.monotonic() - start_time) * 1000, 3),
+                **asdict(self.timings),
+            }
+        )
 
     @abc.abstractmethod
     def check(self) -> None:
         raise NotImplementedError()
 
-    @transaction.atomic()
-    def save_db(self) -> None:
-        now = timezone.now()
-        ServiceStatus.objects.create(
-            service=self.monitor_config.service,
-            timestamp=int(now.timestamp()),
-            datetime=now,
+    async def acheck(self) -> None:
+        """
+        async check, handlers without native async support run check in a thread
+        """
+
+        await sync_to_async(self.check, thread_sensitive=False)()
+
+    def handle_exception(self, err: Exception) -> None:
+        self.status = OnlineStatus.UNKNOWN
+        self.status_msg = str(err)
+        self.extra.traceback = traceback.format_exc()
+
+    def to_result(self) -> CheckResult:
+        # a single attempt is already described by the result itself
+        if len(self.attempts) > 1:
+            self.extra.attempts = self.attempts
+        return CheckResult(
+            monitor_config_id=self.monitor_config.id,
+            service_id=self.monitor_config.service_id,
+            timestamp=int(timezone.now().timestamp()),
             status=self.status,
             status_msg=self.status_msg,
             duration=self.duration,
-            extra=asdict(self.extra),
+            extra=None if self.extra.is_empty else asdict(self.extra),
+            timings=asdict(self.timings),
         )
-        self.monitor_config.refresh_from_db()
-        self.monitor_config.last_check_time = max(self.monitor_config.last_check_time, int(now.timestamp()))
-        self.monitor_config.save(update_fields=["last_check_time"])
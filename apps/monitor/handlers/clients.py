@@ -0,0 +1,63 @@
+import asyncio
+import threading
+import weakref
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import Dict, Tuple
+
+import httpx
+from django.conf import settings
+
+
+class RejectCookiePolicy(DefaultCookiePolicy):
+    """
+    never store cookies, a pooled client is shared by many monitors
+    """
+
+    def set_ok(self, cookie, request) -> bool:
+        return False
+
+
+class HTTPClientPool:
+    """
+    process-wide http clients keyed by transport options, connections are kept alive across checks
+    """
+
+    _clients: Dict[Tuple[bool, bool], httpx.Client] = {}
+    # clients of each loop go away with it, a collected loop never hands out its clients
+    _async_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+    _lock = threading.Lock()
+
+    @classmethod
+    def limits(cls) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=settings.MONITOR_HTTP_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.MONITOR_HTTP_POOL_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.MONITOR_HTTP_POOL_KEEPALIVE_EXPIRY,
+        )
+
+    @classmethod
+    def client_kwargs(cls, verify: bool, http2: bool) -> dict:
+        # set-cookie of one target is never sent on later checks of any monitor
+        return {
+            "verify": verify,
+            "http2": http2,
+            "limits": cls.limits(),
+            "cookies": CookieJar(policy=RejectCookiePolicy()),
+        }
+
+    @classmethod
+    def get_client(cls, verify: bool = True, http2: bool = False) -> httpx.Client:
+        key = (verify, http2)
+        with cls._lock:
+            if key not in cls._clients:
+                cls._clients[key] = httpx.Client(**cls.client_kwargs(verify, http2))
+            return cls._clients[key]
+
+    @classmethod
+    def get_async_client(cls, verify: bool = True, http2: bool = False) -> httpx.AsyncClient:
+        # async connections are bound to the running loop
+        clients = cls._async_clients.setdefault(asyncio.get_running_loop(), {})
+        key = (verify, http2)
+        if key not in clients:
+            clients[key] = httpx.AsyncClient(**cls.client_kwargs(verify, http2))
+        return clients[key]
@@ -1,12 +1,44 @@
+import contextlib
 import time
 import traceback
+from typing import AsyncIterator, Dict, Iterator, Union
 
 import httpx
 from django.utils.translation import gettext
 
 from apps.monitor.constants import OnlineStatus
 from apps.monitor.handlers.base import BaseHandler
-from apps.monitor.models import MonitorConfig
+from apps.monitor.handlers.clients import HTTPClientPool
+from apps.monitor.models import StatusTimings
+
+
+class PhaseTimer:
+    """
+    monotonic phase marks collected from httpcore trace events, the last redirect hop wins
+    """
+
+    def __init__(self) -> None:
+        self.marks: Dict[str, int] = {}
+
+    def trace(self, event_name: str, info: dict) -> None:
+        # event name like "http11.send_request_headers.started"
+        self.marks[event_name.split(".", 1)[-1]] = time.perf_counter_ns()
+
+    async def atrace(self, event_name: str, info: dict) -> None:
+        self.trace(event_name, info)
+
+    def span(self, start: str, end: str) -> Union[int, None]:
+        if start not in self.marks or end not in self.marks:
+            return None
+        return (self.marks[end] - self.marks[start]) // 1000
+
+    def to_timings(self) -> StatusTimings:
+        return StatusTimings(
+            connect_time=self.span("connect_tcp.started", "connect_tcp.complete"),
+            tls_time=self.span("start_tls.started", "start_tls.complete"),
+            ttfb_time=self.span("send_request_headers.started", "receive_response_headers.complete"),
+            body_time=self.span("receive_response_body.started", "receive_response_body.complete"),
+        )
 
 
 class HTTPHandler(BaseHandler):
@@ -14,28 +46,83 @@ class HTTPHandler(BaseHandler):
     check url match given status code
     """
 
-    def __init__(self, monitor_config: MonitorConfig):
-        super().__init__(monitor_config)
+    # pylint: disable=W0201
+    def reset(self) -> None:
+        super().reset()
         self.start_time = None
         self.end_time = None
+        self.timer = PhaseTimer()
+
+    def request_kwargs(self, trace: callable) -> dict:
+        return {
+            "method": self.monitor_config.http_method,
+            "url": self.monitor_config.http_url,
+            "headers": self.monitor_config.http_headers,
+            "timeout": self.monitor_config.check_timeout,
+            "follow_redirects": self.monitor_config.http_follow_redirect,
+            "extensions": {"trace": trace},
+        }
+
+    @property
+    def transport_kwargs(self) -> dict:
+        return {"verify": self.monitor_config.http_verify_tls, "http2": self.monitor_config.http_use_http2}
+
+    @contextlib.contextmanager
+    def client(self) -> Iterator[httpx.Client]:
+        """
+        pooled client for warm connection, or a fresh one measuring the full handshake
+        """
+
+        if self.monitor_config.http_warm_connection:
+            yield HTTPClientPool.get_client(**self.transport_kwargs)
+            return
+        with httpx.Client(**self.transport_kwargs) as client:
+            yield client
+
+    @contextlib.asynccontextmanager
+    async def async_client(self) -> AsyncIterator[httpx.AsyncClient]:
+        if self.monitor_config.http_warm_connection:
+            yield HTTPClientPool.get_async_client(**self.transport_kwargs)
+            return
+        async with httpx.AsyncClient(**self.transport_kwargs) as client:
+            yield client
 
     def check(self) -> None:
         # request url
-        with httpx.Client(event_hooks={"request": [self.log_request], "response": [self.log_response]}) as client:
-            try:
-                response: httpx.Response = client.request(
-                    method=self.monitor_config.http_method,
-                    url=self.monitor_config.http_url,
-                    headers=self.monitor_config.http_headers,
-                    timeout=self.monitor_config.check_timeout,
-                    follow_redirects=self.monitor_config.http_follow_redirect,
-                )
-            except httpx.TimeoutException:
-                self.status = OnlineStatus.TIMEOUT
-                self.status_msg = gettext("request timeout after %ds") % self.monitor_config.check_timeout
-                self.extra.traceback = traceback.format_exc()
-                return
+        try:
+            with self.client() as client:
+                self.start_time = time.perf_counter_ns()
+                with client.stream(**self.request_kwargs(self.timer.trace)) as response:
+                    self.end_time = time.perf_counter_ns()
+                    response.read()
+        except httpx.TimeoutException:
+            self.handle_timeout()
+            return
+        # check status
+        self.handle_response(response)
+
+    async def acheck(self) -> None:
+        # request url
+        try:
+            async with self.async_client() as client:
+                self.start_time = time.perf_counter_ns()
+                async with client.stream(**self.request_kwargs(self.timer.atrace)) as response:
+                    self.end_time = time.perf_counter_ns()
+                    await response.aread()
+        except httpx.TimeoutException:
+            self.handle_timeout()
+            return
         # check status
+        self.handle_response(response)
+
+    def handle_timeout(self) -> None:
+        self.status = OnlineStatus.TIMEOUT
+        self.status_msg = gettext("request timeout after %ds") % self.monitor_config.check_timeout
+        self.extra.traceback = traceback.format_exc()
+        self.timings = self.timer.to_timings()
+
+    def handle_response(self, response: httpx.Response) -> None:
+        self.timings = self.timer.to_timings()
         if response.status_code == self.monitor_config.http_check_status_code:
             self.status = OnlineStatus.ONLINE
             self.duration = (self.end_time - self.start_time) / 10**6
@@ -43,9 +130,3 @@ class HTTPHandler(BaseHandler):
         self.status = OnlineStatus.OFFLINE
         self.status_msg = gettext("response with status %d") % response.status_code
         self.extra.http_response_header = dict(response.headers)
-
-    def log_request(self, request: httpx.Request):
-        self.start_time = time.time_ns()
-
-    def log_response(self, response: httpx.Response):
-        self.end_time = time.time_ns()
@@ -0,0 +1,110 @@
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Union
+
+from django.conf import settings
+
+from apps.monitor.constants import OnlineStatus
+from apps.monitor.models import Incident, ServiceLatestStatus
+
+
+@dataclass
+class IncidentState:
+    """
+    failure streak of service
+    """
+
+    timestamp: Union[int, None] = None
+    failure_since: Union[int, None] = None
+    failure_count: int = 0
+    incident: Union[Incident, None] = None
+
+
+class IncidentTracker:
+    """
+    open and close incidents from time ordered status points, one pass without rescanning history
+    """
+
+    def __init__(self, failure_threshold: int = None) -> None:
+        self.failure_threshold = failure_threshold or settings.MONITOR_INCIDENT_FAILURE_THRESHOLD
+        self.states: Dict[str, IncidentState] = {}
+        self.changed: Dict[int, Incident] = {}
+
+    def load(self, service_ids: Iterable[str], lock: bool = False) -> None:
+        """
+        resume streaks from latest status and open incidents
+        """
+
+        latest_status = ServiceLatestStatus.objects.filter(service_id__in=service_ids)
+        if lock:
+            latest_status = latest_status.select_for_update()
+        for record in latest_status:
+            self.states[record.service_id] = IncidentState(
+                timestamp=record.timestamp, failure_since=record.failure_since, failure_count=record.failure_count
+            )
+        for incident in Incident.objects.filter(service_id__in=service_ids, ended_at__isnull=True):
+            self.states.setdefault(incident.service_id, IncidentState()).incident = incident
+
+    def feed(self, service_id: str, timestamp: int, status: int) -> bool:
+        """
+        apply one point, points not newer than the last one are ignored
+        """
+
+        state = self.states.setdefault(service_id, IncidentState())
+        if state.timestamp is not None and timestamp <= state.timestamp:
+            return False
+        state.timestamp = timestamp
+
+        # recovered
+        if status == OnlineStatus.ONLINE:
+            if state.incident is not None:
+                state.incident.ended_at = timestamp
+                self.changed[id(state.incident)] = state.incident
+                state.incident = None
+            state.failure_since, state.failure_count = None, 0
+            return True
+
+        # failed, open incident once the streak is long enough
+        if not state.failure_count:
+            state.failure_since = timestamp
+        state.failure_count += 1
+        if state.incident is None and state.failure_count >= self.failure_threshold:
+            state.incident = Incident(
+                service_id=service_id, status=status, started_at=state.failure_since, failure_count=state.failure_count
+            )
+        elif state.incident is not None:
+            state.incident.failure_count += 1
+        if state.incident is not None:
+            self.changed[id(state.incident)] = state.incident
+        return True
+
+    def save(self) -> List[Incident]:
+        """
+        write changed incidents
+        """
+
+        incidents = list(self.changed.values())
+        to_create = [incident for incident in incidents if incident._state.adding]
+        to_update = [incident for incident in incidents if not incident._state.adding]
+        Incident.objects.bulk_create(to_create)
+        Incident.objects.bulk_update(to_update, fields=["ended_at", "failure_count"])
+        self.changed = {}
+        return incidents
+
+
+def summarize_incidents(incidents: List[Incident], start_time: int, end_time: int) -> dict:
+    """
+    downtime, uptime and mttr of window, incidents are clipped to the window
+    """
+
+    downtime = 0
+    for incident in incidents:
+        ended_at = end_time if incident.ended_at is None else min(incident.ended_at, end_time)
+        downtime += max(ended_at - max(incident.started_at, start_time), 0)
+    closed = [incident for incident in incidents if incident.ended_at is not None]
+    window = max(end_time - start_time, 1)
+    return {
+        "incident_count": len(incidents),
+        "downtime": downtime,
+        "uptime": (1 - downtime / window) * 100,
+        "mttr": sum(incident.ended_at - incident.started_at for incident in closed) / len(closed) if closed else None,
+    }
@@ -0,0 +1,59 @@
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Dict, Iterable, Union
+
+from django.conf import settings
+
+from apps.monitor.models import InternedValue
+
+
+class ValueInterner:
+    """
+    content addressed store of repeated texts, each distinct text is written once and referenced by id
+    """
+
+    _cache: "OrderedDict[str, int]" = OrderedDict()
+
+    @classmethod
+    def digest(cls, value: str) -> str:
+        return hashlib.sha256(value.encode()).hexdigest()
+
+    @classmethod
+    def encode(cls, value: Union[str, dict, None]) -> Union[str, None]:
+        """
+        texts as is, dicts as canonical json, empty values are not interned
+        """
+
+        if not value:
+            return None
+        if isinstance(value, dict):
+            return json.dumps(value, ensure_ascii=False, sort_keys=True)
+        return value
+
+    @classmethod
+    def intern_many(cls, values: Iterable[str]) -> Dict[str, int]:
+        """
+        map each text to its id, missing texts are inserted
+        """
+
+        digests = {cls.digest(value): value for value in set(values) if value}
+        ids = {digest: cls._cache[digest] for digest in digests if digest in cls._cache}
+        missing = set(digests) - set(ids)
+        if missing:
+            ids.update(InternedValue.objects.filter(digest__in=missing).values_list("digest", "id"))
+            to_create = [InternedValue(digest=digest, value=digests[digest]) for digest in missing - set(ids)]
+            if to_create:
+                # concurrent writers may insert the same text, ids are read back either way
+                InternedValue.objects.bulk_create(to_create, ignore_conflicts=True)
+                ids.update(
+                    InternedValue.objects.filter(digest__in=[value.digest for value in to_create]).values_list(
+                        "digest", "id"
+                    )
+                )
+        for digest, value_id in ids.items():
+            cls._cache[digest] = value_id
+            cls._cache.move_to_end(digest)
+        while len(cls._cache) > settings.MONITOR_INTERN_CACHE_SIZE:
+            cls._cache.popitem(last=False)
+        return {value: ids[digest] for digest, value in digests.items()}
@@ -0,0 +1,97 @@
+import math
+from typing import Dict, List
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+
+class DispatchLease:
+    """
+    dispatch lease of monitor config, held from scheduling until the result is written
+    """
+
+    _key_prefix = "monitor-lease"
+
+    def __init__(self, monitor_config_id: str, check_timeout: int = 0, check_retry: int = 0) -> None:
+        self.monitor_config_id = monitor_config_id
+        self.check_timeout = check_timeout
+        self.check_retry = check_retry
+
+    @property
+    def key(self) -> str:
+        """
+        cache key
+        """
+
+        return f"{self._key_prefix}:{self.monitor_config_id}"
+
+    @property
+    def retry_budget(self) -> float:
+        """
+        time of all attempts of a check, each attempt may time out and wait the max backoff
+        """
+
+        return (self.check_timeout + settings.MONITOR_CHECK_RETRY_MAX_BACKOFF) * (self.check_retry + 1)
+
+    @property
+    def timeout(self) -> int:
+        """
+        lease ttl, covers all attempts of a check
+        """
+
+        return math.ceil(self.retry_budget) + settings.MONITOR_LEASE_EXTRA_TIME
+
+    def acquire(self, queued: bool = True) -> bool:
+        """
+        hold lease, return False when a live lease exists, a queued check also waits for a worker
+        """
+
+        timeout = self.timeout + settings.MONITOR_LEASE_QUEUE_TIME if queued else self.timeout
+        return cache.add(self.key, int(timezone.now().timestamp()), timeout=timeout)
+
+    def renew(self) -> None:
+        """
+        restart lease when a worker picks the check up, a lease expired in the queue is taken again
+        """
+
+        if not cache.touch(self.key, timeout=self.timeout):
+            cache.add(self.key, int(timezone.now().timestamp()), timeout=self.timeout)
+
+    def release(self) -> None:
+        """
+        release lease
+        """
+
+        cache.delete(self.key)
+
+    @classmethod
+    def release_many(cls, monitor_config_ids: List[str]) -> None:
+        cache.delete_many([cls(monitor_config_id).key for monitor_config_id in monitor_config_ids])
+
+
+class DispatchStats:
+    """
+    dispatch counters of scheduler
+    """
+
+    _key_prefix = "monitor-dispatch-stats"
+    DISPATCHED = "dispatched"
+    LEASE_SKIPPED = "lease_skipped"
+    names = [DISPATCHED, LEASE_SKIPPED]
+
+    @classmethod
+    def key(cls, name: str) -> str:
+        return f"{cls._key_prefix}:{name}"
+
+    @classmethod
+    def incr(cls, name: str, delta: int = 1) -> None:
+        if not delta:
+            return
+        cache.add(cls.key(name), 0, timeout=None)
+        cache.incr(cls.key(name), delta)
+
+    @classmethod
+    def load(cls) -> Dict[str, int]:
+        data = cache.get_many([cls.key(name) for name in cls.names])
+        return {name: data.get(cls.key(name), 0) for name in cls.names}
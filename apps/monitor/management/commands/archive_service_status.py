@@ -0,0 +1,16 @@
+from django.core.management import BaseCommand
+
+from apps.monitor.archives import StatusArchiver
+from apps.service.models import Service
+
+
+class Command(BaseCommand):
+    """
+    move compacted status points older than the hot window into compressed day files
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--before-days", type=int, default=None, help="archive points older than these days")
+
+    def handle(self, *args, **options):
+        StatusArchiver(before_days=options["before_days"]).run(Service.objects.values_list("id", flat=True))
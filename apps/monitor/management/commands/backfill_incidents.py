@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.db import transaction
+from ovinc_client.core.logger import logger
+
+from apps.monitor.incidents import IncidentState, IncidentTracker
+from apps.monitor.models import Incident, ServiceLatestStatus, ServiceStatus
+from apps.service.models import Service
+
+
+class Command(BaseCommand):
+    """
+    rebuild incidents and failure streaks of services by replaying status history
+    """
+
+    def handle(self, *args, **options):
+        for service_id in Service.objects.values_list("id", flat=True):
+            count = self.replay(service_id)
+            logger.info("[BackfillIncidents] %s Incidents %s", service_id, count)
+
+    @transaction.atomic()
+    def replay(self, service_id: str) -> int:
+        # lock latest status so the write path of this service waits for the replay
+        latest_status = ServiceLatestStatus.objects.select_for_update().filter(service_id=service_id).first()
+        Incident.objects.filter(service_id=service_id).delete()
+
+        # one ordered pass over the index
+        tracker = IncidentTracker()
+        points = (
+            ServiceStatus.objects.filter(service_id=service_id)
+            .order_by("timestamp", "id")
+            .values_list("timestamp", "status")
+        )
+        for timestamp, status in points.iterator(chunk_size=settings.SVC_STATUS_STREAM_CHUNK_SIZE):
+            tracker.feed(service_id, timestamp, status)
+        incidents = tracker.save()
+
+        # resume streak in write path
+        if latest_status:
+            state = tracker.states.get(service_id, IncidentState())
+            latest_status.failure_since, latest_status.failure_count = state.failure_since, state.failure_count
+            latest_status.save(update_fields=["failure_since", "failure_count"])
+        return len(incidents)
@@ -0,0 +1,60 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Min
+from ovinc_client.core.logger import logger
+
+from apps.monitor.constants import OnlineStatus
+from apps.monitor.models import ServiceLatestStatus, ServiceStatus
+from apps.monitor.results import ResultWriter
+from apps.service.models import Service
+
+
+class Command(BaseCommand):
+    """
+    seed latest status of services from status history
+    """
+
+    def handle(self, *args, **options):
+        total = 0
+        for service_id in Service.objects.values_list("id", flat=True):
+            status = (
+                ServiceStatus.objects.filter(service_id=service_id)
+                .select_related("status_msg_ref")
+                .order_by("-timestamp", "-id")
+                .first()
+            )
+            if status and self.backfill(status):
+                total += 1
+        logger.info("[BackfillLatestStatus] Services %s", total)
+
+    @transaction.atomic()
+    def backfill(self, status: ServiceStatus) -> bool:
+        """
+        write latest status under the same lock as result writers, a newer record written meanwhile is kept
+        """
+
+        ResultWriter.lock_services({status.service_id})
+        record = ServiceLatestStatus.objects.get(service_id=status.service_id)
+        if record.timestamp >= status.timestamp:
+            return False
+        record.timestamp, record.status = status.timestamp, status.status
+        record.status_msg, record.duration = status.status_msg, status.duration
+        record.failure_since, record.failure_count = self.load_streak(status)
+        record.save(update_fields=["timestamp", "status", "status_msg", "duration", "failure_since", "failure_count"])
+        return True
+
+    def load_streak(self, status: ServiceStatus) -> tuple:
+        """
+        failed points since the last online point, the streak incident tracking resumes from
+        """
+
+        if status.status == OnlineStatus.ONLINE:
+            return None, 0
+        points = ServiceStatus.objects.filter(service_id=status.service_id, timestamp__lte=status.timestamp)
+        last_online = (
+            points.filter(status=OnlineStatus.ONLINE).order_by("-timestamp").values_list("timestamp", flat=True).first()
+        )
+        if last_online is not None:
+            points = points.filter(timestamp__gt=last_online)
+        streak = points.exclude(status=OnlineStatus.ONLINE).aggregate(since=Min("timestamp"), count=Count("id"))
+        return streak["since"], streak["count"]
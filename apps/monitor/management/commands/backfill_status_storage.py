@@ -0,0 +1,168 @@
+import json
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.db import connection, models, transaction
+from django.db.models import Q
+from ovinc_client.core.logger import logger
+
+from apps.monitor.interning import ValueInterner
+from apps.monitor.models import ServiceStatus, ServiceStatusExtra
+from apps.monitor.results import INTERNED_EXTRA_KEYS, build_status_extra, encode_extra
+
+# columns removed from state by 0010 and 0011, 0017 drops them only when no legacy row is left
+LEGACY_FIELDS = {
+    "datetime": lambda: models.DateTimeField(blank=True, null=True),
+    "status_msg": lambda: models.TextField(blank=True, null=True),
+    "duration": lambda: models.DecimalField(max_digits=13, decimal_places=3, blank=True, null=True),
+    "extra": lambda: models.JSONField(blank=True, null=True),
+}
+
+
+class Command(BaseCommand):
+    """
+    move legacy duration, extra and message columns of service status into the compact layout, chunk by chunk
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=settings.SVC_STATUS_PURGE_CHUNK_SIZE)
+        parser.add_argument("--sleep", type=float, default=0, help="seconds between chunks")
+        parser.add_argument(
+            "--drop-legacy-columns", action="store_true", help="drop legacy columns once every row is converted"
+        )
+
+    def handle(self, *args, **options):
+        self.convert_status(options["chunk_size"], options["sleep"])
+        self.convert_status_extra(options["chunk_size"], options["sleep"])
+        if options["drop_legacy_columns"]:
+            self.drop_legacy_columns()
+
+    def load_columns(self) -> set:
+        with connection.cursor() as cursor:
+            return {
+                column.name
+                for column in connection.introspection.get_table_description(cursor, ServiceStatus._meta.db_table)
+            }
+
+    def convert_status(self, chunk_size: int, sleep: float) -> None:
+        if "datetime" not in self.load_columns():
+            logger.info("[BackfillStatusStorage] Legacy Columns Dropped")
+            return
+        table = connection.ops.quote_name(ServiceStatus._meta.db_table)
+        cursor_id, total = 0, 0
+        while True:
+            # legacy columns are gone from the model, read them directly
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"SELECT id, service_id, timestamp, datetime, extra, status_msg FROM {table} "
+                    "WHERE id > %s ORDER BY id LIMIT %s",
+                    [cursor_id, chunk_size],
+                )
+                rows = cursor.fetchall()
+            if not rows:
+                break
+            cursor_id = rows[-1][0]
+            # every legacy row has datetime or message, new rows leave them null
+            legacy_rows = [row for row in rows if row[3] is not None or row[5] is not None]
+            if legacy_rows:
+                self.convert(table, legacy_rows)
+                total += len(legacy_rows)
+                logger.info("[BackfillStatusStorage] Converted %s Cursor %s", total, cursor_id)
+            if sleep:
+                time.sleep(sleep)
+        logger.info("[BackfillStatusStorage] Done %s", total)
+
+    def convert(self, table: str, rows: list) -> None:
+        extras = {}
+        for row_id, _, _, _, extra, _ in rows:
+            extras[row_id] = json.loads(extra) if isinstance(extra, str) else extra
+        texts = [row[5] for row in rows] + [
+            encode_extra(key, extra.get(key)) for extra in extras.values() if extra for key in INTERNED_EXTRA_KEYS
+        ]
+        refs = ValueInterner.intern_many(texts)
+        with transaction.atomic():
+            # extra of rows moved before, datetime is already null for them
+            ServiceStatusExtra.objects.bulk_create(
+                [
+                    extra
+                    for extra in (
+                        build_status_extra(service_id, timestamp, extras[row_id], refs, row_id)
+                        for row_id, service_id, timestamp, datetime, _, _ in rows
+                        if datetime is not None
+                    )
+                    if extra is not None
+                ]
+            )
+            # rows sharing a message share one update
+            ids_by_ref = defaultdict(list)
+            for row in rows:
+                ids_by_ref[refs.get(row[5])].append(row[0])
+            with connection.cursor() as cursor:
+                for ref_id, ids in ids_by_ref.items():
+                    cursor.execute(
+                        f"UPDATE {table} SET status_msg_ref_id = %s, status_msg = NULL "
+                        f"WHERE id IN ({', '.join(['%s'] * len(ids))})",
+                        [ref_id, *ids],
+                    )
+                ids = [row[0] for row in rows if row[3] is not None]
+                if ids:
+                    cursor.execute(
+                        f"UPDATE {table} SET duration_us = ROUND(duration * 1000), duration = NULL, extra = NULL, "
+                        f"datetime = NULL WHERE id IN ({', '.join(['%s'] * len(ids))})",
+                        ids,
+                    )
+
+    def drop_legacy_columns(self) -> None:
+        """
+        rows written while converting are new rows, they never fill legacy columns
+        """
+
+        columns = self.load_columns()
+        with connection.schema_editor() as schema_editor:
+            for name, build_field in LEGACY_FIELDS.items():
+                if name not in columns:
+                    continue
+                field = build_field()
+                field.set_attributes_from_name(name)
+                field.model = ServiceStatus
+                schema_editor.remove_field(ServiceStatus, field)
+                logger.info("[BackfillStatusStorage] Dropped %s", name)
+
+    def convert_status_extra(self, chunk_size: int, sleep: float) -> None:
+        """
+        intern texts of extra written before references existed
+        """
+
+        total = 0
+        legacy_filter = Q()
+        for key in INTERNED_EXTRA_KEYS:
+            legacy_filter |= Q(data__has_key=key)
+        while True:
+            extras = list(ServiceStatusExtra.objects.filter(legacy_filter).order_by("id")[:chunk_size])
+            if not extras:
+                break
+            refs = ValueInterner.intern_many(
+                encode_extra(key, extra.data.get(key)) for extra in extras for key in INTERNED_EXTRA_KEYS
+            )
+            with transaction.atomic():
+                to_update, to_delete = [], []
+                for extra in extras:
+                    converted = build_status_extra(extra.service_id, extra.timestamp, extra.data, refs)
+                    if converted is None:
+                        to_delete.append(extra.id)
+                        continue
+                    extra.data = converted.data
+                    extra.traceback_ref_id = converted.traceback_ref_id
+                    extra.http_response_header_ref_id = converted.http_response_header_ref_id
+                    to_update.append(extra)
+                ServiceStatusExtra.objects.bulk_update(
+                    to_update, fields=["data", "traceback_ref", "http_response_header_ref"]
+                )
+                ServiceStatusExtra.objects.filter(id__in=to_delete).delete()
+            total += len(extras)
+            logger.info("[BackfillStatusStorage] Extra Converted %s", total)
+            if sleep:
+                time.sleep(sleep)
+        logger.info("[BackfillStatusStorage] Extra Done %s", total)
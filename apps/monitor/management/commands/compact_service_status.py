@@ -0,0 +1,15 @@
+from django.core.management import BaseCommand
+
+from apps.monitor.rollups import StatusRollupCompactor
+
+
+class Command(BaseCommand):
+    """
+    fold new status points into rollups and purge expired raw points
+    """
+
+    def handle(self, *args, **options):
+        compactor = StatusRollupCompactor()
+        compactor.run()
+        compactor.purge()
+        compactor.purge_runs()
@@ -0,0 +1,62 @@
+from typing import Dict, Tuple
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.db import transaction
+from ovinc_client.core.logger import logger
+
+from apps.monitor.constants import RollupResolution
+from apps.monitor.models import (
+    ServiceStatus,
+    ServiceStatusRollup,
+    StatusRollupWatermark,
+)
+from apps.monitor.rollups import StatusRollupCompactor
+from apps.monitor.sketches import DurationSketch
+from apps.service.models import Service
+
+
+class Command(BaseCommand):
+    """
+    rebuild duration sketches of compacted rollups from raw status history
+    """
+
+    def handle(self, *args, **options):
+        for service_id in Service.objects.values_list("id", flat=True):
+            rebuilt, skipped = self.rebuild(service_id)
+            logger.info("[RebuildStatusSketches] %s Rebuilt %s Skipped %s", service_id, rebuilt, skipped)
+
+    @transaction.atomic()
+    def rebuild(self, service_id: str) -> Tuple[int, int]:
+        # hold the watermark so compaction waits until this service is done
+        watermark = (
+            StatusRollupWatermark.objects.select_for_update().filter(name=StatusRollupCompactor.watermark_name).first()
+        )
+        if not watermark:
+            return 0, 0
+
+        # sketch compacted points
+        sketches: Dict[Tuple[int, int], DurationSketch] = {}
+        points = ServiceStatus.objects.filter(
+            service_id=service_id, id__lte=watermark.last_id, duration_us__isnull=False
+        ).values_list("timestamp", "duration_us")
+        for timestamp, duration_us in points.iterator(chunk_size=settings.SVC_STATUS_ROLLUP_CHUNK_SIZE):
+            for resolution in RollupResolution.values:
+                key = (resolution, timestamp - timestamp % resolution)
+                if key not in sketches:
+                    sketches[key] = DurationSketch()
+                sketches[key].add(duration_us / 1000)
+
+        # buckets whose raw points were partly purged do not match their counter, keep them as is
+        to_update, skipped = [], 0
+        for rollup in ServiceStatusRollup.objects.filter(service_id=service_id):
+            sketch = sketches.get((rollup.resolution, rollup.bucket)) or DurationSketch()
+            if sketch.count != rollup.duration_count:
+                skipped += 1
+                continue
+            rollup.duration_sketch = sketch.bins
+            to_update.append(rollup)
+        ServiceStatusRollup.objects.bulk_update(
+            to_update, fields=["duration_sketch"], batch_size=settings.SVC_STATUS_ROLLUP_CHUNK_SIZE
+        )
+        return len(to_update), skipped
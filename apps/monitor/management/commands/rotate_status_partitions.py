@@ -0,0 +1,27 @@
+from django.core.management import BaseCommand, CommandError
+
+from apps.monitor.constants import PartitionPeriod
+from apps.monitor.partitions import StatusPartitionManager
+
+
+class Command(BaseCommand):
+    """
+    partition service status by timestamp on mysql, create coming partitions and drop expired ones
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--init", action="store_true", help="partition the table in place, blocks writes")
+        parser.add_argument("--period", type=int, choices=PartitionPeriod.values, default=None)
+        parser.add_argument("--ahead", type=int, default=None, help="periods to create ahead")
+        parser.add_argument("--retention-days", type=int, default=None)
+
+    def handle(self, *args, **options):
+        manager = StatusPartitionManager(
+            period=options["period"], ahead=options["ahead"], retention_days=options["retention_days"]
+        )
+        if not options["init"]:
+            manager.rotate()
+            return
+        if not manager.supported:
+            raise CommandError("partitioning is only supported on mysql, compact_service_status purges expired points")
+        manager.init()
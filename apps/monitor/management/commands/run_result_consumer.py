@@ -0,0 +1,40 @@
+import os
+import signal
+import socket
+
+from django.core.management import BaseCommand
+from ovinc_client.core.logger import logger
+
+from apps.monitor.results import ResultStream, ResultWriter
+
+
+class Command(BaseCommand):
+    """
+    command for draining buffered check results into db
+    """
+
+    running = True
+
+    def handle(self, *args, **options):
+        self.watch_signal()
+        self.consume()
+
+    def consume(self):
+        stream = ResultStream()
+        stream.ensure_group()
+        consumer_name = f"{socket.gethostname()}-{os.getpid()}"
+        while self.running:
+            messages = stream.read(consumer_name)
+            if not messages:
+                continue
+            # ack only after results committed, redelivered results are skipped by result id
+            results = ResultWriter.write([result for _, result in messages])
+            stream.ack([message_id for message_id, _ in messages])
+            logger.info("[ResultConsumer] Consumed %s; Written %s", len(messages), len(results))
+
+    def watch_signal(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+    def stop(self, *args, **kwargs):
+        self.running = False
@@ -6,8 +6,10 @@ from django.core.management import BaseCommand
 from django.utils import timezone
 from ovinc_client.core.logger import logger
 
-from apps.cel.tasks import run_monitor
-from apps.monitor.models import MonitorConfig
+from apps.cel.tasks import run_monitor_batch
+from apps.monitor.coordinator import SchedulerCoordinator
+from apps.monitor.lease import DispatchLease, DispatchStats
+from apps.monitor.scheduler import MonitorScheduler
 
 
 class Command(BaseCommand):
@@ -22,24 +24,48 @@ class Command(BaseCommand):
         self.schedule()
 
     def schedule(self):
+        # sharded mode, replicas split configs through redis
+        coordinator = SchedulerCoordinator() if settings.MONITOR_SCHEDULER_SHARDS else None
+        scheduler = MonitorScheduler(owns=coordinator.owns if coordinator else None)
         while self.running:
-            logger.info("[Scheduler] Start")
             now = timezone.now().timestamp()
-            sleep_times = [settings.MONITOR_CHECK_MAX_SLEEP_TIME]
-            monitor_configs = MonitorConfig.objects.filter(is_enabled=True)
-            logger.info("[Scheduler] Configs %s", monitor_configs.count())
-            for monitor_config in monitor_configs:
-                next_run_time = monitor_config.last_check_time + monitor_config.check_interval
-                if next_run_time < now:
-                    run_monitor.apply_async(kwargs={"monitor_config_id": monitor_config.id})
-                    sleep_times.append(monitor_config.check_interval)
-                    logger.info("[Scheduler] Scheduled %s", monitor_config.service.name)
-                else:
-                    sleep_times.append(next_run_time - now)
-                    logger.info("[Scheduler] Ignored %s", monitor_config.service.name)
-            sleep_time = round(max(settings.MONITOR_CHECK_MIN_SLEEP_TIME, min(sleep_times)), 3)
+            if coordinator and coordinator.heartbeat(now):
+                scheduler.full_sync(now)
+            scheduler.sync(now)
+            snapshots, skipped = [], 0
+            for entry in scheduler.pop_due(now, settings.MONITOR_DISPATCH_MAX_PER_TICK):
+                # skip configs still queued or running
+                if not DispatchLease(entry.id, entry.check_timeout, entry.check_retry).acquire():
+                    scheduler.postpone(entry, now + settings.MONITOR_CHECK_MIN_SLEEP_TIME)
+                    skipped += 1
+                    logger.info("[Scheduler] Leased %s", entry.service_name)
+                    continue
+                snapshots.append(entry.snapshot)
+                scheduler.reschedule(entry, now)
+                logger.info("[Scheduler] Scheduled %s", entry.service_name)
+            self.dispatch(snapshots)
+            DispatchStats.incr(DispatchStats.DISPATCHED, len(snapshots))
+            DispatchStats.incr(DispatchStats.LEASE_SKIPPED, skipped)
+            max_sleep_time = settings.MONITOR_CHECK_MAX_SLEEP_TIME
+            if coordinator:
+                max_sleep_time = min(max_sleep_time, settings.MONITOR_SCHEDULER_HEARTBEAT_INTERVAL)
+            sleep_time = round(
+                max(
+                    settings.MONITOR_CHECK_MIN_SLEEP_TIME,
+                    min(max_sleep_time, scheduler.next_wakeup(timezone.now().timestamp())),
+                ),
+                3,
+            )
             logger.info("[Scheduler] Sleep %s", sleep_time)
             time.sleep(sleep_time)
+        if coordinator:
+            coordinator.leave()
+
+    def dispatch(self, snapshots: list) -> None:
+        batch_size = settings.MONITOR_DISPATCH_BATCH_SIZE
+        for index in range(0, len(snapshots), batch_size):
+            run_monitor_batch.apply_async(kwargs={"monitor_configs": snapshots[index : index + batch_size]})
+            logger.info("[Scheduler] Dispatched Batch %s", len(snapshots[index : index + batch_size]))
 
     def watch_signal(self):
         signal.signal(signal.SIGTERM, self.stop)
@@ -0,0 +1,19 @@
+# pylint: disable=C0103,R0801
+# Generated by Django 4.2.16 on 2026-10-18 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitor", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="monitorconfig",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name="Updated At"),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# pylint: disable=C0103,R0801
+# Generated by Django 4.2.16 on 2026-10-18 10:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitor", "0002_alter_monitorconfig_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="monitorconfig",
+            name="http_warm_connection",
+            field=models.BooleanField(default=False, verbose_name="Warm Connection"),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# pylint: disable=C0103,R0801
+# Generated by Django 4.2.16 on 2026-10-18 10:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitor", "0003_monitorconfig_http_warm_connection"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="servicestatus",
+            name="body_time",
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name="Body Time(us)"),
+        ),
+        migrations.AddField(
+            model_name="servicestatus",
+            name="connect_time",
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name="Connect Time(us)"),
+        ),
+        migrations.AddField(
+            model_name="servicestatus",
+            name="tls_time",
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name="TLS Time(us)"),
+        ),
+        migrations.AddField(
+            model_name="servicestatus",
+            name="ttfb_time",
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name="TTFB Time(us)"),
+        ),
+    ]
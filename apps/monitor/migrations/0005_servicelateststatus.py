@@ -0,0 +1,65 @@
+# pylint: disable=C0103,R0801
+# Generated by Django 4.2.16 on 2026-10-18 10:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("service", "0001_initial"),
+        ("monitor", "0004_servicestatus_phase_timings"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ServiceLatestStatus",
+            fields=[
+                (
+                    "service",
+                    models.OneToOneField(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="latest_status",
+                        serialize=False,
+                        to="service.service",
+                        verbose_name="Service",
+                    ),
+                ),
+                ("timestamp", models.BigIntegerField(verbose_name="Timestamp(s)")),
+                (
+                    "status",
+                    models.SmallIntegerField(
+                        choices=[
+                            (0, "Online"),
+                            (1, "Offline"),
+                            (2, "Timeout"),
+                            (3, "Unknown"),
+                        ],
+                        verbose_name="Status",
+                    ),
+                ),
+                (
+                    "status_msg",
+                    models.TextField(blank=True, null=True, verbose_name="Status Message"),
+                ),
+                (
+                    "duration",
+                    models.DecimalField(
+                        blank=True,
+                        decimal_places=3,
+                        max_digits=13,
+                        null=True,
+                        verbose_name="Duration(ms)",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Service Latest Status",
+                "verbose_name_plural": "Service Latest Status",
+                "ordering": ["-timestamp"],
+            },
+        ),
+    ]
@@ -0,0 +1,122 @@
+# pylint: disable=C0103,R0801
+# Generated by Django 4.2.16 on 2026-10-18 10:13
+
+import django.db.models.deletion
+import ovinc_client.core.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("service", "0001_initial"),
+        ("monitor", "0005_servicelateststatus"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StatusRollupWatermark",
+            fields=[
+                (
+                    "name",
+                    models.CharField(
+                        max_length=32,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="Name",
+                    ),
+                ),
+                (
+                    "last_id",
+                    models.BigIntegerField(default=0, verbose_name="Last Status ID"),
+                ),
+                (
+                    "covered_until",
+                    models.BigIntegerField(default=0, verbose_name="Covered Until(s)"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Updated At"),
+                ),
+            ],
+            options={
+                "verbose_name": "Status Rollup Watermark",
+                "verbose_name_plural": "Status Rollup Watermark",
+                "ordering": ["name"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ServiceStatusRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(primary_key=True, serialize=False, verbose_name="ID"),
+                ),
+                (
+                    "resolution",
+                    models.IntegerField(
+                        choices=[
+                            (60, "1 Minute"),
+                            (300, "5 Minutes"),
+                            (3600, "1 Hour"),
+                            (86400, "1 Day"),
+                        ],
+                        verbose_name="Resolution(s)",
+                    ),
+                ),
+                ("bucket", models.BigIntegerField(verbose_name="Bucket Start(s)")),
+                (
+                    "online_count",
+                    models.IntegerField(default=0, verbose_name="Online Count"),
+                ),
+                (
+                    "offline_count",
+                    models.IntegerField(default=0, verbose_name="Offline Count"),
+                ),
+                (
+                    "timeout_count",
+                    models.IntegerField(default=0, verbose_name="Timeout Count"),
+                ),
+                (
+                    "unknown_count",
+                    models.IntegerField(default=0, verbose_name="Unknown Count"),
+                ),
+                (
+                    "sample_count",
+                    models.IntegerField(default=0, verbose_name="Sample Count"),
+                ),
+                (
+                    "duration_count",
+                    models.IntegerField(default=0, verbose_name="Duration Count"),
+                ),
+                (
+                    "duration_min",
+                    models.FloatField(blank=True, null=True, verbose_name="Min Duration(ms)"),
+                ),
+                (
+                    "duration_max",
+                    models.FloatField(blank=True, null=True, verbose_name="Max Duration(ms)"),
+                ),
+                (
+                    "duration_sum",
+                    models.FloatField(default=0, verbose_name="Total Duration(ms)"),
+                ),
+                (
+                    "service",
+                    ovinc_client.core.models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="status_rollup",
+                        to="service.service",
+                        verbose_name="Service",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Service Status Rollup",
+                "verbose_name_plural": "Service Status Rollup",
+                "ordering": ["bucket"],
+                "unique_together": {("service", "resolution", "bucket")},
+            },
+        ),
+    ]
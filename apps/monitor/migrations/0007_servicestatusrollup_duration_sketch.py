@@ -0,0 +1,19 @@
+# pylint: disable=C0103,R0801
+# Generated by Django 4.2.16 on 2026-10-18 10:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitor", "0006_service_status_rollup"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="servicestatusrollup",
+            name="duration_sketch",
+            field=models.JSONField(blank=True, default=dict, verbose_name="Duration Sketch"),
+        ),
+    ]
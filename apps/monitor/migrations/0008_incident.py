@@ -0,0 +1,73 @@
+# pylint: disable=C0103,R0801
+# Generated by Django 4.2.16 on 2026-10-18 10:25
+
+import django.db.models.deletion
+import ovinc_client.core.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("service", "0001_initial"),
+        ("monitor", "0007_servicestatusrollup_duration_sketch"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="servicelateststatus",
+            name="failure_count",
+            field=models.IntegerField(default=0, verbose_name="Consecutive Failures"),
+        ),
+        migrations.AddField(
+            model_name="servicelateststatus",
+            name="failure_since",
+            field=models.BigIntegerField(blank=True, null=True, verbose_name="Failure Since(s)"),
+        ),
+        migrations.CreateModel(
+            name="Incident",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(primary_key=True, serialize=False, verbose_name="ID"),
+                ),
+                (
+                    "status",
+                    models.SmallIntegerField(
+                        choices=[
+                            (0, "Online"),
+                            (1, "Offline"),
+                            (2, "Timeout"),
+                            (3, "Unknown"),
+                        ],
+                        verbose_name="Status",
+                    ),
+                ),
+                ("started_at", models.BigIntegerField(verbose_name="Started At(s)")),
+                (
+                    "ended_at",
+                    models.BigIntegerField(blank=True, null=True, verbose_name="Ended At(s)"),
+                ),
+                (
+                    "failure_count",
+                    models.IntegerField(default=0, verbose_name="Failure Count"),
+                ),
+                (
+                    "service",
+                    ovinc_client.core.models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="incident",
+                        to="service.service",
+                        verbose_name="Service",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Incident",
+                "verbose_name_plural": "Incident",
+                "ordering": ["-started_at"],
+                "index_together": {("service", "started_at")},
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# pylint: disable=C0103,R0801
+# Generated by Django 4.2.16 on 2026-10-18 10:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitor", "0008_incident"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="monitorconfig",
+            name="adaptive_interval",
+            field=models.BooleanField(default=False, verbose_name="Adaptive Interval"),
+        ),
+        migrations.AddField(
+            model_name="monitorconfig",
+            name="adaptive_interval_max",
+            field=models.IntegerField(blank=True, null=True, verbose_name="Adaptive Interval Max (s)"),
+        ),
+        migrations.AddField(
+            model_name="monitorconfig",
+            name="adaptive_interval_min",
+            field=models.IntegerField(blank=True, null=True, verbose_name="Adaptive Interval Min (s)"),
+        ),
+    ]
@@ -0,0 +1,77 @@
+# pylint: disable=C0103,R0801
+# Generated by Django 4.2.16 on 2026-10-18 10:31
+
+import django.db.models.deletion
+import ovinc_client.core.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("service", "0001_initial"),
+        ("monitor", "0009_monitorconfig_adaptive_interval"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="servicestatus",
+            options={
+                "verbose_name": "Service Status",
+                "verbose_name_plural": "Service Status",
+            },
+        ),
+        # legacy columns stay in db until backfill_status_storage empties them, new rows leave them null
+        migrations.AlterField(
+            model_name="servicestatus",
+            name="datetime",
+            field=models.DateTimeField(blank=True, null=True, verbose_name="Time"),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.RemoveField(
+                    model_name="servicestatus",
+                    name="datetime",
+                ),
+                migrations.RemoveField(
+                    model_name="servicestatus",
+                    name="duration",
+                ),
+                migrations.RemoveField(
+                    model_name="servicestatus",
+                    name="extra",
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name="servicestatus",
+            name="duration_us",
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name="Duration(us)"),
+        ),
+        migrations.CreateModel(
+            name="ServiceStatusExtra",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(primary_key=True, serialize=False, verbose_name="ID"),
+                ),
+                ("timestamp", models.BigIntegerField(verbose_name="Timestamp(s)")),
+                ("data", models.JSONField(verbose_name="Extra")),
+                (
+                    "service",
+                    ovinc_client.core.models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="status_extra",
+                        to="service.service",
+                        verbose_name="Service",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Service Status Extra",
+                "verbose_name_plural": "Service Status Extra",
+                "index_together": {("service", "timestamp")},
+            },
+        ),
+    ]
@@ -0,0 +1,88 @@
+# pylint: disable=C0103,R0801
+# Generated by Django 4.2.16 on 2026-10-18 10:36
+
+import django.db.models.deletion
+import ovinc_client.core.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitor", "0010_compact_service_status"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="InternedValue",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(primary_key=True, serialize=False, verbose_name="ID"),
+                ),
+                (
+                    "digest",
+                    models.CharField(max_length=64, unique=True, verbose_name="Digest"),
+                ),
+                ("value", models.TextField(verbose_name="Value")),
+            ],
+            options={
+                "verbose_name": "Interned Value",
+                "verbose_name_plural": "Interned Value",
+                "ordering": ["-id"],
+            },
+        ),
+        # legacy column stays in db until backfill_status_storage moves it, new rows leave it null
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.RemoveField(
+                    model_name="servicestatus",
+                    name="status_msg",
+                ),
+            ],
+        ),
+        migrations.AlterField(
+            model_name="servicestatusextra",
+            name="data",
+            field=models.JSONField(blank=True, null=True, verbose_name="Extra"),
+        ),
+        migrations.AddField(
+            model_name="servicestatus",
+            name="status_msg_ref",
+            field=ovinc_client.core.models.ForeignKey(
+                blank=True,
+                db_constraint=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="monitor.internedvalue",
+                verbose_name="Status Message",
+            ),
+        ),
+        migrations.AddField(
+            model_name="servicestatusextra",
+            name="http_response_header_ref",
+            field=ovinc_client.core.models.ForeignKey(
+                blank=True,
+                db_constraint=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="monitor.internedvalue",
+                verbose_name="HTTP Response Header",
+            ),
+        ),
+        migrations.AddField(
+            model_name="servicestatusextra",
+            name="traceback_ref",
+            field=ovinc_client.core.models.ForeignKey(
+                blank=True,
+                db_constraint=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="monitor.internedvalue",
+                verbose_name="Traceback",
+            ),
+        ),
+    ]
@@ -0,0 +1,86 @@
+# pylint: disable=C0103,R0801
+# Generated by Django 4.2.16 on 2026-10-18 10:41
+
+import django.db.models.deletion
+import ovinc_client.core.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("service", "0001_initial"),
+        ("monitor", "0011_interned_value"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="monitorconfig",
+            name="storage_mode",
+            field=models.CharField(
+                choices=[("raw", "Raw Points"), ("run_length", "Run Length")],
+                default="raw",
+                max_length=32,
+                verbose_name="Storage Mode",
+            ),
+        ),
+        migrations.CreateModel(
+            name="ServiceStatusRun",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(primary_key=True, serialize=False, verbose_name="ID"),
+                ),
+                (
+                    "status",
+                    models.SmallIntegerField(
+                        choices=[
+                            (0, "Online"),
+                            (1, "Offline"),
+                            (2, "Timeout"),
+                            (3, "Unknown"),
+                        ],
+                        verbose_name="Status",
+                    ),
+                ),
+                ("start_time", models.BigIntegerField(verbose_name="Start Time(s)")),
+                ("end_time", models.BigIntegerField(verbose_name="End Time(s)")),
+                (
+                    "sample_count",
+                    models.IntegerField(default=0, verbose_name="Sample Count"),
+                ),
+                (
+                    "duration_count",
+                    models.IntegerField(default=0, verbose_name="Duration Count"),
+                ),
+                (
+                    "duration_min",
+                    models.FloatField(blank=True, null=True, verbose_name="Min Duration(ms)"),
+                ),
+                (
+                    "duration_max",
+                    models.FloatField(blank=True, null=True, verbose_name="Max Duration(ms)"),
+                ),
+                (
+                    "duration_sum",
+                    models.FloatField(default=0, verbose_name="Total Duration(ms)"),
+                ),
+                (
+                    "service",
+                    ovinc_client.core.models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="status_run",
+                        to="service.service",
+                        verbose_name="Service",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Service Status Run",
+                "verbose_name_plural": "Service Status Run",
+                "ordering": ["start_time"],
+                "index_together": {("service", "start_time"), ("service", "end_time")},
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# pylint: disable=C0103,R0801
+# Generated by Django 4.2.16 on 2026-10-18 10:47
+
+import django.db.models.deletion
+import ovinc_client.core.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("service", "0001_initial"),
+        ("monitor", "0012_service_status_run"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StatusArchive",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(primary_key=True, serialize=False, verbose_name="ID"),
+                ),
+                ("day", models.BigIntegerField(verbose_name="Day Start(s)")),
+                ("path", models.CharField(max_length=255, verbose_name="Path")),
+                (
+                    "point_count",
+                    models.IntegerField(default=0, verbose_name="Point Count"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Updated At"),
+                ),
+                (
+                    "service",
+                    ovinc_client.core.models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="status_archive",
+                        to="service.service",
+                        verbose_name="Service",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Status Archive",
+                "verbose_name_plural": "Status Archive",
+                "ordering": ["day"],
+                "unique_together": {("service", "day")},
+            },
+        ),
+    ]
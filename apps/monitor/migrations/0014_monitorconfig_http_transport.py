@@ -0,0 +1,24 @@
+# pylint: disable=C0103,R0801
+# Generated by Django 4.2.16 on 2026-10-18 11:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitor", "0013_status_archive"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="monitorconfig",
+            name="http_use_http2",
+            field=models.BooleanField(default=False, verbose_name="Use HTTP/2"),
+        ),
+        migrations.AddField(
+            model_name="monitorconfig",
+            name="http_verify_tls",
+            field=models.BooleanField(default=True, verbose_name="Verify TLS Certificate"),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# pylint: disable=C0103,R0801
+# Generated by Django 4.2.16 on 2026-10-18 11:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitor", "0014_monitorconfig_http_transport"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="servicestatus",
+            name="result_id",
+            field=models.UUIDField(blank=True, null=True, verbose_name="Result ID"),
+        ),
+        migrations.AlterUniqueTogether(
+            name="servicestatus",
+            unique_together={("result_id", "timestamp")},
+        ),
+    ]
@@ -0,0 +1,29 @@
+# pylint: disable=C0103,R0801
+# Generated by Django 4.2.16 on 2026-10-18 11:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitor", "0015_servicestatus_result_id"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="statusrollupwatermark",
+            name="observed_at",
+            field=models.BigIntegerField(default=0, verbose_name="Observed At(s)"),
+        ),
+        migrations.AddField(
+            model_name="statusrollupwatermark",
+            name="observed_id",
+            field=models.BigIntegerField(default=0, verbose_name="Observed Status ID"),
+        ),
+        migrations.AddField(
+            model_name="statusrollupwatermark",
+            name="settled_id",
+            field=models.BigIntegerField(default=0, verbose_name="Settled Status ID"),
+        ),
+    ]
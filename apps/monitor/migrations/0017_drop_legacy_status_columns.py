@@ -0,0 +1,61 @@
+# pylint: disable=C0103,R0801
+# Generated by Django 4.2.16 on 2026-10-18 11:20
+
+from django.db import migrations, models
+
+# columns removed from state by 0010 and 0011, kept in db until backfill_status_storage has moved every row,
+# a deployment with legacy rows left drops them with backfill_status_storage --drop-legacy-columns
+LEGACY_FIELDS = {
+    "datetime": lambda: models.DateTimeField(blank=True, null=True),
+    "status_msg": lambda: models.TextField(blank=True, null=True),
+    "duration": lambda: models.DecimalField(max_digits=13, decimal_places=3, blank=True, null=True),
+    "extra": lambda: models.JSONField(blank=True, null=True),
+}
+
+
+def drop_legacy_columns(apps, schema_editor):
+    model = apps.get_model("monitor", "ServiceStatus")
+    table = schema_editor.quote_name(model._meta.db_table)
+    with schema_editor.connection.cursor() as cursor:
+        columns = {
+            column.name
+            for column in schema_editor.connection.introspection.get_table_description(cursor, model._meta.db_table)
+        }
+        if "datetime" in columns:
+            cursor.execute(f"SELECT id FROM {table} WHERE datetime IS NOT NULL OR status_msg IS NOT NULL LIMIT 1")
+            if cursor.fetchone():
+                return
+    for name, build_field in LEGACY_FIELDS.items():
+        if name not in columns:
+            continue
+        field = build_field()
+        field.set_attributes_from_name(name)
+        field.model = model
+        schema_editor.remove_field(model, field)
+
+
+def add_legacy_columns(apps, schema_editor):
+    model = apps.get_model("monitor", "ServiceStatus")
+    with schema_editor.connection.cursor() as cursor:
+        columns = {
+            column.name
+            for column in schema_editor.connection.introspection.get_table_description(cursor, model._meta.db_table)
+        }
+    for name, build_field in LEGACY_FIELDS.items():
+        if name in columns:
+            continue
+        field = build_field()
+        field.set_attributes_from_name(name)
+        field.model = model
+        schema_editor.add_field(model, field)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitor", "0016_statusrollupwatermark_settle"),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_legacy_columns, add_legacy_columns),
+    ]
@@ -0,0 +1,19 @@
+# pylint: disable=C0103,R0801
+# Generated by Django 4.2.16 on 2026-10-18 11:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitor", "0017_drop_legacy_status_columns"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="servicestatusextra",
+            name="status_id",
+            field=models.BigIntegerField(blank=True, db_index=True, null=True, verbose_name="Status ID"),
+        ),
+    ]
@@ -1,8 +1,13 @@
+import json
+from collections import defaultdict
 from dataclasses import dataclass
+from typing import Dict, Iterable, List, Set, Tuple, Union
 
-from django.db import models
+from django.db import connection, models
+from django.db.models import ExpressionWrapper, F, Q, Value
+from django.db.models.functions import Coalesce
 from django.utils.translation import gettext_lazy
-from ovinc_client.core.constants import SHORT_CHAR_LENGTH
+from ovinc_client.core.constants import MAX_CHAR_LENGTH, SHORT_CHAR_LENGTH
 from ovinc_client.core.models import BaseModel, ForeignKey, UniqIDField
 
 from apps.monitor.constants import (
@@ -10,7 +15,28 @@ from apps.monitor.constants import (
     DefaultMonitorConfig,
     HTTPMethod,
     OnlineStatus,
+    RollupResolution,
+    StatusStorageMode,
 )
+from apps.monitor.sketches import DurationSketch
+
+
+class InternedValue(BaseModel):
+    """
+    distinct text referenced by status points, keyed by content digest
+    """
+
+    id = models.BigAutoField(verbose_name=gettext_lazy("ID"), primary_key=True)
+    digest = models.CharField(verbose_name=gettext_lazy("Digest"), max_length=64, unique=True)
+    value = models.TextField(verbose_name=gettext_lazy("Value"))
+
+    class Meta:
+        verbose_name = gettext_lazy("Interned Value")
+        verbose_name_plural = verbose_name
+        ordering = ["-id"]
+
+    def __str__(self):
+        return self.value[:100]
 
 
 class ServiceStatus(BaseModel):
@@ -23,25 +49,457 @@ class ServiceStatus(BaseModel):
         verbose_name=gettext_lazy("Service"), to="service.Service", related_name="status_dot", on_delete=models.CASCADE
     )
     timestamp = models.BigIntegerField(verbose_name=gettext_lazy("Timestamp(s)"))
-    datetime = models.DateTimeField(verbose_name=gettext_lazy("Time"))
+    result_id = models.UUIDField(verbose_name=gettext_lazy("Result ID"), blank=True, null=True)
     status = models.SmallIntegerField(verbose_name=gettext_lazy("Status"), choices=OnlineStatus.choices)
-    status_msg = models.TextField(verbose_name=gettext_lazy("Status Message"), blank=True, null=True)
-    duration = models.DecimalField(
-        verbose_name=gettext_lazy("Duration(ms)"), max_digits=13, decimal_places=3, blank=True, null=True
+    status_msg_ref = ForeignKey(
+        verbose_name=gettext_lazy("Status Message"),
+        to="monitor.InternedValue",
+        related_name="+",
+        on_delete=models.PROTECT,
+        blank=True,
+        null=True,
     )
-    extra = models.JSONField(verbose_name=gettext_lazy("Extra"), blank=True, null=True)
+    duration_us = models.PositiveIntegerField(verbose_name=gettext_lazy("Duration(us)"), blank=True, null=True)
+    connect_time = models.PositiveIntegerField(verbose_name=gettext_lazy("Connect Time(us)"), blank=True, null=True)
+    tls_time = models.PositiveIntegerField(verbose_name=gettext_lazy("TLS Time(us)"), blank=True, null=True)
+    ttfb_time = models.PositiveIntegerField(verbose_name=gettext_lazy("TTFB Time(us)"), blank=True, null=True)
+    body_time = models.PositiveIntegerField(verbose_name=gettext_lazy("Body Time(us)"), blank=True, null=True)
 
     class Meta:
         verbose_name = gettext_lazy("Service Status")
         verbose_name_plural = verbose_name
-        ordering = ["-id"]
         index_together = [
             ["service", "timestamp"],
         ]
+        # unique keys of a partitioned table must contain the partition column
+        unique_together = [
+            ["result_id", "timestamp"],
+        ]
 
     def __str__(self):
         return f"{self.service}:{self.timestamp}"
 
+    @property
+    def status_msg(self) -> str:
+        # archived points carry an unsaved value
+        return self.status_msg_ref.value if self.status_msg_ref else ""
+
+    @property
+    def duration(self) -> Union[float, None]:
+        """
+        duration in milliseconds
+        """
+
+        return None if self.duration_us is None else self.duration_us / 1000
+
+    @classmethod
+    def duration_ms(cls) -> ExpressionWrapper:
+        """
+        duration in milliseconds for values and aggregates
+        """
+
+        return ExpressionWrapper(F("duration_us") / 1000.0, output_field=models.FloatField())
+
+    @classmethod
+    def status_msg_text(cls) -> Coalesce:
+        """
+        status message for values
+        """
+
+        return Coalesce(F("status_msg_ref__value"), Value(""), output_field=models.TextField())
+
+
+class ServiceStatusExtra(BaseModel):
+    """
+    extra data of service status, only written when not empty
+    """
+
+    id = models.BigAutoField(verbose_name=gettext_lazy("ID"), primary_key=True)
+    service = ForeignKey(
+        verbose_name=gettext_lazy("Service"),
+        to="service.Service",
+        related_name="status_extra",
+        on_delete=models.CASCADE,
+    )
+    timestamp = models.BigIntegerField(verbose_name=gettext_lazy("Timestamp(s)"))
+    # checks within the same second share a timestamp, the status id tells them apart, null for legacy rows
+    status_id = models.BigIntegerField(verbose_name=gettext_lazy("Status ID"), blank=True, null=True, db_index=True)
+    traceback_ref = ForeignKey(
+        verbose_name=gettext_lazy("Traceback"),
+        to="monitor.InternedValue",
+        related_name="+",
+        on_delete=models.PROTECT,
+        blank=True,
+        null=True,
+    )
+    http_response_header_ref = ForeignKey(
+        verbose_name=gettext_lazy("HTTP Response Header"),
+        to="monitor.InternedValue",
+        related_name="+",
+        on_delete=models.PROTECT,
+        blank=True,
+        null=True,
+    )
+    data = models.JSONField(verbose_name=gettext_lazy("Extra"), blank=True, null=True)
+
+    class Meta:
+        verbose_name = gettext_lazy("Service Status Extra")
+        verbose_name_plural = verbose_name
+        index_together = [
+            ["service", "timestamp"],
+        ]
+
+    # response headers changing on every response stay in data, the rest is interned
+    volatile_header_key = "http_response_header_volatile"
+
+    def __str__(self):
+        return f"{self.service_id}:{self.timestamp}"
+
+    @property
+    def http_response_header(self) -> Union[dict, None]:
+        """
+        full response header, interned and volatile headers merged
+        """
+
+        header = json.loads(self.http_response_header_ref.value) if self.http_response_header_ref_id else {}
+        header.update((self.data or {}).get(self.volatile_header_key) or {})
+        return header or None
+
+    @classmethod
+    def delete_of_points(cls, points: Iterable[Tuple[int, str, int]]) -> int:
+        """
+        delete extras of removed status points, given as (id, service_id, timestamp)
+        """
+
+        status_ids = set()
+        timestamps: Dict[str, Set[int]] = defaultdict(set)
+        for status_id, service_id, timestamp in points:
+            status_ids.add(status_id)
+            timestamps[service_id].add(timestamp)
+        if not status_ids:
+            return 0
+        # legacy extras carry no status id and are matched by second
+        legacy_condition = Q()
+        for service_id, values in timestamps.items():
+            legacy_condition |= Q(service_id=service_id, timestamp__in=values)
+        count, _ = cls.objects.filter(
+            Q(status_id__in=status_ids) | Q(legacy_condition, status_id__isnull=True)
+        ).delete()
+        return count
+
+
+class ServiceStatusRun(BaseModel):
+    """
+    contiguous status points of service with the same status
+    """
+
+    id = models.BigAutoField(verbose_name=gettext_lazy("ID"), primary_key=True)
+    service = ForeignKey(
+        verbose_name=gettext_lazy("Service"), to="service.Service", related_name="status_run", on_delete=models.CASCADE
+    )
+    status = models.SmallIntegerField(verbose_name=gettext_lazy("Status"), choices=OnlineStatus.choices)
+    start_time = models.BigIntegerField(verbose_name=gettext_lazy("Start Time(s)"))
+    end_time = models.BigIntegerField(verbose_name=gettext_lazy("End Time(s)"))
+    sample_count = models.IntegerField(verbose_name=gettext_lazy("Sample Count"), default=0)
+    duration_count = models.IntegerField(verbose_name=gettext_lazy("Duration Count"), default=0)
+    duration_min = models.FloatField(verbose_name=gettext_lazy("Min Duration(ms)"), blank=True, null=True)
+    duration_max = models.FloatField(verbose_name=gettext_lazy("Max Duration(ms)"), blank=True, null=True)
+    duration_sum = models.FloatField(verbose_name=gettext_lazy("Total Duration(ms)"), default=0)
+
+    class Meta:
+        verbose_name = gettext_lazy("Service Status Run")
+        verbose_name_plural = verbose_name
+        ordering = ["start_time"]
+        index_together = [
+            ["service", "start_time"],
+            ["service", "end_time"],
+        ]
+
+    def __str__(self):
+        return f"{self.service_id}:{self.start_time}"
+
+    @property
+    def duration_avg(self) -> Union[float, None]:
+        if not self.duration_count:
+            return None
+        return self.duration_sum / self.duration_count
+
+    def add(self, timestamp: int, duration: Union[float, None]) -> None:
+        """
+        extend run with one point
+        """
+
+        self.end_time = timestamp
+        self.sample_count += 1
+        if duration is None:
+            return
+        duration = float(duration)
+        self.duration_count += 1
+        self.duration_sum += duration
+        self.duration_min = duration if self.duration_min is None else min(self.duration_min, duration)
+        self.duration_max = duration if self.duration_max is None else max(self.duration_max, duration)
+
+    def expand(self, start_time: int, end_time: int) -> List[ServiceStatus]:
+        """
+        spread points of run evenly between its ends, each point takes the average duration
+        """
+
+        step = (self.end_time - self.start_time) / (self.sample_count - 1) if self.sample_count > 1 else 0
+        duration_avg = self.duration_avg
+        duration_us = None if duration_avg is None else round(duration_avg * 1000)
+        points = []
+        for index in range(self.sample_count):
+            timestamp = self.start_time + round(index * step)
+            if start_time <= timestamp <= end_time:
+                points.append(
+                    ServiceStatus(
+                        service_id=self.service_id, timestamp=timestamp, status=self.status, duration_us=duration_us
+                    )
+                )
+        return points
+
+
+class StatusArchive(BaseModel):
+    """
+    status points of service in one day moved to a compressed columnar file
+    """
+
+    id = models.BigAutoField(verbose_name=gettext_lazy("ID"), primary_key=True)
+    service = ForeignKey(
+        verbose_name=gettext_lazy("Service"),
+        to="service.Service",
+        related_name="status_archive",
+        on_delete=models.CASCADE,
+    )
+    day = models.BigIntegerField(verbose_name=gettext_lazy("Day Start(s)"))
+    path = models.CharField(verbose_name=gettext_lazy("Path"), max_length=MAX_CHAR_LENGTH)
+    point_count = models.IntegerField(verbose_name=gettext_lazy("Point Count"), default=0)
+    updated_at = models.DateTimeField(verbose_name=gettext_lazy("Updated At"), auto_now=True)
+
+    class Meta:
+        verbose_name = gettext_lazy("Status Archive")
+        verbose_name_plural = verbose_name
+        ordering = ["day"]
+        unique_together = [
+            ["service", "day"],
+        ]
+
+    def __str__(self):
+        return f"{self.service_id}:{self.day}"
+
+    @classmethod
+    def archived_days(cls, points: Iterable[Tuple[str, int]]) -> Set[Tuple[str, int]]:
+        """
+        (service_id, day) of points, given as (service_id, timestamp), whose day has an archive
+        """
+
+        days: Dict[str, Set[int]] = defaultdict(set)
+        for service_id, timestamp in points:
+            days[service_id].add(timestamp - timestamp % (60 * 60 * 24))
+        condition = Q()
+        for service_id, values in days.items():
+            condition |= Q(service_id=service_id, day__in=values)
+        if not condition:
+            return set()
+        return set(cls.objects.filter(condition).values_list("service_id", "day"))
+
+
+class ServiceLatestStatus(BaseModel):
+    """
+    latest status of service, upserted on every result write
+    """
+
+    service = models.OneToOneField(
+        verbose_name=gettext_lazy("Service"),
+        to="service.Service",
+        related_name="latest_status",
+        on_delete=models.CASCADE,
+        db_constraint=False,
+        primary_key=True,
+    )
+    timestamp = models.BigIntegerField(verbose_name=gettext_lazy("Timestamp(s)"))
+    status = models.SmallIntegerField(verbose_name=gettext_lazy("Status"), choices=OnlineStatus.choices)
+    status_msg = models.TextField(verbose_name=gettext_lazy("Status Message"), blank=True, null=True)
+    duration = models.DecimalField(
+        verbose_name=gettext_lazy("Duration(ms)"), max_digits=13, decimal_places=3, blank=True, null=True
+    )
+    failure_since = models.BigIntegerField(verbose_name=gettext_lazy("Failure Since(s)"), blank=True, null=True)
+    failure_count = models.IntegerField(verbose_name=gettext_lazy("Consecutive Failures"), default=0)
+
+    class Meta:
+        verbose_name = gettext_lazy("Service Latest Status")
+        verbose_name_plural = verbose_name
+        ordering = ["-timestamp"]
+
+    def __str__(self):
+        return f"{self.service_id}:{self.timestamp}"
+
+    @classmethod
+    def upsert(cls, records: List["ServiceLatestStatus"]) -> None:
+        """
+        insert or update records by service
+        """
+
+        cls.objects.bulk_create(
+            records,
+            update_conflicts=True,
+            # mysql updates on any unique key and rejects a conflict target
+            unique_fields=["service"] if connection.features.supports_update_conflicts_with_target else None,
+            update_fields=["timestamp", "status", "status_msg", "duration", "failure_since", "failure_count"],
+        )
+
+
+class Incident(BaseModel):
+    """
+    outage of service, from the first failed point to the next online point
+    """
+
+    id = models.BigAutoField(verbose_name=gettext_lazy("ID"), primary_key=True)
+    service = ForeignKey(
+        verbose_name=gettext_lazy("Service"), to="service.Service", related_name="incident", on_delete=models.CASCADE
+    )
+    status = models.SmallIntegerField(verbose_name=gettext_lazy("Status"), choices=OnlineStatus.choices)
+    started_at = models.BigIntegerField(verbose_name=gettext_lazy("Started At(s)"))
+    ended_at = models.BigIntegerField(verbose_name=gettext_lazy("Ended At(s)"), blank=True, null=True)
+    failure_count = models.IntegerField(verbose_name=gettext_lazy("Failure Count"), default=0)
+
+    class Meta:
+        verbose_name = gettext_lazy("Incident")
+        verbose_name_plural = verbose_name
+        ordering = ["-started_at"]
+        index_together = [
+            ["service", "started_at"],
+        ]
+
+    def __str__(self):
+        return f"{self.service_id}:{self.started_at}"
+
+
+class ServiceStatusRollup(BaseModel):
+    """
+    service status aggregated by bucket
+    """
+
+    id = models.BigAutoField(verbose_name=gettext_lazy("ID"), primary_key=True)
+    service = ForeignKey(
+        verbose_name=gettext_lazy("Service"),
+        to="service.Service",
+        related_name="status_rollup",
+        on_delete=models.CASCADE,
+    )
+    resolution = models.IntegerField(verbose_name=gettext_lazy("Resolution(s)"), choices=RollupResolution.choices)
+    bucket = models.BigIntegerField(verbose_name=gettext_lazy("Bucket Start(s)"))
+    online_count = models.IntegerField(verbose_name=gettext_lazy("Online Count"), default=0)
+    offline_count = models.IntegerField(verbose_name=gettext_lazy("Offline Count"), default=0)
+    timeout_count = models.IntegerField(verbose_name=gettext_lazy("Timeout Count"), default=0)
+    unknown_count = models.IntegerField(verbose_name=gettext_lazy("Unknown Count"), default=0)
+    sample_count = models.IntegerField(verbose_name=gettext_lazy("Sample Count"), default=0)
+    duration_count = models.IntegerField(verbose_name=gettext_lazy("Duration Count"), default=0)
+    duration_min = models.FloatField(verbose_name=gettext_lazy("Min Duration(ms)"), blank=True, null=True)
+    duration_max = models.FloatField(verbose_name=gettext_lazy("Max Duration(ms)"), blank=True, null=True)
+    duration_sum = models.FloatField(verbose_name=gettext_lazy("Total Duration(ms)"), default=0)
+    duration_sketch = models.JSONField(verbose_name=gettext_lazy("Duration Sketch"), default=dict, blank=True)
+
+    class Meta:
+        verbose_name = gettext_lazy("Service Status Rollup")
+        verbose_name_plural = verbose_name
+        ordering = ["bucket"]
+        unique_together = [
+            ["service", "resolution", "bucket"],
+        ]
+
+    def __str__(self):
+        return f"{self.service_id}:{self.resolution}:{self.bucket}"
+
+    @property
+    def status(self) -> int:
+        """
+        online only when every sample is online, otherwise the most frequent failure
+        """
+
+        if not self.sample_count:
+            return OnlineStatus.UNKNOWN
+        failures = [
+            (self.offline_count, OnlineStatus.OFFLINE),
+            (self.timeout_count, OnlineStatus.TIMEOUT),
+            (self.unknown_count, OnlineStatus.UNKNOWN),
+        ]
+        count, status = max(failures, key=lambda item: item[0])
+        return status if count else OnlineStatus.ONLINE
+
+    @property
+    def sketch(self) -> DurationSketch:
+        return DurationSketch(self.duration_sketch)
+
+    @property
+    def duration_avg(self) -> Union[float, None]:
+        if not self.duration_count:
+            return None
+        return self.duration_sum / self.duration_count
+
+    def merge(self, other: "ServiceStatusRollup") -> None:
+        """
+        fold another bucket of the same service into this one
+        """
+
+        self.online_count += other.online_count
+        self.offline_count += other.offline_count
+        self.timeout_count += other.timeout_count
+        self.unknown_count += other.unknown_count
+        self.sample_count += other.sample_count
+        self.duration_count += other.duration_count
+        self.duration_sum += other.duration_sum
+        for attr, func in [("duration_min", min), ("duration_max", max)]:
+            values = [value for value in [getattr(self, attr), getattr(other, attr)] if value is not None]
+            setattr(self, attr, func(values) if values else None)
+        self.sketch.merge(other.sketch)
+
+    def add(self, status: int, duration: Union[float, None]) -> None:
+        """
+        count one raw status point
+        """
+
+        match status:
+            case OnlineStatus.ONLINE:
+                self.online_count += 1
+            case OnlineStatus.OFFLINE:
+                self.offline_count += 1
+            case OnlineStatus.TIMEOUT:
+                self.timeout_count += 1
+            case _:
+                self.unknown_count += 1
+        self.sample_count += 1
+        if duration is None:
+            return
+        duration = float(duration)
+        self.duration_count += 1
+        self.duration_sum += duration
+        self.duration_min = duration if self.duration_min is None else min(self.duration_min, duration)
+        self.duration_max = duration if self.duration_max is None else max(self.duration_max, duration)
+        DurationSketch(self.duration_sketch).add(duration)
+
+
+class StatusRollupWatermark(BaseModel):
+    """
+    progress of status rollup compaction
+    """
+
+    name = models.CharField(verbose_name=gettext_lazy("Name"), max_length=SHORT_CHAR_LENGTH, primary_key=True)
+    last_id = models.BigIntegerField(verbose_name=gettext_lazy("Last Status ID"), default=0)
+    covered_until = models.BigIntegerField(verbose_name=gettext_lazy("Covered Until(s)"), default=0)
+    settled_id = models.BigIntegerField(verbose_name=gettext_lazy("Settled Status ID"), default=0)
+    observed_id = models.BigIntegerField(verbose_name=gettext_lazy("Observed Status ID"), default=0)
+    observed_at = models.BigIntegerField(verbose_name=gettext_lazy("Observed At(s)"), default=0)
+    updated_at = models.DateTimeField(verbose_name=gettext_lazy("Updated At"), auto_now=True)
+
+    class Meta:
+        verbose_name = gettext_lazy("Status Rollup Watermark")
+        verbose_name_plural = verbose_name
+        ordering = ["name"]
+
+    def __str__(self):
+        return f"{self.name}:{self.last_id}"
+
 
 @dataclass
 class StatusExtra:
@@ -51,6 +509,23 @@ class StatusExtra:
 
     traceback: str = None
     http_response_header: dict = None
+    attempts: List[dict] = None
+
+    @property
+    def is_empty(self) -> bool:
+        return self.traceback is None and self.http_response_header is None and self.attempts is None
+
+
+@dataclass
+class StatusTimings:
+    """
+    phase timings of a check in microseconds, connect includes dns resolution
+    """
+
+    connect_time: int = None
+    tls_time: int = None
+    ttfb_time: int = None
+    body_time: int = None
 
 
 class MonitorConfig(BaseModel):
@@ -82,6 +557,19 @@ class MonitorConfig(BaseModel):
     )
     is_enabled = models.BooleanField(verbose_name=gettext_lazy("Is Enabled"), default=True, db_index=True)
     last_check_time = models.BigIntegerField(verbose_name=gettext_lazy("Last Schedule Time"), default=0)
+    adaptive_interval = models.BooleanField(verbose_name=gettext_lazy("Adaptive Interval"), default=False)
+    adaptive_interval_min = models.IntegerField(
+        verbose_name=gettext_lazy("Adaptive Interval Min (s)"), null=True, blank=True
+    )
+    adaptive_interval_max = models.IntegerField(
+        verbose_name=gettext_lazy("Adaptive Interval Max (s)"), null=True, blank=True
+    )
+    storage_mode = models.CharField(
+        verbose_name=gettext_lazy("Storage Mode"),
+        max_length=SHORT_CHAR_LENGTH,
+        choices=StatusStorageMode.choices,
+        default=StatusStorageMode.RAW,
+    )
 
     updated_by = ForeignKey(
         verbose_name=gettext_lazy("Updated By"),
@@ -90,7 +578,7 @@ class MonitorConfig(BaseModel):
         on_delete=models.PROTECT,
         db_index=True,
     )
-    updated_at = models.DateTimeField(verbose_name=gettext_lazy("Updated At"), auto_now=True)
+    updated_at = models.DateTimeField(verbose_name=gettext_lazy("Updated At"), auto_now=True, db_index=True)
     created_by = ForeignKey(
         verbose_name=gettext_lazy("Created By"),
         to="account.User",
@@ -113,15 +601,53 @@ class MonitorConfig(BaseModel):
     http_check_status_code = models.IntegerField(
         verbose_name=gettext_lazy("HTTP Success Status Code"), null=True, blank=True
     )
+    http_warm_connection = models.BooleanField(verbose_name=gettext_lazy("Warm Connection"), default=False)
+    http_verify_tls = models.BooleanField(verbose_name=gettext_lazy("Verify TLS Certificate"), default=True)
+    http_use_http2 = models.BooleanField(verbose_name=gettext_lazy("Use HTTP/2"), default=False)
 
     class Meta:
         verbose_name = gettext_lazy("Monitor Config")
         verbose_name_plural = verbose_name
         ordering = ["-id"]
 
+    snapshot_fields = [
+        "id",
+        "service_id",
+        "check_type",
+        "check_interval",
+        "check_timeout",
+        "check_retry",
+        "http_method",
+        "http_url",
+        "http_headers",
+        "http_follow_redirect",
+        "http_check_status_code",
+        "http_warm_connection",
+        "http_verify_tls",
+        "http_use_http2",
+    ]
+
+    schedule_fields = ["adaptive_interval", "adaptive_interval_min", "adaptive_interval_max"]
+
     def __str__(self):
         return f"{self.service.name}"
 
+    def to_snapshot(self) -> dict:
+        """
+        serializable config for dispatching without reloading from db
+        """
+
+        return {field: getattr(self, field) for field in self.snapshot_fields}
+
+    @classmethod
+    def from_snapshot(cls, snapshot: dict) -> "MonitorConfig":
+        """
+        build instance from snapshot, fields not in snapshot are deferred
+        """
+
+        fields = [field.attname for field in cls._meta.concrete_fields if field.attname in cls.snapshot_fields]
+        return cls.from_db(None, fields, [snapshot.get(field) for field in fields])
+
     def run(self) -> None:
         handler = CheckType.get_handler(self.check_type)
         handler(monitor_config=self).run()
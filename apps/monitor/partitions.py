@@ -0,0 +1,216 @@
+import datetime
+from dataclasses import dataclass
+from typing import List, Tuple, Union
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from ovinc_client.core.logger import logger
+
+from apps.monitor.models import (
+    ServiceStatus,
+    ServiceStatusExtra,
+    StatusArchive,
+    StatusRollupWatermark,
+)
+from apps.monitor.rollups import DAY_SECONDS, StatusRollupCompactor
+from apps.service.models import Service
+
+# 1970-01-05 is a monday, weekly partitions start on mondays
+PERIOD_EPOCH = 60 * 60 * 24 * 4
+
+
+@dataclass
+class StatusPartition:
+    """
+    range partition of service status, upper bound is None for the catch all partition
+    """
+
+    name: str
+    upper_bound: Union[int, None]
+
+
+class StatusPartitionManager:
+    """
+    keep service status partitioned by timestamp range on mysql, one partition per period
+    """
+
+    history_partition = "p_history"
+    future_partition = "p_future"
+
+    def __init__(self, period: int = None, ahead: int = None, retention_days: int = None) -> None:
+        self.period = period or settings.SVC_STATUS_PARTITION_PERIOD
+        self.ahead = settings.SVC_STATUS_PARTITION_AHEAD if ahead is None else ahead
+        self.retention_days = settings.SVC_STATUS_RAW_RETENTION_DAYS if retention_days is None else retention_days
+        self.table = connection.ops.quote_name(ServiceStatus._meta.db_table)
+        self.column = connection.ops.quote_name("timestamp")
+
+    @property
+    def supported(self) -> bool:
+        """
+        other backends keep the chunked deletes of StatusRollupCompactor.purge
+        """
+
+        return connection.vendor == "mysql"
+
+    def period_start(self, timestamp: int) -> int:
+        return timestamp - (timestamp - PERIOD_EPOCH) % self.period
+
+    def partition_name(self, lower_bound: int) -> str:
+        return "p" + datetime.datetime.fromtimestamp(lower_bound, tz=datetime.timezone.utc).strftime("%Y%m%d")
+
+    def build_future(self, last_bound: int, now: int) -> List[StatusPartition]:
+        """
+        partitions to add after last bound so that the coming periods are covered
+        """
+
+        target = self.period_start(now) + (self.ahead + 1) * self.period
+        partitions = []
+        while last_bound < target:
+            bound = self.period_start(last_bound) + self.period
+            partitions.append(StatusPartition(name=self.partition_name(last_bound), upper_bound=bound))
+            last_bound = bound
+        return partitions
+
+    def load_partitions(self) -> List[StatusPartition]:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT PARTITION_NAME, PARTITION_DESCRIPTION FROM information_schema.PARTITIONS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL "
+                "ORDER BY PARTITION_ORDINAL_POSITION",
+                [ServiceStatus._meta.db_table],
+            )
+            return [
+                StatusPartition(name=name, upper_bound=None if description == "MAXVALUE" else int(description))
+                for name, description in cursor.fetchall()
+            ]
+
+    def init(self) -> List[StatusPartition]:
+        """
+        partition the table in place, rebuilds the table and blocks writes, run it once in a quiet window
+        """
+
+        if self.load_partitions():
+            logger.info("[StatusPartitionManager] Already Partitioned")
+            return []
+        now = int(timezone.now().timestamp())
+        first_bound = self.period_start(now)
+        partitions = [
+            StatusPartition(name=self.history_partition, upper_bound=first_bound),
+            *self.build_future(first_bound, now),
+            StatusPartition(name=self.future_partition, upper_bound=None),
+        ]
+        with connection.cursor() as cursor:
+            # every unique key of a partitioned table must contain the partition column
+            cursor.execute(f"ALTER TABLE {self.table} DROP PRIMARY KEY, ADD PRIMARY KEY (id, {self.column})")
+            cursor.execute(
+                f"ALTER TABLE {self.table} PARTITION BY RANGE ({self.column}) ({self.to_definitions(partitions)})"
+            )
+        logger.info("[StatusPartitionManager] Initialized %s", len(partitions))
+        return partitions
+
+    def rotate(self) -> Tuple[List[StatusPartition], List[StatusPartition]]:
+        """
+        add partitions for coming periods and drop expired ones
+        """
+
+        if not self.supported:
+            logger.info("[StatusPartitionManager] Partitioning Not Supported %s", connection.vendor)
+            return [], []
+        partitions = self.load_partitions()
+        if not partitions:
+            logger.info("[StatusPartitionManager] Not Partitioned")
+            return [], []
+        return self.create_future(partitions), self.drop_expired(partitions)
+
+    def create_future(self, partitions: List[StatusPartition]) -> List[StatusPartition]:
+        """
+        split new periods off the catch all partition, it stays empty so nothing is copied
+        """
+
+        last_bound = max(partition.upper_bound for partition in partitions if partition.upper_bound is not None)
+        created = self.build_future(last_bound, int(timezone.now().timestamp()))
+        if not created:
+            return []
+        definitions = self.to_definitions([*created, StatusPartition(name=self.future_partition, upper_bound=None)])
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"ALTER TABLE {self.table} REORGANIZE PARTITION {self.future_partition} INTO ({definitions})"
+            )
+        logger.info("[StatusPartitionManager] Created %s", [partition.name for partition in created])
+        return created
+
+    def drop_expired(self, partitions: List[StatusPartition]) -> List[StatusPartition]:
+        """
+        drop partitions past retention whose points are all compacted into rollups
+        """
+
+        if not self.retention_days:
+            return []
+        watermark = StatusRollupWatermark.objects.filter(name=StatusRollupCompactor.watermark_name).first()
+        if not watermark:
+            return []
+        cutoff = int(timezone.now().timestamp()) - self.retention_days * DAY_SECONDS
+        expired = []
+        with connection.cursor() as cursor:
+            # keep at least one bounded partition, the catch all one is never dropped
+            for partition in [partition for partition in partitions if partition.upper_bound is not None][:-1]:
+                if partition.upper_bound > cutoff:
+                    break
+                cursor.execute(f"SELECT MAX(id) FROM {self.table} PARTITION ({partition.name})")
+                (max_id,) = cursor.fetchone()
+                if max_id is not None and max_id > watermark.last_id:
+                    logger.info("[StatusPartitionManager] Not Compacted %s", partition.name)
+                    break
+                if settings.SVC_STATUS_ARCHIVE_AFTER_DAYS and not self.is_archived(cursor, partition):
+                    logger.info("[StatusPartitionManager] Not Archived %s", partition.name)
+                    break
+                expired.append(partition)
+            if expired:
+                cursor.execute(
+                    f"ALTER TABLE {self.table} DROP PARTITION {', '.join(partition.name for partition in expired)}"
+                )
+        if expired:
+            # ddl commits on its own, extras left by an interrupted run go with the next drop
+            self.delete_extras(expired[-1].upper_bound)
+        logger.info("[StatusPartitionManager] Dropped %s", [partition.name for partition in expired])
+        return expired
+
+    def is_archived(self, cursor, partition: StatusPartition) -> bool:
+        """
+        every day with points left in partition has an archive
+        """
+
+        cursor.execute(
+            f"SELECT DISTINCT service_id, {self.column} - MOD({self.column}, {DAY_SECONDS}) "
+            f"FROM {self.table} PARTITION ({partition.name})"
+        )
+        days = {(service_id, int(day)) for service_id, day in cursor.fetchall()}
+        return days <= StatusArchive.archived_days(days)
+
+    def delete_extras(self, upper_bound: int) -> int:
+        """
+        delete extras of dropped points, the extra table is not partitioned
+        """
+
+        total = 0
+        for service_id in Service.objects.values_list("id", flat=True):
+            while True:
+                extra_ids = list(
+                    ServiceStatusExtra.objects.filter(service_id=service_id, timestamp__lt=upper_bound).values_list(
+                        "id", flat=True
+                    )[: settings.SVC_STATUS_PURGE_CHUNK_SIZE]
+                )
+                if not extra_ids:
+                    break
+                ServiceStatusExtra.objects.filter(id__in=extra_ids).delete()
+                total += len(extra_ids)
+        logger.info("[StatusPartitionManager] Deleted Extras %s", total)
+        return total
+
+    def to_definitions(self, partitions: List[StatusPartition]) -> str:
+        return ", ".join(
+            f"PARTITION {partition.name} VALUES LESS THAN "
+            f"({'MAXVALUE' if partition.upper_bound is None else partition.upper_bound})"
+            for partition in partitions
+        )
@@ -0,0 +1,406 @@
+import json
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Set, Tuple, Union
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Greatest
+from django_redis import get_redis_connection
+from ovinc_client.core.logger import logger
+from redis.exceptions import ResponseError
+
+from apps.monitor.constants import OnlineStatus
+from apps.monitor.consumers import status_group_name
+from apps.monitor.incidents import IncidentTracker
+from apps.monitor.interning import ValueInterner
+from apps.monitor.lease import DispatchLease
+from apps.monitor.models import (
+    MonitorConfig,
+    ServiceLatestStatus,
+    ServiceStatus,
+    ServiceStatusExtra,
+)
+from apps.monitor.runs import StatusRunTracker
+
+INTERNED_EXTRA_KEYS = ["traceback", "http_response_header"]
+
+# headers changing on every response, identical responses would never share a reference with them,
+# they stay in extra data instead
+VOLATILE_RESPONSE_HEADERS = {
+    "age",
+    "cf-ray",
+    "date",
+    "etag",
+    "expires",
+    "last-modified",
+    "nel",
+    "report-to",
+    "request-id",
+    "server-timing",
+    "set-cookie",
+    "traceparent",
+    "x-amz-cf-id",
+    "x-amz-id-2",
+    "x-amz-request-id",
+    "x-amzn-requestid",
+    "x-amzn-trace-id",
+    "x-cache",
+    "x-correlation-id",
+    "x-request-id",
+    "x-runtime",
+    "x-served-by",
+    "x-timer",
+    "x-trace-id",
+}
+
+
+def split_response_header(header: Union[dict, None]) -> Tuple[Union[dict, None], Union[dict, None]]:
+    """
+    response header as (stable, volatile) parts, an empty part is None
+    """
+
+    stable, volatile = {}, {}
+    for name, value in (header or {}).items():
+        (volatile if name.lower() in VOLATILE_RESPONSE_HEADERS else stable)[name] = value
+    return stable or None, volatile or None
+
+
+def encode_extra(key: str, value: Union[str, dict, None]) -> Union[str, None]:
+    """
+    interned text of extra value, volatile response headers are kept in data instead
+    """
+
+    if key == "http_response_header":
+        value, _ = split_response_header(value)
+    return ValueInterner.encode(value)
+
+
+def build_status_extra(
+    service_id: str, timestamp: int, extra: Union[dict, None], refs: Dict[str, int], status_id: int = None
+) -> Union[ServiceStatusExtra, None]:
+    """
+    split extra into interned references and remaining data, nothing is written when all empty
+    """
+
+    extra = extra or {}
+    ref_ids = {f"{key}_ref_id": refs.get(encode_extra(key, extra.get(key))) for key in INTERNED_EXTRA_KEYS}
+    data = {key: value for key, value in extra.items() if key not in INTERNED_EXTRA_KEYS and value is not None}
+    _, volatile_header = split_response_header(extra.get("http_response_header"))
+    if volatile_header:
+        data[ServiceStatusExtra.volatile_header_key] = volatile_header
+    if not data and not any(ref_ids.values()):
+        return None
+    return ServiceStatusExtra(
+        service_id=service_id, timestamp=timestamp, status_id=status_id, data=data or None, **ref_ids
+    )
+
+
+@dataclass
+class CheckResult:
+    """
+    result of one check
+    """
+
+    monitor_config_id: str
+    service_id: str
+    timestamp: int
+    status: int
+    status_msg: str = ""
+    duration: float = None
+    extra: dict = None
+    timings: dict = field(default_factory=dict)
+    # idempotency key, generated at probe time and kept through the stream
+    result_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+
+    @property
+    def interned_texts(self) -> List[str]:
+        """
+        texts stored by reference
+        """
+
+        extra = self.extra or {}
+        texts = [
+            ValueInterner.encode(self.status_msg),
+            *(encode_extra(key, extra.get(key)) for key in INTERNED_EXTRA_KEYS),
+        ]
+        return [text for text in texts if text]
+
+    def to_status(self, refs: Dict[str, int]) -> ServiceStatus:
+        return ServiceStatus(
+            service_id=self.service_id,
+            timestamp=self.timestamp,
+            result_id=self.result_id,
+            status=self.status,
+            status_msg_ref_id=refs.get(ValueInterner.encode(self.status_msg)),
+            duration_us=None if self.duration is None else round(self.duration * 1000),
+            **self.timings,
+        )
+
+    def to_status_extra(self, refs: Dict[str, int], status_id: int = None) -> Union[ServiceStatusExtra, None]:
+        return build_status_extra(self.service_id, self.timestamp, self.extra, refs, status_id)
+
+    def to_latest_status(self) -> ServiceLatestStatus:
+        return ServiceLatestStatus(
+            service_id=self.service_id,
+            timestamp=self.timestamp,
+            status=self.status,
+            status_msg=self.status_msg,
+            duration=self.duration,
+        )
+
+
+class ResultWriter:
+    """
+    write check results to db in bulk
+    """
+
+    @classmethod
+    def write(cls, results: List[CheckResult]) -> List[CheckResult]:
+        """
+        write results not written yet, return the written ones
+        """
+
+        if not results:
+            return []
+        # interned outside the transaction, a rollback never leaves cached ids of missing rows
+        refs = ValueInterner.intern_many(text for result in results for text in result.interned_texts)
+        with transaction.atomic():
+            # checks dispatched before their config was deleted leave no orphan rows
+            results = cls.exclude_deleted(results)
+            if not results:
+                return []
+            # writers of the same service queue up here, a redelivered result is seen as written
+            cls.lock_services({result.service_id for result in results})
+            results = cls.exclude_written(results)
+            if not results:
+                return []
+            ServiceStatus.objects.bulk_create([result.to_status(refs) for result in results])
+            cls.create_extras(results, refs)
+            cls.update_last_check_time(results)
+            latest_results = cls.update_latest_status(results)
+            cls.update_runs(results)
+            if settings.MONITOR_STATUS_PUSH_ENABLED:
+                transaction.on_commit(lambda: cls.publish(latest_results))
+        return results
+
+    @classmethod
+    def create_extras(cls, results: List[CheckResult], refs: Dict[str, int]) -> None:
+        """
+        extras point to their status by id, bulk create returns no ids on mysql so they are read back by result id
+        """
+
+        extras = {result.result_id: result.to_status_extra(refs) for result in results}
+        extras = {result_id: extra for result_id, extra in extras.items() if extra is not None}
+        if not extras:
+            return
+        for result_id, status_id in ServiceStatus.objects.filter(result_id__in=extras.keys()).values_list(
+            "result_id", "id"
+        ):
+            extras[result_id.hex].status_id = status_id
+        ServiceStatusExtra.objects.bulk_create(extras.values())
+
+    @classmethod
+    def exclude_deleted(cls, results: List[CheckResult]) -> List[CheckResult]:
+        """
+        drop results of configs deleted after dispatch
+        """
+
+        config_ids = set(
+            MonitorConfig.objects.filter(id__in={result.monitor_config_id for result in results}).values_list(
+                "id", flat=True
+            )
+        )
+        return [result for result in results if result.monitor_config_id in config_ids]
+
+    @classmethod
+    def lock_services(cls, service_ids: Set[str]) -> None:
+        """
+        lock latest status rows of services, missing rows are created first so that there is always a row to lock
+        """
+
+        exist_ids = set(
+            ServiceLatestStatus.objects.filter(service_id__in=service_ids).values_list("service_id", flat=True)
+        )
+        ServiceLatestStatus.objects.bulk_create(
+            [
+                ServiceLatestStatus(service_id=service_id, timestamp=0, status=OnlineStatus.UNKNOWN)
+                for service_id in service_ids - exist_ids
+            ],
+            ignore_conflicts=True,
+        )
+        list(ServiceLatestStatus.objects.select_for_update().filter(service_id__in=service_ids).values_list("pk"))
+
+    @classmethod
+    def update_last_check_time(cls, results: List[CheckResult]) -> None:
+        """
+        advance last check time of all configs with one update
+        """
+
+        check_times: Dict[str, int] = {}
+        for result in results:
+            check_times[result.monitor_config_id] = max(check_times.get(result.monitor_config_id, 0), result.timestamp)
+        MonitorConfig.objects.filter(id__in=check_times.keys()).update(
+            last_check_time=Greatest(
+                F("last_check_time"),
+                Case(
+                    *[When(id=config_id, then=Value(check_time)) for config_id, check_time in check_times.items()],
+                    default=F("last_check_time"),
+                    output_field=models.BigIntegerField(),
+                ),
+            )
+        )
+
+    @classmethod
+    def update_latest_status(cls, results: List[CheckResult]) -> List[CheckResult]:
+        """
+        advance latest status and incidents of services, results older than the stored latest are skipped
+        """
+
+        tracker = IncidentTracker()
+        tracker.load({result.service_id for result in results}, lock=True)
+        latest: Dict[str, CheckResult] = {}
+        for result in sorted(results, key=lambda item: item.timestamp):
+            if tracker.feed(result.service_id, result.timestamp, result.status):
+                latest[result.service_id] = result
+        tracker.save()
+        records = []
+        for result in latest.values():
+            record = result.to_latest_status()
+            state = tracker.states[result.service_id]
+            record.failure_since, record.failure_count = state.failure_since, state.failure_count
+            records.append(record)
+        ServiceLatestStatus.upsert(records)
+        return list(latest.values())
+
+    @classmethod
+    def update_runs(cls, results: List[CheckResult]) -> None:
+        """
+        extend status runs of run length services, serialized by the latest status lock of lock_services
+        """
+
+        tracker = StatusRunTracker()
+        tracker.load({result.monitor_config_id for result in results})
+        for result in sorted(results, key=lambda item: item.timestamp):
+            tracker.feed(result.service_id, result.timestamp, result.status, result.duration)
+        tracker.save()
+
+    @classmethod
+    def publish(cls, results: List[CheckResult]) -> None:
+        """
+        push latest status to websocket subscribers, a lost push is recovered by the next check
+        """
+
+        channel_layer = get_channel_layer()
+        if channel_layer is None:
+            return
+        for result in results:
+            try:
+                async_to_sync(channel_layer.group_send)(
+                    status_group_name(result.service_id),
+                    {
+                        "type": "service.status",
+                        "data": {
+                            "service_id": result.service_id,
+                            "timestamp": result.timestamp,
+                            "status": result.status,
+                            "status_msg": result.status_msg,
+                            "duration": result.duration,
+                        },
+                    },
+                )
+            except Exception as err:  # pylint: disable=W0718
+                logger.exception("[ResultWriter] Publish Failed %s %s", result.service_id, err)
+
+    @classmethod
+    def exclude_written(cls, results: List[CheckResult]) -> List[CheckResult]:
+        """
+        drop results already written or repeated, redelivered messages are written only once
+        """
+
+        written = {
+            result_id.hex
+            for result_id in ServiceStatus.objects.filter(
+                result_id__in={result.result_id for result in results}
+            ).values_list("result_id", flat=True)
+        }
+        new_results = []
+        for result in results:
+            if result.result_id in written:
+                continue
+            written.add(result.result_id)
+            new_results.append(result)
+        return new_results
+
+
+class ResultStream:
+    """
+    redis stream buffering check results for write-behind
+    """
+
+    stream_key = "monitor-results"
+    group_name = "monitor-result-consumer"
+
+    def __init__(self) -> None:
+        self.client = get_redis_connection("default")
+
+    def push(self, results: List[CheckResult]) -> None:
+        pipeline = self.client.pipeline(transaction=False)
+        for result in results:
+            pipeline.xadd(self.stream_key, {"data": json.dumps(asdict(result))})
+        pipeline.execute()
+
+    def ensure_group(self) -> None:
+        try:
+            self.client.xgroup_create(self.stream_key, self.group_name, id="0", mkstream=True)
+        except ResponseError as err:
+            if "BUSYGROUP" not in str(err):
+                raise
+
+    def read(self, consumer_name: str) -> List[Tuple[str, CheckResult]]:
+        """
+        claim messages left by dead consumers first, then read new ones
+        """
+
+        _, messages, *_ = self.client.xautoclaim(
+            self.stream_key,
+            self.group_name,
+            consumer_name,
+            min_idle_time=settings.MONITOR_RESULT_CLAIM_IDLE_TIME,
+            count=settings.MONITOR_RESULT_BATCH_SIZE,
+        )
+        if not messages:
+            streams = self.client.xreadgroup(
+                self.group_name,
+                consumer_name,
+                {self.stream_key: ">"},
+                count=settings.MONITOR_RESULT_BATCH_SIZE,
+                block=settings.MONITOR_RESULT_BLOCK_TIME,
+            )
+            messages = streams[0][1] if streams else []
+        return [
+            (message_id, CheckResult(**json.loads(data[b"data"]))) for message_id, data in messages if data is not None
+        ]
+
+    def ack(self, message_ids: List[str]) -> None:
+        if not message_ids:
+            return
+        pipeline = self.client.pipeline(transaction=False)
+        pipeline.xack(self.stream_key, self.group_name, *message_ids)
+        pipeline.xdel(self.stream_key, *message_ids)
+        pipeline.execute()
+
+
+def submit_results(results: List[CheckResult]) -> None:
+    """
+    write results directly or through the stream, then release dispatch leases
+    """
+
+    if settings.MONITOR_RESULT_WRITE_BEHIND:
+        ResultStream().push(results)
+    else:
+        ResultWriter.write(results)
+    DispatchLease.release_many([result.monitor_config_id for result in results])
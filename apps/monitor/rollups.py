@@ -0,0 +1,345 @@
+from typing import Dict, List, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, Q, Sum
+from django.db.models.functions import Mod
+from django.utils import timezone
+from ovinc_client.core.logger import logger
+
+from apps.monitor.constants import OnlineStatus, RollupResolution, StatusStorageMode
+from apps.monitor.models import (
+    MonitorConfig,
+    ServiceStatus,
+    ServiceStatusExtra,
+    ServiceStatusRollup,
+    ServiceStatusRun,
+    StatusArchive,
+    StatusRollupWatermark,
+)
+
+DAY_SECONDS = 60 * 60 * 24
+
+
+class StatusRollupCompactor:
+    """
+    fold raw status points into rollups incrementally, resumable from watermark
+    """
+
+    watermark_name = "service_status"
+
+    def __init__(self, chunk_size: int = None, settle_time: int = None) -> None:
+        self.chunk_size = chunk_size or settings.SVC_STATUS_ROLLUP_CHUNK_SIZE
+        self.settle_time = settings.SVC_STATUS_ROLLUP_SETTLE_TIME if settle_time is None else settle_time
+
+    def run(self) -> int:
+        self.settle()
+        total = 0
+        while True:
+            count = self.compact_chunk()
+            if not count:
+                break
+            total += count
+        logger.info("[StatusRollupCompactor] Compacted %s", total)
+        return total
+
+    @transaction.atomic()
+    def settle(self) -> int:
+        """
+        move the compaction bound to the max id observed settle time ago,
+        a writer holding a lower id has committed or rolled back by then
+        """
+
+        StatusRollupWatermark.objects.get_or_create(name=self.watermark_name)
+        watermark = StatusRollupWatermark.objects.select_for_update().get(name=self.watermark_name)
+        now = int(timezone.now().timestamp())
+        max_id = ServiceStatus.objects.aggregate(max_id=Max("id"))["max_id"] or 0
+        if not self.settle_time:
+            watermark.settled_id = max_id
+        elif now - watermark.observed_at >= self.settle_time:
+            watermark.settled_id = watermark.observed_id
+            watermark.observed_id, watermark.observed_at = max_id, now
+        watermark.save(update_fields=["settled_id", "observed_id", "observed_at", "updated_at"])
+        return watermark.settled_id
+
+    @transaction.atomic()
+    def compact_chunk(self) -> int:
+        """
+        rollups and watermark commit together, a crashed chunk is redone as a whole
+        """
+
+        StatusRollupWatermark.objects.get_or_create(name=self.watermark_name)
+        watermark = StatusRollupWatermark.objects.select_for_update().get(name=self.watermark_name)
+        points = list(
+            ServiceStatus.objects.filter(id__gt=watermark.last_id, id__lte=watermark.settled_id)
+            .order_by("id")
+            .values_list("id", "service_id", "timestamp", "status", "duration_us")[: self.chunk_size]
+        )
+        if not points:
+            return 0
+
+        # aggregate chunk
+        rollups: Dict[Tuple[str, int, int], ServiceStatusRollup] = {}
+        for _, service_id, timestamp, status, duration_us in points:
+            for resolution in RollupResolution.values:
+                key = (service_id, resolution, timestamp - timestamp % resolution)
+                if key not in rollups:
+                    rollups[key] = ServiceStatusRollup(service_id=service_id, resolution=key[1], bucket=key[2])
+                rollups[key].add(status, None if duration_us is None else duration_us / 1000)
+
+        # merge into stored buckets
+        exists = {
+            (rollup.service_id, rollup.resolution, rollup.bucket): rollup
+            for rollup in ServiceStatusRollup.objects.select_for_update().filter(
+                service_id__in={key[0] for key in rollups},
+                bucket__in={key[2] for key in rollups},
+            )
+        }
+        to_update, to_create = [], []
+        for key, rollup in rollups.items():
+            if key not in exists:
+                to_create.append(rollup)
+                continue
+            exist = exists[key]
+            exist.merge(rollup)
+            to_update.append(exist)
+        ServiceStatusRollup.objects.bulk_create(to_create)
+        ServiceStatusRollup.objects.bulk_update(
+            to_update,
+            fields=[
+                "online_count",
+                "offline_count",
+                "timeout_count",
+                "unknown_count",
+                "sample_count",
+                "duration_count",
+                "duration_min",
+                "duration_max",
+                "duration_sum",
+                "duration_sketch",
+            ],
+        )
+
+        # move watermark
+        watermark.last_id = points[-1][0]
+        watermark.covered_until = max(watermark.covered_until, max(point[2] for point in points))
+        watermark.save(update_fields=["last_id", "covered_until", "updated_at"])
+        return len(points)
+
+    def purge(self) -> int:
+        """
+        delete compacted raw points older than retention in small chunks
+        """
+
+        if not settings.SVC_STATUS_RAW_RETENTION_DAYS:
+            return 0
+        watermark = StatusRollupWatermark.objects.filter(name=self.watermark_name).first()
+        if not watermark:
+            return 0
+        cutoff = int(timezone.now().timestamp()) - settings.SVC_STATUS_RAW_RETENTION_DAYS * DAY_SECONDS
+        total, cursor = 0, 0
+        while True:
+            # scan by id from the oldest point, stop at the first chunk without expired points
+            points = list(
+                ServiceStatus.objects.filter(id__gt=cursor, id__lte=watermark.last_id)
+                .order_by("id")
+                .values_list("id", "service_id", "timestamp")[: settings.SVC_STATUS_PURGE_CHUNK_SIZE]
+            )
+            expired = [point for point in points if point[2] < cutoff]
+            if not expired:
+                break
+            if settings.SVC_STATUS_ARCHIVE_AFTER_DAYS:
+                # points of days not archived yet are left for the archiver
+                archived = StatusArchive.archived_days(point[1:] for point in expired)
+                expired = [point for point in expired if (point[1], point[2] - point[2] % DAY_SECONDS) in archived]
+            self.delete_points(expired)
+            total += len(expired)
+            cursor = points[-1][0]
+        logger.info("[StatusRollupCompactor] Purged %s", total)
+        return total
+
+    def purge_runs(self) -> int:
+        """
+        keep a short raw window of run length services, older compacted points are covered by runs
+        """
+
+        watermark = StatusRollupWatermark.objects.filter(name=self.watermark_name).first()
+        if not watermark:
+            return 0
+        cutoff = int(timezone.now().timestamp()) - settings.SVC_STATUS_RUN_RAW_RETENTION_HOURS * 60 * 60
+        total = 0
+        service_ids = MonitorConfig.objects.filter(storage_mode=StatusStorageMode.RUN_LENGTH).values_list(
+            "service_id", flat=True
+        )
+        for service_id in service_ids:
+            # points written before the first run are not covered, keep them
+            first_run = (
+                ServiceStatusRun.objects.filter(service_id=service_id)
+                .order_by("start_time")
+                .values_list("start_time", flat=True)
+                .first()
+            )
+            if first_run is None:
+                continue
+            while True:
+                expired = list(
+                    ServiceStatus.objects.filter(
+                        service_id=service_id,
+                        timestamp__gte=first_run,
+                        timestamp__lt=cutoff,
+                        id__lte=watermark.last_id,
+                    ).values_list("id", "service_id", "timestamp")[: settings.SVC_STATUS_PURGE_CHUNK_SIZE]
+                )
+                if not expired:
+                    break
+                self.delete_points(expired)
+                total += len(expired)
+        logger.info("[StatusRollupCompactor] Purged Runs %s", total)
+        return total
+
+    @classmethod
+    @transaction.atomic()
+    def delete_points(cls, points: List[Tuple[int, str, int]]) -> None:
+        """
+        delete status points given as (id, service_id, timestamp) together with their extras
+        """
+
+        ServiceStatus.objects.filter(id__in=[point[0] for point in points]).delete()
+        ServiceStatusExtra.delete_of_points(points)
+
+
+class StatusRollupQuery:
+    """
+    load bucketed status of service, compacted buckets from rollups and the rest aggregated from raw points
+    """
+
+    def __init__(self, service_id: str, resolution: int, start_time: int, end_time: int) -> None:
+        self.service_id = service_id
+        self.resolution = resolution
+        self.start_time = start_time - start_time % resolution
+        self.end_time = end_time
+
+    @property
+    def boundary(self) -> int:
+        """
+        buckets before boundary are complete in rollups
+        """
+
+        watermark = StatusRollupWatermark.objects.filter(name=StatusRollupCompactor.watermark_name).first()
+        if not watermark:
+            return self.start_time
+        return max(self.start_time, watermark.covered_until - watermark.covered_until % self.resolution)
+
+    def load(self) -> List[ServiceStatusRollup]:
+        boundary = self.boundary
+        rollups = list(
+            ServiceStatusRollup.objects.filter(
+                service_id=self.service_id,
+                resolution=self.resolution,
+                bucket__gte=self.start_time,
+                bucket__lt=min(boundary, self.end_time + 1),
+            ).order_by("bucket")
+        )
+        if boundary <= self.end_time:
+            rollups.extend(self.aggregate_raw(boundary))
+        return rollups
+
+    def aggregate_raw(self, start_time: int) -> List[ServiceStatusRollup]:
+        buckets = (
+            ServiceStatus.objects.filter(service_id=self.service_id, timestamp__range=[start_time, self.end_time])
+            .annotate(bucket=F("timestamp") - Mod("timestamp", self.resolution))
+            .values("bucket")
+            .annotate(
+                online_count=Count("id", filter=Q(status=OnlineStatus.ONLINE)),
+                offline_count=Count("id", filter=Q(status=OnlineStatus.OFFLINE)),
+                timeout_count=Count("id", filter=Q(status=OnlineStatus.TIMEOUT)),
+                unknown_count=Count("id", filter=Q(status=OnlineStatus.UNKNOWN)),
+                sample_count=Count("id"),
+                duration_count=Count("duration_us"),
+                duration_min=Min("duration_us"),
+                duration_max=Max("duration_us"),
+                duration_sum=Sum("duration_us"),
+            )
+            .order_by("bucket")
+        )
+        rollups = []
+        for bucket in buckets:
+            bucket["bucket"] = int(bucket["bucket"])
+            for attr in ["duration_min", "duration_max", "duration_sum"]:
+                bucket[attr] = None if bucket[attr] is None else bucket[attr] / 1000
+            bucket["duration_sum"] = bucket["duration_sum"] or 0
+            rollups.append(ServiceStatusRollup(service_id=self.service_id, resolution=self.resolution, **bucket))
+        return rollups
+
+
+class ServiceSLAQuery:
+    """
+    uptime and duration percentiles over a window, merged from the coarsest rollups covering it
+    """
+
+    quantiles = {"p50": 0.5, "p95": 0.95, "p99": 0.99}
+
+    def __init__(self, service_id: str, window: int, end_time: int) -> None:
+        finest = min(RollupResolution.values)
+        self.service_id = service_id
+        self.window = window
+        self.end_time = end_time
+        self.start_time = end_time - window - (end_time - window) % finest
+
+    def load(self) -> dict:
+        summary = ServiceStatusRollup(service_id=self.service_id, resolution=0, bucket=self.start_time)
+        boundary = self.boundary
+
+        # compacted range from rollups in one query
+        condition = Q()
+        for resolution, start_time, end_time in self.cover(
+            self.start_time, boundary, sorted(RollupResolution.values, reverse=True)
+        ):
+            condition |= Q(resolution=resolution, bucket__gte=start_time, bucket__lt=end_time)
+        if condition:
+            for rollup in ServiceStatusRollup.objects.filter(condition, service_id=self.service_id):
+                summary.merge(rollup)
+
+        # recent points not compacted yet
+        for status, duration_us in ServiceStatus.objects.filter(
+            service_id=self.service_id, timestamp__range=[boundary, self.end_time]
+        ).values_list("status", "duration_us"):
+            summary.add(status, None if duration_us is None else duration_us / 1000)
+
+        sketch = summary.sketch
+        return {
+            "window": self.window,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "uptime": summary.online_count / summary.sample_count * 100 if summary.sample_count else None,
+            "sample_count": summary.sample_count,
+            "online_count": summary.online_count,
+            "duration_avg": summary.duration_avg,
+            **{name: sketch.quantile(quantile) for name, quantile in self.quantiles.items()},
+        }
+
+    @property
+    def boundary(self) -> int:
+        """
+        points before boundary are complete in rollups
+        """
+
+        finest = min(RollupResolution.values)
+        watermark = StatusRollupWatermark.objects.filter(name=StatusRollupCompactor.watermark_name).first()
+        if not watermark:
+            return self.start_time
+        return min(max(self.start_time, watermark.covered_until - watermark.covered_until % finest), self.end_time + 1)
+
+    def cover(self, start_time: int, end_time: int, resolutions: List[int]) -> List[Tuple[int, int, int]]:
+        """
+        split [start_time, end_time) into aligned buckets, coarse in the middle and finer at both edges
+        """
+
+        if start_time >= end_time or not resolutions:
+            return []
+        resolution, *finer = resolutions
+        begin = start_time + (-start_time) % resolution
+        end = end_time - end_time % resolution
+        if begin >= end:
+            return self.cover(start_time, end_time, finer)
+        return [*self.cover(start_time, begin, finer), (resolution, begin, end), *self.cover(end, end_time, finer)]
@@ -0,0 +1,7 @@
+from django.urls import path
+
+from apps.monitor.consumers import ServiceStatusConsumer
+
+websocket_urlpatterns = [
+    path("ws/service_statuses/", ServiceStatusConsumer.as_asgi()),
+]
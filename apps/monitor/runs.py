@@ -0,0 +1,126 @@
+from typing import Dict, Iterable, List, Union
+
+from django.conf import settings
+from django.db.models import Max
+
+from apps.monitor.constants import StatusStorageMode
+from apps.monitor.models import MonitorConfig, ServiceStatus, ServiceStatusRun
+
+
+class StatusRunTracker:
+    """
+    extend or open status runs of run length services from time ordered points
+    """
+
+    def __init__(self) -> None:
+        self.max_gaps: Dict[str, int] = {}
+        self.runs: Dict[str, ServiceStatusRun] = {}
+        self.changed: Dict[int, ServiceStatusRun] = {}
+
+    def load(self, monitor_config_ids: Iterable[str]) -> None:
+        """
+        resume from the last run of each run length service
+        """
+
+        configs = MonitorConfig.objects.filter(
+            id__in=monitor_config_ids, storage_mode=StatusStorageMode.RUN_LENGTH
+        ).values_list("service_id", "check_interval", "adaptive_interval_max")
+        for service_id, check_interval, adaptive_interval_max in configs:
+            # a run never bridges missed checks, expanded points would be made up
+            interval = max(check_interval, adaptive_interval_max or 0)
+            self.max_gaps[service_id] = interval * settings.SVC_STATUS_RUN_MAX_GAP_INTERVALS
+        if not self.max_gaps:
+            return
+        last_ids = (
+            ServiceStatusRun.objects.filter(service_id__in=self.max_gaps.keys())
+            .values("service_id")
+            .annotate(last_id=Max("id"))
+            .values_list("last_id", flat=True)
+        )
+        for run in ServiceStatusRun.objects.filter(id__in=list(last_ids)):
+            self.runs[run.service_id] = run
+
+    def feed(self, service_id: str, timestamp: int, status: int, duration: Union[float, None]) -> bool:
+        """
+        apply one point, points of raw services and points not newer than the run are ignored
+        """
+
+        if service_id not in self.max_gaps:
+            return False
+        run = self.runs.get(service_id)
+        if run is not None and timestamp <= run.end_time:
+            return False
+        if run is None or run.status != status or timestamp - run.end_time > self.max_gaps[service_id]:
+            run = ServiceStatusRun(service_id=service_id, status=status, start_time=timestamp, end_time=timestamp)
+            self.runs[service_id] = run
+        run.add(timestamp, duration)
+        self.changed[id(run)] = run
+        return True
+
+    def save(self) -> List[ServiceStatusRun]:
+        """
+        write changed runs
+        """
+
+        runs = list(self.changed.values())
+        ServiceStatusRun.objects.bulk_create([run for run in runs if run._state.adding])
+        ServiceStatusRun.objects.bulk_update(
+            [run for run in runs if not run._state.adding],
+            fields=["end_time", "sample_count", "duration_count", "duration_min", "duration_max", "duration_sum"],
+        )
+        self.changed = {}
+        return runs
+
+
+class ServiceStatusRunQuery:
+    """
+    status of service within range, runs stand in for raw points purged from the sliding window
+    """
+
+    def __init__(self, service_id: str, start_time: int, end_time: int) -> None:
+        self.service_id = service_id
+        self.start_time = start_time
+        self.end_time = end_time
+
+    def load_expand_until(self) -> Union[int, None]:
+        """
+        points up to this time come from runs, None when the range has no purged points
+        """
+
+        first_run = (
+            ServiceStatusRun.objects.filter(service_id=self.service_id)
+            .order_by("start_time")
+            .values_list("start_time", flat=True)
+            .first()
+        )
+        if first_run is None or first_run > self.end_time:
+            return None
+        # raw points are purged from the first run on, the oldest point left marks the window
+        raw_from = (
+            ServiceStatus.objects.filter(service_id=self.service_id, timestamp__gte=first_run)
+            .order_by("timestamp")
+            .values_list("timestamp", flat=True)
+            .first()
+        )
+        if raw_from is not None and raw_from <= self.start_time:
+            return None
+        return self.end_time if raw_from is None else min(raw_from - 1, self.end_time)
+
+    def load_runs(self, end_time: int = None) -> List[ServiceStatusRun]:
+        return list(
+            ServiceStatusRun.objects.filter(
+                service_id=self.service_id,
+                start_time__lte=self.end_time if end_time is None else end_time,
+                end_time__gte=self.start_time,
+            ).order_by("start_time")
+        )
+
+    def load_points(self, expand_until: int) -> List[ServiceStatus]:
+        """
+        points of runs before the raw window
+        """
+
+        points = []
+        for run in self.load_runs(end_time=expand_until):
+            points.extend(run.expand(self.start_time, expand_until))
+        return points
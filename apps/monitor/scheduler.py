@@ -0,0 +1,265 @@
+import datetime
+import heapq
+import math
+import zlib
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Tuple, Union
+
+from django.conf import settings
+from ovinc_client.core.logger import logger
+
+from apps.monitor.constants import OnlineStatus
+from apps.monitor.coordinator import ConfigDeleteFeed
+from apps.monitor.models import MonitorConfig, ServiceLatestStatus
+
+
+@dataclass
+class ScheduleEntry:
+    """
+    scheduled monitor config
+    """
+
+    id: str
+    service_id: str
+    service_name: str
+    check_interval: int
+    check_timeout: int
+    check_retry: int
+    snapshot: dict
+    schedule: dict
+    next_run_time: float
+    last_dispatch_time: float = 0
+    version: int = 0
+    interval: int = 0
+    last_status: Union[int, None] = None
+    last_status_time: int = 0
+
+    @property
+    def interval_range(self) -> Union[Tuple[int, int], None]:
+        """
+        bounds of adaptive interval, None for fixed interval
+        """
+
+        if not self.schedule["adaptive_interval"]:
+            return None
+        return (
+            self.schedule["adaptive_interval_min"] or self.check_interval,
+            self.schedule["adaptive_interval_max"] or self.check_interval,
+        )
+
+
+class MonitorScheduler:
+    """
+    in-memory priority queue of monitor configs keyed by next run time
+    """
+
+    sync_fields = [
+        *MonitorConfig.snapshot_fields,
+        *MonitorConfig.schedule_fields,
+        "is_enabled",
+        "last_check_time",
+        "updated_at",
+        "service__name",
+    ]
+
+    def __init__(self, owns: Callable[[str], bool] = None, delete_feed: ConfigDeleteFeed = None) -> None:
+        # configs of other scheduler replicas are not loaded
+        self.owns = owns or (lambda config_id: True)
+        self.delete_feed = delete_feed
+        self.entries: Dict[str, ScheduleEntry] = {}
+        self.queue: List[Tuple[float, int, str]] = []
+        self.watermark: Union[datetime.datetime, None] = None
+        self.last_full_sync_time = 0
+        self.status_watermark = 0
+        self._version = 0
+
+    def sync(self, now: float) -> None:
+        """
+        apply changed and deleted configs, reload everything periodically as a safety net
+        """
+
+        if self.watermark is None or now - self.last_full_sync_time >= settings.MONITOR_SCHEDULER_FULL_SYNC_INTERVAL:
+            self.full_sync(now)
+        else:
+            self.incremental_sync(now)
+        self.observe_status()
+
+    def full_sync(self, now: float) -> None:
+        """
+        reload all enabled configs
+        """
+
+        configs = MonitorConfig.objects.filter(is_enabled=True).values(*self.sync_fields)
+        exist_ids = set()
+        for config in configs:
+            if not self.owns(config["id"]):
+                self.track_watermark(config)
+                continue
+            exist_ids.add(config["id"])
+            self.upsert(config, now)
+        for config_id in set(self.entries.keys()) - exist_ids:
+            self.remove(config_id)
+        self.last_full_sync_time = now
+        logger.info("[Scheduler] Full Sync %s", len(self.entries))
+
+    def incremental_sync(self, now: float) -> None:
+        """
+        load configs updated since watermark, drop configs deleted since the last full sync
+        """
+
+        configs = MonitorConfig.objects.filter(updated_at__gte=self.watermark).values(*self.sync_fields)
+        for config in configs:
+            if config["is_enabled"] and self.owns(config["id"]):
+                self.upsert(config, now)
+            else:
+                self.track_watermark(config)
+                self.remove(config["id"])
+        if self.delete_feed is None:
+            self.delete_feed = ConfigDeleteFeed()
+        # deletes are kept for two full sync intervals, looking one back covers clock skew between hosts
+        for config_id in self.delete_feed.load(
+            self.last_full_sync_time - settings.MONITOR_SCHEDULER_FULL_SYNC_INTERVAL
+        ):
+            self.remove(config_id)
+
+    def track_watermark(self, config: dict) -> None:
+        if self.watermark is None or config["updated_at"] > self.watermark:
+            self.watermark = config["updated_at"]
+
+    def upsert(self, config: dict, now: float) -> None:
+        """
+        add or replace config in queue
+        """
+
+        self.track_watermark(config)
+        entry = self.entries.get(config["id"])
+        last_dispatch_time = entry.last_dispatch_time if entry else 0
+        snapshot = {field: config[field] for field in MonitorConfig.snapshot_fields}
+        schedule = {field: config[field] for field in MonitorConfig.schedule_fields}
+        if (
+            entry
+            and entry.snapshot == snapshot
+            and entry.schedule == schedule
+            and entry.service_name == config["service__name"]
+        ):
+            return
+        self._version += 1
+        new_entry = ScheduleEntry(
+            id=config["id"],
+            service_id=config["service_id"],
+            service_name=config["service__name"],
+            check_interval=config["check_interval"],
+            check_timeout=config["check_timeout"],
+            check_retry=config["check_retry"],
+            snapshot=snapshot,
+            schedule=schedule,
+            next_run_time=0,
+            last_dispatch_time=last_dispatch_time,
+            version=self._version,
+            interval=config["check_interval"],
+        )
+        if entry:
+            new_entry.last_status, new_entry.last_status_time = entry.last_status, entry.last_status_time
+            # adaptive state survives edits of other fields
+            if new_entry.interval_range and entry.check_interval == new_entry.check_interval:
+                new_entry.interval = entry.interval
+        entry = new_entry
+        if entry.interval_range:
+            entry.interval = min(max(entry.interval, entry.interval_range[0]), entry.interval_range[1])
+        # never closer than one interval to the last check or dispatch,
+        # configs never checked start at their next slot, a bulk import spreads over one interval
+        last_run_time = max(config["last_check_time"], math.floor(last_dispatch_time))
+        entry.next_run_time = self.align(entry, last_run_time + entry.interval if last_run_time else now)
+        self.entries[entry.id] = entry
+        heapq.heappush(self.queue, (entry.next_run_time, entry.version, entry.id))
+
+    def observe_status(self) -> None:
+        """
+        shorten adaptive interval on failure or status change, lengthen it gradually while stable
+        """
+
+        entries = {entry.service_id: entry for entry in self.entries.values() if entry.interval_range}
+        if not entries:
+            return
+        # results may land late, look back a little and skip what was seen
+        records = ServiceLatestStatus.objects.filter(
+            service_id__in=entries.keys(), timestamp__gt=self.status_watermark - settings.MONITOR_ADAPTIVE_STATUS_LAG
+        ).values_list("service_id", "timestamp", "status")
+        for service_id, timestamp, status in records:
+            self.status_watermark = max(self.status_watermark, timestamp)
+            entry = entries[service_id]
+            if timestamp <= entry.last_status_time:
+                continue
+            changed = entry.last_status is not None and entry.last_status != status
+            entry.last_status, entry.last_status_time = status, timestamp
+            interval_min, interval_max = entry.interval_range
+            if not changed and status == OnlineStatus.ONLINE:
+                entry.interval = min(interval_max, int(entry.interval * settings.MONITOR_ADAPTIVE_INTERVAL_GROWTH))
+                continue
+            entry.interval = interval_min
+            next_run_time = self.align(entry, timestamp + entry.interval)
+            if entry.next_run_time > next_run_time:
+                self.postpone(entry, next_run_time)
+                logger.info("[Scheduler] Adaptive Interval %s %s", entry.service_name, entry.interval)
+
+    def remove(self, config_id: str) -> None:
+        """
+        drop config, stale queue items are skipped when popped
+        """
+
+        self.entries.pop(config_id, None)
+
+    def align(self, entry: ScheduleEntry, earliest: float) -> int:
+        """
+        first run time not before earliest in the phase of config, a stable hash of id spreads configs over interval
+        """
+
+        phase = zlib.crc32(entry.id.encode()) % entry.interval
+        earliest = math.ceil(earliest)
+        return earliest + (phase - earliest) % entry.interval
+
+    def pop_due(self, now: float, limit: int = None) -> List[ScheduleEntry]:
+        """
+        pop configs whose next run time has passed, at most limit configs
+        """
+
+        due_entries = []
+        while self.queue and self.queue[0][0] <= now and (not limit or len(due_entries) < limit):
+            _, version, config_id = heapq.heappop(self.queue)
+            entry = self.entries.get(config_id)
+            if entry is None or entry.version != version:
+                continue
+            due_entries.append(entry)
+        return due_entries
+
+    def reschedule(self, entry: ScheduleEntry, now: float) -> None:
+        """
+        push dispatched config back with next run time
+        """
+
+        entry.last_dispatch_time = now
+        # keep the phase, a late tick skips to the next slot at least one interval away
+        self.postpone(entry, self.align(entry, max(entry.next_run_time, math.floor(now)) + entry.interval))
+
+    def postpone(self, entry: ScheduleEntry, next_run_time: float) -> None:
+        """
+        push config back without dispatching
+        """
+
+        self._version += 1
+        entry.next_run_time = next_run_time
+        entry.version = self._version
+        heapq.heappush(self.queue, (entry.next_run_time, entry.version, entry.id))
+
+    def next_wakeup(self, now: float) -> float:
+        """
+        seconds until the earliest queued config is due
+        """
+
+        while self.queue:
+            next_run_time, version, config_id = self.queue[0]
+            entry = self.entries.get(config_id)
+            if entry is not None and entry.version == version:
+                return next_run_time - now
+            heapq.heappop(self.queue)
+        return settings.MONITOR_CHECK_MAX_SLEEP_TIME
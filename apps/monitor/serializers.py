@@ -3,8 +3,15 @@ from django.conf import settings
 from django.utils.translation import gettext, gettext_lazy
 from rest_framework import serializers
 
-from apps.monitor.constants import HTTPMethod
-from apps.monitor.models import MonitorConfig, ServiceStatus
+from apps.monitor.constants import (
+    HTTPMethod,
+    RollupResolution,
+    SLAWindow,
+    StatusLayout,
+    StatusStorageMode,
+    StatusSubscribeAction,
+)
+from apps.monitor.models import Incident, MonitorConfig, ServiceStatus, ServiceStatusRun
 
 
 # pylint: disable=R0901
@@ -49,10 +56,47 @@ class MonitorConfigBaseSerializer(ModelSerializer):
         min_value=settings.MONITOR_CHECK_RETRY_MIN,
         max_value=settings.MONITOR_CHECK_RETRY_MAX,
     )
+    adaptive_interval = serializers.BooleanField(label=gettext_lazy("Adaptive Interval"), default=False)
+    adaptive_interval_min = serializers.IntegerField(
+        label=gettext_lazy("Adaptive Interval Min (s)"),
+        min_value=settings.MONITOR_CHECK_INTERVAL_MIN,
+        max_value=settings.MONITOR_CHECK_INTERVAL_MAX,
+        required=False,
+        allow_null=True,
+    )
+    adaptive_interval_max = serializers.IntegerField(
+        label=gettext_lazy("Adaptive Interval Max (s)"),
+        min_value=settings.MONITOR_CHECK_INTERVAL_MIN,
+        max_value=settings.MONITOR_CHECK_INTERVAL_MAX,
+        required=False,
+        allow_null=True,
+    )
+    storage_mode = serializers.ChoiceField(
+        label=gettext_lazy("Storage Mode"), choices=StatusStorageMode.choices, default=StatusStorageMode.RAW
+    )
 
     class Meta:
         model = MonitorConfig
-        fields = ["service_id", "check_type", "check_interval", "check_timeout", "check_retry", "is_enabled"]
+        fields = [
+            "service_id",
+            "check_type",
+            "check_interval",
+            "check_timeout",
+            "check_retry",
+            "is_enabled",
+            "adaptive_interval",
+            "adaptive_interval_min",
+            "adaptive_interval_max",
+            "storage_mode",
+        ]
+
+    def validate(self, attrs: dict) -> dict:
+        data = super().validate(attrs)
+        interval_min = data.get("adaptive_interval_min") or data["check_interval"]
+        interval_max = data.get("adaptive_interval_max") or data["check_interval"]
+        if data.get("adaptive_interval") and interval_min > interval_max:
+            raise serializers.ValidationError(gettext("adaptive interval min is greater than max"))
+        return data
 
 
 # pylint: disable=R0901
@@ -64,6 +108,9 @@ class HTTPMonitorConfigSerializer(MonitorConfigBaseSerializer):
     )
     http_follow_redirect = serializers.BooleanField(label=gettext_lazy("Follow Redirect"))
     http_check_status_code = serializers.IntegerField(label=gettext_lazy("HTTP Success Status Code"))
+    http_warm_connection = serializers.BooleanField(label=gettext_lazy("Warm Connection"), default=False)
+    http_verify_tls = serializers.BooleanField(label=gettext_lazy("Verify TLS Certificate"), default=True)
+    http_use_http2 = serializers.BooleanField(label=gettext_lazy("Use HTTP/2"), default=False)
 
     class Meta:
         model = MonitorConfig
@@ -74,31 +121,158 @@ class HTTPMonitorConfigSerializer(MonitorConfigBaseSerializer):
             "http_headers",
             "http_follow_redirect",
             "http_check_status_code",
+            "http_warm_connection",
+            "http_verify_tls",
+            "http_use_http2",
         ]
 
 
 class ListServiceStatusSerializer(Serializer):
     start_time = serializers.IntegerField(label=gettext_lazy("Start Time"))
     end_time = serializers.IntegerField(label=gettext_lazy("End Time"))
+    with_timings = serializers.BooleanField(label=gettext_lazy("With Phase Timings"), default=False)
+    resolution = serializers.ChoiceField(
+        label=gettext_lazy("Resolution(s)"), choices=RollupResolution.choices, required=False, allow_null=True
+    )
+    max_points = serializers.IntegerField(
+        label=gettext_lazy("Max Points"),
+        min_value=1,
+        max_value=settings.SVC_STATUS_MAX_POINTS,
+        required=False,
+        allow_null=True,
+    )
+    layout = serializers.ChoiceField(
+        label=gettext_lazy("Layout"), choices=StatusLayout.choices, default=StatusLayout.ROWS
+    )
+    after_timestamp = serializers.IntegerField(label=gettext_lazy("After Timestamp"), required=False, allow_null=True)
+    after_id = serializers.IntegerField(label=gettext_lazy("After ID"), required=False, allow_null=True)
+
+    def validate(self, attrs: dict) -> dict:
+        data = super().validate(attrs)
+        # bucketed response has bounded size, allow a longer range
+        max_days = (
+            settings.SVC_STATUS_MAX_ROLLUP_TIME_RANGE_DAYS
+            if data.get("resolution") or data.get("max_points")
+            else settings.SVC_STATUS_MAX_TIME_RANGE_DAYS
+        )
+        if data["end_time"] - data["start_time"] > (max_days * 60 * 60 * 24):
+            raise serializers.ValidationError(gettext("time range longer than %d days") % max_days)
+        if data.get("after_timestamp") is not None and (data.get("resolution") or data.get("max_points")):
+            raise serializers.ValidationError(gettext("after_timestamp cannot be used with bucketed points"))
+        if data.get("after_timestamp") is not None and data["layout"] == StatusLayout.RUNS:
+            raise serializers.ValidationError(gettext("after_timestamp cannot be used with runs"))
+        if data.get("after_id") is not None and data.get("after_timestamp") is None:
+            raise serializers.ValidationError(gettext("after_id requires after_timestamp"))
+        return data
+
+
+class BatchServiceStatusSerializer(Serializer):
+    service_ids = serializers.ListField(
+        label=gettext_lazy("Service IDs"),
+        child=serializers.CharField(),
+        required=False,
+        allow_empty=True,
+        max_length=settings.SVC_STATUS_BATCH_MAX_SERVICES,
+    )
+    start_time = serializers.IntegerField(label=gettext_lazy("Start Time"))
+    end_time = serializers.IntegerField(label=gettext_lazy("End Time"))
+
+    def validate(self, attrs: dict) -> dict:
+        data = super().validate(attrs)
+        max_days = settings.SVC_STATUS_BATCH_MAX_TIME_RANGE_DAYS
+        if data["end_time"] - data["start_time"] > (max_days * 60 * 60 * 24):
+            raise serializers.ValidationError(gettext("time range longer than %d days") % max_days)
+        return data
+
+
+class ServiceSLASerializer(Serializer):
+    windows = serializers.ListField(
+        label=gettext_lazy("SLA Windows"),
+        child=serializers.ChoiceField(choices=SLAWindow.choices),
+        required=False,
+        default=SLAWindow.values,
+    )
+
+
+class ListIncidentSerializer(Serializer):
+    start_time = serializers.IntegerField(label=gettext_lazy("Start Time"))
+    end_time = serializers.IntegerField(label=gettext_lazy("End Time"))
 
     def validate(self, attrs: dict) -> dict:
         data = super().validate(attrs)
-        if data["end_time"] - data["start_time"] > (settings.SVC_STATUS_MAX_TIME_RANGE_DAYS * 60 * 60 * 24):
-            raise serializers.ValidationError(
-                gettext("time range longer than %d days") % settings.SVC_STATUS_MAX_TIME_RANGE_DAYS
-            )
+        max_days = settings.SVC_STATUS_MAX_ROLLUP_TIME_RANGE_DAYS
+        if data["end_time"] - data["start_time"] > (max_days * 60 * 60 * 24):
+            raise serializers.ValidationError(gettext("time range longer than %d days") % max_days)
         return data
 
 
+class IncidentListSerializer(ModelSerializer):
+    class Meta:
+        model = Incident
+        fields = ["id", "status", "started_at", "ended_at", "failure_count"]
+
+
+class StatusMessageField(serializers.CharField):
+    """
+    message is only loaded for superusers, points read back from runs and archives have no pk
+    """
+
+    def get_attribute(self, instance: ServiceStatus) -> str:
+        if not self.context.get("is_superuser", False):
+            return ""
+        return instance.status_msg
+
+    async def ato_representation(self, value: str) -> str:
+        return self.to_representation(value)
+
+
 class ServiceStatusListSerializer(ModelSerializer):
+    status_msg = StatusMessageField()
     duration = serializers.FloatField()
 
     class Meta:
         model = ServiceStatus
         fields = ["timestamp", "status", "status_msg", "duration"]
 
-    async def ato_representation(self, instance: ServiceStatus) -> dict:
-        data = await super().ato_representation(instance)
-        if not self.context.get("is_superuser", False):
-            data["status_msg"] = ""
-        return data
+
+class ServiceStatusTimingListSerializer(ServiceStatusListSerializer):
+    class Meta:
+        model = ServiceStatus
+        fields = [
+            *ServiceStatusListSerializer.Meta.fields,
+            "connect_time",
+            "tls_time",
+            "ttfb_time",
+            "body_time",
+        ]
+
+
+class ServiceStatusRunSerializer(ModelSerializer):
+    duration_avg = serializers.FloatField()
+
+    class Meta:
+        model = ServiceStatusRun
+        fields = ["status", "start_time", "end_time", "sample_count", "duration_avg", "duration_min", "duration_max"]
+
+
+class ServiceStatusRollupSerializer(Serializer):
+    timestamp = serializers.IntegerField(source="bucket")
+    status = serializers.IntegerField()
+    duration = serializers.FloatField(source="duration_avg")
+    duration_min = serializers.FloatField()
+    duration_max = serializers.FloatField()
+    sample_count = serializers.IntegerField()
+    online_count = serializers.IntegerField()
+    offline_count = serializers.IntegerField()
+    timeout_count = serializers.IntegerField()
+    unknown_count = serializers.IntegerField()
+
+
+class SubscribeServiceStatusSerializer(Serializer):
+    action = serializers.ChoiceField(label=gettext_lazy("Action"), choices=StatusSubscribeAction.choices)
+    service_ids = serializers.ListField(
+        label=gettext_lazy("Service IDs"),
+        child=serializers.CharField(),
+        min_length=1,
+        max_length=settings.MONITOR_STATUS_PUSH_MAX_SUBSCRIPTIONS,
+    )
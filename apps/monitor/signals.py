@@ -0,0 +1,18 @@
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from apps.monitor.coordinator import ConfigDeleteFeed
+from apps.monitor.models import MonitorConfig
+
+
+@receiver(post_delete, sender=MonitorConfig)
+def publish_config_delete(sender, instance: MonitorConfig, **kwargs) -> None:
+    """
+    schedulers drop deleted configs on their next tick, deleted services cascade here too
+    """
+
+    # the instance loses its pk once deleted
+    config_id = instance.id
+    transaction.on_commit(lambda: ConfigDeleteFeed().publish([config_id], timezone.now().timestamp()))
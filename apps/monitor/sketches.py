@@ -0,0 +1,51 @@
+import math
+from typing import Dict, Union
+
+from django.conf import settings
+
+
+class DurationSketch:
+    """
+    mergeable log-bucket histogram of durations, quantiles keep a bounded relative error
+    """
+
+    min_value = 1e-3
+
+    def __init__(self, bins: Dict[str, int] = None) -> None:
+        # bins are updated in place so the sketch can wrap a model json field
+        self.bins = {} if bins is None else bins
+        self.gamma = (1 + settings.SVC_STATUS_SKETCH_RELATIVE_ACCURACY) / (
+            1 - settings.SVC_STATUS_SKETCH_RELATIVE_ACCURACY
+        )
+        self.log_gamma = math.log(self.gamma)
+
+    @property
+    def count(self) -> int:
+        return sum(self.bins.values())
+
+    def index(self, value: float) -> int:
+        return math.ceil(math.log(max(value, self.min_value)) / self.log_gamma)
+
+    def add(self, value: float, count: int = 1) -> None:
+        key = str(self.index(value))
+        self.bins[key] = self.bins.get(key, 0) + count
+
+    def merge(self, other: "DurationSketch") -> None:
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+
+    def quantile(self, quantile: float) -> Union[float, None]:
+        """
+        value at quantile, None when empty
+        """
+
+        total = self.count
+        if not total:
+            return None
+        rank = quantile * (total - 1)
+        seen = 0
+        for index in sorted(int(key) for key in self.bins):
+            seen += self.bins[str(index)]
+            if seen > rank:
+                return 2 * self.gamma**index / (self.gamma + 1)
+        return None
@@ -0,0 +1,55 @@
+import itertools
+import json
+import zlib
+from typing import AsyncIterator, Dict, Iterable, List
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import QuerySet
+
+
+class ColumnarStatusStream:
+    """
+    stream status points as a list of frames, each frame holds one chunk of rows as parallel json arrays
+    """
+
+    def __init__(self, queryset: QuerySet, columns: Dict[str, str], trace: str = None) -> None:
+        self.queryset = queryset
+        self.columns = columns
+        self.trace = trace
+        self.chunk_size = settings.SVC_STATUS_STREAM_CHUNK_SIZE
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        # one pass, columns of a frame always come from the same rows
+        rows = self.queryset.order_by("timestamp", "id").values_list(*self.columns.values())
+        # values_list breaks aiterator on django 4.2, chunks are pulled in the db thread instead
+        iterator = rows.iterator(chunk_size=self.chunk_size)
+        fetch = sync_to_async(lambda: list(itertools.islice(iterator, self.chunk_size)))
+        yield b'{"message": "success", "data": ['
+        first = True
+        while chunk := await fetch():
+            yield self.encode_frame(chunk, first)
+            first = False
+        yield f"], {json.dumps('trace')}: {json.dumps(self.trace)}}}".encode()
+
+    def encode_frame(self, rows: List[tuple], first: bool) -> bytes:
+        return ("" if first else ", ").encode() + json.dumps(
+            to_frame(self.columns.keys(), rows), ensure_ascii=False
+        ).encode()
+
+
+def to_frame(names: Iterable[str], rows: List[tuple]) -> Dict[str, list]:
+    """
+    rows as parallel arrays keyed by column name
+    """
+
+    return {name: [row[index] for row in rows] for index, name in enumerate(names)}
+
+
+async def gzip_stream(stream: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    async for chunk in stream:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,44 @@
+from django.test import TestCase, TransactionTestCase, override_settings
+from ovinc_client.account.models import User
+
+from apps.monitor.constants import CheckType
+from apps.monitor.models import MonitorConfig
+from apps.service.models import Service
+
+
+class MonitorFixtureMixin:
+    """
+    one superuser with one http service and its monitor config
+    """
+
+    @classmethod
+    def create_monitor(cls) -> None:
+        cls.user = User.objects.create(username="admin", is_superuser=True)
+        cls.service = Service.objects.create(name="service", is_public=True, updated_by=cls.user, created_by=cls.user)
+        cls.config = MonitorConfig.objects.create(
+            service=cls.service,
+            check_type=CheckType.HTTP,
+            check_interval=60,
+            http_method="GET",
+            http_url="https://example.com",
+            http_check_status_code=200,
+            updated_by=cls.user,
+            created_by=cls.user,
+        )
+
+
+@override_settings(MONITOR_STATUS_PUSH_ENABLED=False)
+class MonitorTestCase(MonitorFixtureMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.create_monitor()
+
+
+@override_settings(MONITOR_STATUS_PUSH_ENABLED=False)
+class MonitorTransactionTestCase(MonitorFixtureMixin, TransactionTestCase):
+    """
+    for code writing from other threads, such as the probe engine
+    """
+
+    def setUp(self):
+        self.create_monitor()
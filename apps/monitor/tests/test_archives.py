@@ -0,0 +1,94 @@
+import json
+import shutil
+import tempfile
+
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.monitor.archives import StatusArchiveQuery, StatusArchiver
+from apps.monitor.constants import OnlineStatus
+from apps.monitor.models import ServiceStatus, StatusArchive
+from apps.monitor.results import CheckResult, ResultWriter
+from apps.monitor.rollups import DAY_SECONDS, StatusRollupCompactor
+from apps.monitor.tests.base import MonitorTestCase
+
+
+class StatusArchiveTest(MonitorTestCase):
+    def setUp(self):
+        self.location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.location)
+        storages = override_settings(
+            STORAGES={
+                "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+                "status_archive": {
+                    "BACKEND": "django.core.files.storage.FileSystemStorage",
+                    "OPTIONS": {"location": self.location},
+                },
+            }
+        )
+        storages.enable()
+        self.addCleanup(storages.disable)
+
+        now = int(timezone.now().timestamp())
+        self.day = now - now % DAY_SECONDS - 3 * DAY_SECONDS
+        # two checks within the same second are both kept
+        timestamps = [self.day + index * 300 for index in range(12)] + [self.day + 300]
+        ResultWriter.write(
+            [
+                CheckResult(
+                    monitor_config_id=self.config.id,
+                    service_id=self.service.id,
+                    timestamp=timestamp,
+                    status=index % 2,
+                    status_msg=f"msg {index % 3}",
+                    duration=float(index),
+                )
+                for index, timestamp in enumerate(timestamps)
+            ]
+        )
+        self.start_time, self.end_time = self.day, self.day + DAY_SECONDS - 1
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def load_batch(self) -> dict:
+        response = self.client.post(
+            "/service_statuses/batch/",
+            {"service_ids": [self.service.id], "start_time": self.start_time, "end_time": self.end_time},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content)["data"][self.service.id]
+
+    def test_read_back(self):
+        points = list(
+            ServiceStatus.objects.filter(service_id=self.service.id)
+            .order_by("timestamp", "id")
+            .values_list("timestamp", "status", "status_msg_ref__value")
+        )
+        batch = self.load_batch()
+        self.assertEqual(len(batch["timestamps"]), 13)
+
+        StatusRollupCompactor(settle_time=0).run()
+        self.assertEqual(StatusArchiver(before_days=1).run([self.service.id]), 13)
+        self.assertFalse(ServiceStatus.objects.exists())
+        self.assertEqual(StatusArchive.objects.get(service_id=self.service.id).day, self.day)
+
+        archived = StatusArchiveQuery(self.service.id, self.start_time, self.end_time).load_points(with_status_msg=True)
+        self.assertEqual(
+            [(point.timestamp, point.status, point.status_msg) for point in archived],
+            points,
+        )
+        self.assertEqual(self.load_batch(), batch)
+
+    def test_rerun_keeps_archived_points(self):
+        StatusRollupCompactor(settle_time=0).run()
+        StatusArchiver(before_days=1).run([self.service.id])
+        # a late point of the archived day is merged into the file
+        ServiceStatus.objects.create(
+            service_id=self.service.id, timestamp=self.day + 300, status=OnlineStatus.ONLINE, duration_us=1000
+        )
+        StatusRollupCompactor(settle_time=0).run()
+        self.assertEqual(StatusArchiver(before_days=1).run([self.service.id]), 1)
+        self.assertEqual(StatusArchive.objects.get(service_id=self.service.id).point_count, 14)
+        self.assertEqual(len(self.load_batch()["timestamps"]), 14)
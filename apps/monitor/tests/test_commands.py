@@ -0,0 +1,47 @@
+from django.core.management import call_command
+from django.utils import timezone
+
+from apps.monitor.constants import OnlineStatus
+from apps.monitor.models import ServiceLatestStatus
+from apps.monitor.results import CheckResult, ResultWriter
+from apps.monitor.tests.base import MonitorTestCase
+
+
+class BackfillLatestStatusTest(MonitorTestCase):
+    def setUp(self):
+        now = int(timezone.now().timestamp())
+        self.timestamps = [now - 240, now - 180, now - 120, now - 60]
+        statuses = [OnlineStatus.ONLINE, OnlineStatus.OFFLINE, OnlineStatus.TIMEOUT, OnlineStatus.OFFLINE]
+        for timestamp, status in zip(self.timestamps, statuses):
+            ResultWriter.write(
+                [
+                    CheckResult(
+                        monitor_config_id=self.config.id,
+                        service_id=self.service.id,
+                        timestamp=timestamp,
+                        status=status,
+                    )
+                ]
+            )
+
+    def load_record(self) -> tuple:
+        record = ServiceLatestStatus.objects.get(service_id=self.service.id)
+        return record.timestamp, record.status, record.failure_since, record.failure_count
+
+    def test_current_record_is_kept(self):
+        record = self.load_record()
+        self.assertEqual(record, (self.timestamps[-1], OnlineStatus.OFFLINE, self.timestamps[1], 3))
+        call_command("backfill_latest_status")
+        self.assertEqual(self.load_record(), record)
+
+    def test_newer_record_is_not_overwritten(self):
+        ServiceLatestStatus.objects.filter(service_id=self.service.id).update(
+            timestamp=self.timestamps[-1] + 60, status=OnlineStatus.ONLINE, failure_since=None, failure_count=0
+        )
+        call_command("backfill_latest_status")
+        self.assertEqual(self.load_record(), (self.timestamps[-1] + 60, OnlineStatus.ONLINE, None, 0))
+
+    def test_missing_record_resumes_streak(self):
+        ServiceLatestStatus.objects.all().delete()
+        call_command("backfill_latest_status")
+        self.assertEqual(self.load_record(), (self.timestamps[-1], OnlineStatus.OFFLINE, self.timestamps[1], 3))
@@ -0,0 +1,21 @@
+from channels.testing import WebsocketCommunicator
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from entry.asgi import application
+
+
+class ServiceStatusConsumerOriginTest(SimpleTestCase):
+    async def connect(self, origin: str) -> bool:
+        communicator = WebsocketCommunicator(
+            application, "/ws/service_statuses/", headers=[(b"origin", origin.encode())]
+        )
+        connected, _ = await communicator.connect()
+        await communicator.disconnect()
+        return connected
+
+    async def test_frontend_origin_is_accepted(self):
+        self.assertTrue(await self.connect(settings.FRONTEND_URL))
+
+    async def test_other_origin_is_rejected(self):
+        self.assertFalse(await self.connect("https://evil.example.org"))
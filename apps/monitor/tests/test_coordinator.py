@@ -0,0 +1,74 @@
+import fakeredis
+from django.test import SimpleTestCase, override_settings
+
+from apps.monitor.coordinator import SchedulerCoordinator
+
+
+@override_settings(MONITOR_SCHEDULER_MEMBER_TTL=20)
+class SchedulerCoordinatorTest(SimpleTestCase):
+    shard_count = 4
+
+    def setUp(self):
+        self.client = fakeredis.FakeRedis()
+
+    def join(self, member_id: str) -> SchedulerCoordinator:
+        return SchedulerCoordinator(client=self.client, member_id=member_id, shard_count=self.shard_count)
+
+    def holders(self) -> dict:
+        return {
+            shard: (self.client.get(f"{SchedulerCoordinator.shard_key_prefix}:{shard}") or b"").decode()
+            for shard in range(self.shard_count)
+        }
+
+    def test_single_member_owns_all_shards(self):
+        member = self.join("a")
+        self.assertTrue(member.heartbeat(0))
+        self.assertEqual(member.owned, set(range(self.shard_count)))
+        self.assertFalse(member.heartbeat(5))
+        self.assertTrue(all(member.owns(config_id) for config_id in ["x", "y", "z"]))
+
+    def test_rebalance_on_join(self):
+        first, second = self.join("a"), self.join("b")
+        first.heartbeat(0)
+        # shards of the first member are still leased, the new member waits for them
+        self.assertFalse(second.heartbeat(1))
+        self.assertEqual(second.owned, set())
+        self.assertTrue(first.heartbeat(2))
+        self.assertTrue(second.heartbeat(3))
+        self.assertEqual(first.owned, {0, 2})
+        self.assertEqual(second.owned, {1, 3})
+        self.assertEqual(self.holders(), {0: "a", 1: "b", 2: "a", 3: "b"})
+
+    def test_every_config_has_one_owner(self):
+        members = [self.join(member_id) for member_id in ["a", "b", "c"]]
+        for now in range(3):
+            for member in members:
+                member.heartbeat(now)
+        for config_id in [f"config-{index}" for index in range(50)]:
+            self.assertEqual(sum(member.owns(config_id) for member in members), 1)
+
+    def test_leave_hands_shards_over(self):
+        first, second = self.join("a"), self.join("b")
+        for now in range(3):
+            first.heartbeat(now)
+            second.heartbeat(now)
+        first.leave()
+        self.assertTrue(second.heartbeat(4))
+        self.assertEqual(second.owned, set(range(self.shard_count)))
+
+    def test_expired_member_is_dropped(self):
+        first, second = self.join("a"), self.join("b")
+        for now in range(3):
+            first.heartbeat(now)
+            second.heartbeat(now)
+        # the first member stops heartbeating, its shard leases expire on their own in redis
+        for shard in first.owned:
+            self.client.delete(first.shard_key(shard))
+        self.assertTrue(second.heartbeat(30))
+        self.assertEqual(second.owned, set(range(self.shard_count)))
+
+    def test_release_keeps_lease_of_other_member(self):
+        first, second = self.join("a"), self.join("b")
+        first.heartbeat(0)
+        self.assertFalse(second.release(0))
+        self.assertEqual(self.holders()[0], "a")
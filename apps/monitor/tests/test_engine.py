@@ -0,0 +1,26 @@
+from django.core.cache import cache
+
+from apps.monitor.constants import OnlineStatus
+from apps.monitor.engine import ProbeEngine
+from apps.monitor.lease import DispatchLease
+from apps.monitor.models import ServiceLatestStatus, ServiceStatus
+from apps.monitor.tests.base import MonitorTransactionTestCase
+
+
+class ProbeEngineTest(MonitorTransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_crashed_probe_is_written_and_releases_lease(self):
+        lease = DispatchLease(self.config.id, self.config.check_timeout, self.config.check_retry)
+        self.assertTrue(lease.acquire())
+        # no handler for this type, the probe raises before any check runs
+        self.config.check_type = "unsupported"
+        ProbeEngine(concurrency=1).run([self.config])
+
+        status = ServiceStatus.objects.get(service_id=self.service.id)
+        self.assertEqual(status.status, OnlineStatus.UNKNOWN)
+        self.assertIn("invalid check type", status.status_msg_ref.value)
+        self.assertEqual(ServiceLatestStatus.objects.get(service_id=self.service.id).status, OnlineStatus.UNKNOWN)
+        self.assertTrue(lease.acquire())
@@ -0,0 +1,70 @@
+from unittest import mock
+
+import httpx
+from django.test import SimpleTestCase, override_settings
+
+from apps.monitor.constants import OnlineStatus
+from apps.monitor.handlers.base import BaseHandler
+from apps.monitor.handlers.clients import HTTPClientPool
+from apps.monitor.lease import DispatchLease
+from apps.monitor.models import MonitorConfig
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class TimeoutHandler(BaseHandler):
+    """
+    every attempt runs into the timeout, a little late as real clients do
+    """
+
+    clock: FakeClock = None
+
+    def check(self) -> None:
+        self.clock.sleep(self.monitor_config.check_timeout + 0.05)
+        self.status = OnlineStatus.TIMEOUT
+
+
+@override_settings(MONITOR_CHECK_RETRY_BACKOFF=0.5, MONITOR_CHECK_RETRY_MAX_BACKOFF=5)
+class BaseHandlerRetryTest(SimpleTestCase):
+    def probe(self, check_timeout: int, check_retry: int) -> TimeoutHandler:
+        clock = FakeClock()
+        config = MonitorConfig(id="config", service_id="service", check_timeout=check_timeout, check_retry=check_retry)
+        handler = TimeoutHandler(monitor_config=config)
+        handler.clock = clock
+        with mock.patch("apps.monitor.handlers.base.time", clock):
+            start_time = clock.now
+            result = handler.probe()
+        self.assertEqual(result.status, OnlineStatus.TIMEOUT)
+        # all attempts fit in the dispatch lease
+        self.assertLessEqual(clock.now - start_time, DispatchLease(config.id, check_timeout, check_retry).timeout)
+        return handler
+
+    def test_every_retry_runs_when_all_attempts_time_out(self):
+        for check_timeout in [1, 10, 30]:
+            for check_retry in [0, 1, 2, 3]:
+                with self.subTest(check_timeout=check_timeout, check_retry=check_retry):
+                    handler = self.probe(check_timeout, check_retry)
+                    self.assertEqual(len(handler.attempts), check_retry + 1)
+
+
+class HTTPClientPoolTest(SimpleTestCase):
+    def test_pooled_client_keeps_no_cookies(self):
+        sent_cookies = []
+
+        def handle(request: httpx.Request) -> httpx.Response:
+            sent_cookies.append(request.headers.get("cookie"))
+            return httpx.Response(200, headers={"set-cookie": "session=secret; Path=/"})
+
+        with httpx.Client(transport=httpx.MockTransport(handle), **HTTPClientPool.client_kwargs(True, False)) as client:
+            client.get("https://example.com/")
+            client.get("https://example.com/")
+        self.assertEqual(sent_cookies, [None, None])
@@ -0,0 +1,51 @@
+import dataclasses
+
+from django.utils import timezone
+
+from apps.monitor.constants import OnlineStatus
+from apps.monitor.models import ServiceLatestStatus, ServiceStatus, ServiceStatusExtra
+from apps.monitor.results import CheckResult, ResultWriter
+from apps.monitor.tests.base import MonitorTestCase
+
+
+class ResultWriterTest(MonitorTestCase):
+    def build_result(self, **kwargs) -> CheckResult:
+        return CheckResult(
+            monitor_config_id=self.config.id,
+            service_id=self.service.id,
+            timestamp=int(timezone.now().timestamp()),
+            **{"status": OnlineStatus.ONLINE, "duration": 12.5, **kwargs},
+        )
+
+    def test_redelivered_result_is_written_once(self):
+        result = self.build_result()
+        self.assertEqual(ResultWriter.write([result]), [result])
+        # a stream redelivers the same result, alone or within a later batch
+        later = self.build_result(status_msg="later")
+        self.assertEqual(ResultWriter.write([dataclasses.replace(result)]), [])
+        self.assertEqual(ResultWriter.write([dataclasses.replace(result), later]), [later])
+        self.assertEqual(ServiceStatus.objects.filter(service_id=self.service.id).count(), 2)
+
+    def test_checks_within_the_same_second_are_kept(self):
+        results = [self.build_result(), self.build_result(status=OnlineStatus.OFFLINE)]
+        self.assertEqual(len(ResultWriter.write(results)), 2)
+        self.assertEqual(ServiceStatus.objects.filter(service_id=self.service.id).count(), 2)
+        self.assertEqual(ServiceLatestStatus.objects.get(service_id=self.service.id).timestamp, results[0].timestamp)
+
+    def test_result_of_deleted_config_is_dropped(self):
+        result = self.build_result()
+        self.config.delete()
+        self.assertEqual(ResultWriter.write([result]), [])
+        self.assertFalse(ServiceStatus.objects.exists())
+        self.assertFalse(ServiceLatestStatus.objects.exists())
+
+    def test_response_header_is_shared_and_kept_whole(self):
+        headers = [
+            {"Content-Type": "text/html", "Server": "nginx", "Date": f"Sun, 18 Oct 2026 11:0{index}:00 GMT"}
+            | ({"Set-Cookie": "session=secret"} if index else {})
+            for index in range(2)
+        ]
+        ResultWriter.write([self.build_result(extra={"http_response_header": header}) for header in headers])
+        extras = list(ServiceStatusExtra.objects.select_related("http_response_header_ref").order_by("status_id"))
+        self.assertEqual(len({extra.http_response_header_ref_id for extra in extras}), 1)
+        self.assertEqual([extra.http_response_header for extra in extras], headers)
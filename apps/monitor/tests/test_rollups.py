@@ -0,0 +1,84 @@
+import datetime
+from unittest import mock
+
+from django.db.models import Sum
+
+from apps.monitor.constants import OnlineStatus, RollupResolution
+from apps.monitor.models import (
+    ServiceStatus,
+    ServiceStatusExtra,
+    ServiceStatusRollup,
+    StatusRollupWatermark,
+)
+from apps.monitor.results import CheckResult, ResultWriter
+from apps.monitor.rollups import StatusRollupCompactor
+from apps.monitor.tests.base import MonitorTestCase
+
+NOW = 1_800_000_000
+
+
+def at(timestamp: int):
+    return mock.patch(
+        "apps.monitor.rollups.timezone.now",
+        return_value=datetime.datetime.fromtimestamp(timestamp, tz=datetime.timezone.utc),
+    )
+
+
+class StatusRollupCompactorTest(MonitorTestCase):
+    def create_point(self, point_id: int, timestamp: int) -> ServiceStatus:
+        return ServiceStatus.objects.create(
+            id=point_id,
+            service_id=self.service.id,
+            timestamp=timestamp,
+            status=OnlineStatus.ONLINE,
+            duration_us=1000,
+        )
+
+    def sample_count(self) -> int:
+        return ServiceStatusRollup.objects.filter(
+            service_id=self.service.id, resolution=RollupResolution.MINUTE
+        ).aggregate(total=Sum("sample_count"))["total"]
+
+    def test_late_commit_below_watermark_is_compacted(self):
+        compactor = StatusRollupCompactor(settle_time=60)
+        self.create_point(10, NOW - 30)
+        # the max id is only observed, a lower id may still be in flight
+        with at(NOW):
+            self.assertEqual(compactor.run(), 0)
+        # id 9 commits after id 10
+        self.create_point(9, NOW - 20)
+        with at(NOW + 30):
+            self.assertEqual(compactor.run(), 0)
+        with at(NOW + 60):
+            self.assertEqual(compactor.run(), 2)
+        self.assertEqual(self.sample_count(), 2)
+        self.assertEqual(StatusRollupWatermark.objects.get(name=compactor.watermark_name).last_id, 10)
+        # nothing is counted twice
+        with at(NOW + 120):
+            self.assertEqual(compactor.run(), 0)
+        self.assertEqual(self.sample_count(), 2)
+
+    def test_delete_points_keeps_extras_of_twin(self):
+        results = [
+            CheckResult(
+                monitor_config_id=self.config.id,
+                service_id=self.service.id,
+                timestamp=NOW,
+                status=OnlineStatus.OFFLINE,
+                extra={"traceback": f"traceback {index}", "attempts": [index]},
+            )
+            for index in range(2)
+        ]
+        ResultWriter.write(results)
+        deleted, kept = ServiceStatus.objects.order_by("id")
+        StatusRollupCompactor.delete_points([(deleted.id, deleted.service_id, deleted.timestamp)])
+        self.assertEqual(list(ServiceStatus.objects.values_list("id", flat=True)), [kept.id])
+        extra = ServiceStatusExtra.objects.get()
+        self.assertEqual(extra.status_id, kept.id)
+        self.assertEqual(extra.data, {"attempts": [1]})
+
+    def test_delete_points_removes_legacy_extras_by_second(self):
+        point = self.create_point(1, NOW)
+        ServiceStatusExtra.objects.create(service_id=self.service.id, timestamp=NOW, data={"attempts": []})
+        StatusRollupCompactor.delete_points([(point.id, point.service_id, point.timestamp)])
+        self.assertFalse(ServiceStatusExtra.objects.exists())
@@ -0,0 +1,59 @@
+from django.test import override_settings
+from django.utils import timezone
+
+from apps.monitor.constants import OnlineStatus, StatusStorageMode
+from apps.monitor.models import ServiceStatus, ServiceStatusRun
+from apps.monitor.results import CheckResult, ResultWriter
+from apps.monitor.rollups import StatusRollupCompactor
+from apps.monitor.runs import ServiceStatusRunQuery
+from apps.monitor.tests.base import MonitorTestCase
+
+
+class ServiceStatusRunTest(MonitorTestCase):
+    def setUp(self):
+        self.config.storage_mode = StatusStorageMode.RUN_LENGTH
+        self.config.save()
+        now = int(timezone.now().timestamp())
+        self.start_time = now - now % 60 - 60 * 60 * 24
+        statuses = [OnlineStatus.ONLINE] * 50 + [OnlineStatus.OFFLINE] * 3 + [OnlineStatus.ONLINE] * 20
+        for index, status in enumerate(statuses):
+            ResultWriter.write(
+                [
+                    CheckResult(
+                        monitor_config_id=self.config.id,
+                        service_id=self.service.id,
+                        timestamp=self.start_time + index * 60,
+                        status=status,
+                        status_msg="down" if status else "",
+                        duration=None if status else 10.0,
+                    )
+                ]
+            )
+        self.end_time = self.start_time + len(statuses) * 60
+        self.points = self.load_raw()
+
+    def load_raw(self) -> list:
+        return list(
+            ServiceStatus.objects.filter(service_id=self.service.id)
+            .order_by("timestamp")
+            .values_list("timestamp", "status")
+        )
+
+    @override_settings(SVC_STATUS_RUN_RAW_RETENTION_HOURS=1)
+    def test_round_trip(self):
+        self.assertEqual(
+            list(ServiceStatusRun.objects.order_by("start_time").values_list("status", "sample_count")),
+            [(OnlineStatus.ONLINE, 50), (OnlineStatus.OFFLINE, 3), (OnlineStatus.ONLINE, 20)],
+        )
+        StatusRollupCompactor(settle_time=0).run()
+        self.assertEqual(StatusRollupCompactor().purge_runs(), len(self.points))
+        self.assertFalse(self.load_raw())
+
+        query = ServiceStatusRunQuery(self.service.id, self.start_time, self.end_time)
+        expand_until = query.load_expand_until()
+        self.assertEqual(expand_until, self.end_time)
+        self.assertEqual([(point.timestamp, point.status) for point in query.load_points(expand_until)], self.points)
+
+    def test_raw_window_is_not_expanded(self):
+        query = ServiceStatusRunQuery(self.service.id, self.start_time, self.end_time)
+        self.assertIsNone(query.load_expand_until())
@@ -0,0 +1,106 @@
+import datetime
+from unittest import mock
+
+import fakeredis
+from django.test import SimpleTestCase
+from django.utils import timezone
+
+from apps.monitor.coordinator import ConfigDeleteFeed
+from apps.monitor.models import MonitorConfig
+from apps.monitor.scheduler import MonitorScheduler
+from apps.monitor.tests.base import MonitorTestCase
+
+
+def build_config(**kwargs) -> dict:
+    config = {
+        "id": "config",
+        "service_id": "service",
+        "service__name": "service",
+        "check_type": "http",
+        "check_interval": 60,
+        "check_timeout": 10,
+        "check_retry": 0,
+        "http_method": "GET",
+        "http_url": "https://example.com",
+        "http_headers": {},
+        "http_follow_redirect": False,
+        "http_check_status_code": 200,
+        "http_warm_connection": False,
+        "http_verify_tls": True,
+        "http_use_http2": False,
+        "adaptive_interval": False,
+        "adaptive_interval_min": None,
+        "adaptive_interval_max": None,
+        "is_enabled": True,
+        "last_check_time": 0,
+        "updated_at": datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc),
+    }
+    config.update(kwargs)
+    assert set(MonitorConfig.snapshot_fields) <= set(config)
+    return config
+
+
+class MonitorSchedulerTest(SimpleTestCase):
+    def setUp(self):
+        self.scheduler = MonitorScheduler()
+
+    def test_upsert_keeps_interval_after_last_check(self):
+        self.scheduler.upsert(build_config(last_check_time=903), 910)
+        entry = self.scheduler.entries["config"]
+        self.assertGreaterEqual(entry.next_run_time, 903 + 60)
+        self.assertEqual(entry.next_run_time, self.scheduler.align(entry, entry.next_run_time))
+
+    def test_new_configs_spread_over_one_interval(self):
+        for index in range(100):
+            self.scheduler.upsert(build_config(id=f"config-{index}"), 1000)
+        run_times = [entry.next_run_time for entry in self.scheduler.entries.values()]
+        self.assertGreaterEqual(min(run_times), 1000)
+        self.assertLess(max(run_times), 1000 + 60)
+        self.assertLess(len(self.scheduler.pop_due(1000 + 5)), 30)
+
+    def test_reschedule_on_time_keeps_phase(self):
+        self.scheduler.upsert(build_config(last_check_time=903), 910)
+        entry = self.scheduler.entries["config"]
+        next_run_time = entry.next_run_time
+        self.scheduler.pop_due(next_run_time + 0.5)
+        self.scheduler.reschedule(entry, next_run_time + 0.5)
+        self.assertEqual(entry.next_run_time, next_run_time + 60)
+
+    def test_reschedule_late_tick_keeps_interval(self):
+        self.scheduler.upsert(build_config(last_check_time=903), 910)
+        entry = self.scheduler.entries["config"]
+        next_run_time = entry.next_run_time
+        for now in [next_run_time + 47, next_run_time + 59.9]:
+            self.scheduler.pop_due(now)
+            self.scheduler.reschedule(entry, now)
+            self.assertGreaterEqual(entry.next_run_time, int(now) + 60)
+            self.assertEqual(entry.next_run_time, self.scheduler.align(entry, entry.next_run_time))
+            next_run_time = entry.next_run_time
+
+    def test_adaptive_interval_kept_on_unrelated_change(self):
+        config = build_config(adaptive_interval=True, adaptive_interval_min=30, adaptive_interval_max=600)
+        self.scheduler.upsert(config, 910)
+        self.scheduler.entries["config"].interval = 240
+        self.scheduler.upsert({**config, "http_url": "https://example.org"}, 920)
+        self.assertEqual(self.scheduler.entries["config"].interval, 240)
+        self.scheduler.upsert({**config, "http_url": "https://example.org", "check_interval": 120}, 930)
+        self.assertEqual(self.scheduler.entries["config"].interval, 120)
+
+
+class MonitorSchedulerSyncTest(MonitorTestCase):
+    def setUp(self):
+        client = fakeredis.FakeRedis()
+        patcher = mock.patch("apps.monitor.coordinator.get_redis_connection", return_value=client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.scheduler = MonitorScheduler(delete_feed=ConfigDeleteFeed(client))
+
+    def test_deleted_config_is_dropped_before_full_sync(self):
+        now = timezone.now().timestamp()
+        self.scheduler.sync(now)
+        self.assertIn(self.config.id, self.scheduler.entries)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.delete()
+        self.scheduler.sync(now + 1)
+        self.assertNotIn(self.config.id, self.scheduler.entries)
+        self.assertEqual(self.scheduler.pop_due(now + 3600), [])
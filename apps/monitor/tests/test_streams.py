@@ -0,0 +1,72 @@
+import json
+
+from asgiref.sync import async_to_sync
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.monitor.constants import OnlineStatus
+from apps.monitor.models import ServiceStatus
+from apps.monitor.results import CheckResult, ResultWriter
+from apps.monitor.tests.base import MonitorTestCase
+
+
+async def read_stream(response) -> bytes:
+    return b"".join([chunk async for chunk in response.streaming_content])
+
+
+@override_settings(SVC_STATUS_STREAM_CHUNK_SIZE=4, SVC_STATUS_STREAM_COMPRESS=False)
+class ColumnarStatusStreamTest(MonitorTestCase):
+    def setUp(self):
+        now = int(timezone.now().timestamp())
+        self.start_time = now - 3600
+        ResultWriter.write(
+            [
+                CheckResult(
+                    monitor_config_id=self.config.id,
+                    service_id=self.service.id,
+                    timestamp=self.start_time + index * 60,
+                    status=OnlineStatus.OFFLINE if index % 3 else OnlineStatus.ONLINE,
+                    status_msg=f"msg {index}",
+                    duration=float(index),
+                )
+                for index in range(10)
+            ]
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_frames_line_up(self):
+        response = self.client.get(
+            f"/service_statuses/{self.service.id}/",
+            {"start_time": self.start_time, "end_time": self.start_time + 3600, "layout": "columnar"},
+        )
+        self.assertEqual(response.status_code, 200)
+        frames = json.loads(async_to_sync(read_stream)(response))["data"]
+        self.assertEqual([len(frame["timestamps"]) for frame in frames], [4, 4, 2])
+        for frame in frames:
+            self.assertEqual({len(values) for values in frame.values()}, {len(frame["timestamps"])})
+        points = list(
+            ServiceStatus.objects.filter(service_id=self.service.id)
+            .order_by("timestamp", "id")
+            .values_list("timestamp", "status", "status_msg_ref__value")
+        )
+        self.assertEqual(
+            [row for frame in frames for row in zip(frame["timestamps"], frame["status"], frame["status_msg"])],
+            points,
+        )
+
+    def test_loaded_points_use_the_same_frames(self):
+        response = self.client.get(
+            f"/service_statuses/{self.service.id}/",
+            {
+                "start_time": self.start_time,
+                "end_time": self.start_time + 3600,
+                "layout": "columnar",
+                "after_timestamp": self.start_time,
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        frames = json.loads(response.content)["data"]
+        self.assertEqual([len(frame["status"]) for frame in frames], [4, 4, 1])
+        self.assertEqual(frames[0]["timestamps"][0], self.start_time + 60)
@@ -1,5 +1,11 @@
+from typing import Dict, List, Union
+
 from channels.db import database_sync_to_async
-from django.db.models import Q
+from django.conf import settings
+from django.db.models import Q, QuerySet
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
 from django.utils.translation import gettext
 from ovinc_client.core.viewsets import (
     CreateMixin,
@@ -12,17 +18,42 @@ from ovinc_client.core.viewsets import (
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
-from apps.monitor.constants import CheckType, HTTPMethod, OnlineStatus
-from apps.monitor.models import MonitorConfig, ServiceStatus
+from apps.monitor.archives import StatusArchiveQuery
+from apps.monitor.constants import (
+    CheckType,
+    HTTPMethod,
+    OnlineStatus,
+    RollupResolution,
+    StatusLayout,
+)
+from apps.monitor.incidents import summarize_incidents
+from apps.monitor.lease import DispatchStats
+from apps.monitor.models import (
+    Incident,
+    MonitorConfig,
+    ServiceStatus,
+    ServiceStatusRun,
+    StatusArchive,
+)
+from apps.monitor.rollups import DAY_SECONDS, ServiceSLAQuery, StatusRollupQuery
+from apps.monitor.runs import ServiceStatusRunQuery
 from apps.monitor.serializers import (
+    BatchServiceStatusSerializer,
     HTTPMonitorConfigSerializer,
+    IncidentListSerializer,
+    ListIncidentSerializer,
     ListServiceStatusSerializer,
     MonitoConfigSearchSerializer,
     MonitorConfigBaseSerializer,
     MonitorConfigInfoSerializer,
     MonitorConfigListSerializer,
+    ServiceSLASerializer,
     ServiceStatusListSerializer,
+    ServiceStatusRollupSerializer,
+    ServiceStatusRunSerializer,
+    ServiceStatusTimingListSerializer,
 )
+from apps.monitor.streams import ColumnarStatusStream, gzip_stream, to_frame
 from apps.service.models import Service
 from apps.service.permissions import PublicServicePermission, SuperuserPermission
 from common.utils import choices_to_list
@@ -135,6 +166,14 @@ class MonitorConfigViewSet(ListMixin, RetrieveMixin, CreateMixin, UpdateMixin, D
             }
         )
 
+    @action(methods=["GET"], detail=False)
+    def dispatch_stats(self, request, *args, **kwargs):
+        """
+        scheduler dispatch counters
+        """
+
+        return Response(data=DispatchStats.load())
+
 
 class ServiceStatusViewSet(RetrieveMixin, MainViewSet):
     """
@@ -157,13 +196,267 @@ class ServiceStatusViewSet(RetrieveMixin, MainViewSet):
         # service inst
         service = await database_sync_to_async(self.get_object)()
 
-        # load data points
-        status_points = ServiceStatus.objects.filter(
-            service=service, timestamp__range=[request_data["start_time"], request_data["end_time"]]
-        ).order_by("timestamp")
-        points_data = await ServiceStatusListSerializer(
+        # bucketed points
+        resolution = await database_sync_to_async(self.choose_resolution)(service, request_data)
+        if resolution:
+            rollups = await database_sync_to_async(
+                StatusRollupQuery(
+                    service_id=service.id,
+                    resolution=resolution,
+                    start_time=request_data["start_time"],
+                    end_time=request_data["end_time"],
+                ).load
+            )()
+            return Response(data=await ServiceStatusRollupSerializer(instance=rollups, many=True).adata)
+
+        # load data points, a cursor narrows the range to points the client has not seen
+        after_timestamp, after_id = request_data.get("after_timestamp"), request_data.get("after_id")
+        start_time = request_data["start_time"]
+        if after_timestamp is not None:
+            start_time = max(start_time, after_timestamp + 1)
+        if request_data["layout"] == StatusLayout.RUNS:
+            run_query = ServiceStatusRunQuery(
+                service_id=service.id, start_time=start_time, end_time=request_data["end_time"]
+            )
+            runs = await database_sync_to_async(run_query.load_runs)()
+            return Response(data=await ServiceStatusRunSerializer(instance=runs, many=True).adata)
+        condition = Q(timestamp__range=[start_time, request_data["end_time"]])
+        if after_id is not None and request_data["start_time"] <= after_timestamp <= request_data["end_time"]:
+            # points committed late within the second of the cursor
+            condition |= Q(timestamp=after_timestamp, id__gt=after_id)
+        status_points = ServiceStatus.objects.filter(condition, service=service).order_by("timestamp", "id")
+        if request.user.is_superuser:
+            status_points = status_points.select_related("status_msg_ref")
+
+        # points moved out of the table are merged in memory
+        cold_points = await database_sync_to_async(self.load_cold_points)(
+            service.id, start_time, request_data["end_time"], with_status_msg=request.user.is_superuser
+        )
+        if cold_points or after_timestamp is not None:
+            hot_points = await database_sync_to_async(list)(status_points)
+            status_points = sorted([*cold_points, *hot_points], key=lambda point: point.timestamp)
+            if request_data["layout"] == StatusLayout.COLUMNAR:
+                return Response(data=self.to_columnar(request, status_points))
+        elif request_data["layout"] == StatusLayout.COLUMNAR:
+            return self.stream_columnar(request, status_points)
+        serializer_class = (
+            ServiceStatusTimingListSerializer if request_data["with_timings"] else ServiceStatusListSerializer
+        )
+        points_data = await serializer_class(
             instance=status_points, many=True, context={"is_superuser": request.user.is_superuser}
         ).adata
 
         # response
+        if after_timestamp is not None:
+            if not status_points:
+                next_cursor, next_cursor_id = after_timestamp, after_id
+            else:
+                next_cursor, next_cursor_id = status_points[-1].timestamp, status_points[-1].id or 0
+            return Response(data={"points": points_data, "next_cursor": next_cursor, "next_cursor_id": next_cursor_id})
         return Response(data=points_data)
+
+    @action(methods=["GET"], detail=True)
+    async def sla(self, request, *args, **kwargs):
+        """
+        uptime and duration percentiles of service windows
+        """
+
+        # validate
+        request_serializer = ServiceSLASerializer(data=request.query_params)
+        request_serializer.is_valid(raise_exception=True)
+        request_data = request_serializer.validated_data
+
+        # service inst
+        service = await database_sync_to_async(self.get_object)()
+
+        # load windows
+        end_time = int(timezone.now().timestamp())
+        data = []
+        for window in sorted(set(request_data["windows"])):
+            data.append(
+                await database_sync_to_async(
+                    ServiceSLAQuery(service_id=service.id, window=window, end_time=end_time).load
+                )()
+            )
+        return Response(data=data)
+
+    @action(methods=["GET"], detail=True)
+    async def incidents(self, request, *args, **kwargs):
+        """
+        incidents overlapping time range with downtime and mttr
+        """
+
+        # validate
+        request_serializer = ListIncidentSerializer(data=request.query_params)
+        request_serializer.is_valid(raise_exception=True)
+        request_data = request_serializer.validated_data
+
+        # service inst
+        service = await database_sync_to_async(self.get_object)()
+
+        # load incidents
+        start_time, end_time = request_data["start_time"], request_data["end_time"]
+        incidents = [
+            incident
+            async for incident in Incident.objects.filter(
+                Q(ended_at__isnull=True) | Q(ended_at__gte=start_time),
+                service=service,
+                started_at__lte=end_time,
+            ).order_by("started_at")
+        ]
+
+        # response
+        return Response(
+            data={
+                **summarize_incidents(incidents, start_time, min(end_time, int(timezone.now().timestamp()))),
+                "incidents": await IncidentListSerializer(instance=incidents, many=True).adata,
+            }
+        )
+
+    @action(methods=["POST"], detail=False)
+    async def batch(self, request, *args, **kwargs):
+        """
+        status points of many services as parallel arrays keyed by service id
+        """
+
+        # validate
+        request_serializer = BatchServiceStatusSerializer(data=request.data)
+        request_serializer.is_valid(raise_exception=True)
+        request_data = request_serializer.validated_data
+
+        # visible services, all of them when no id is given
+        condition = Q()
+        if not request.user.is_superuser:
+            condition &= Q(is_public=True)
+        if request_data.get("service_ids"):
+            condition &= Q(id__in=request_data["service_ids"])
+        services = Service.objects.filter(condition).order_by("id")[: settings.SVC_STATUS_BATCH_MAX_SERVICES]
+
+        # response
+        return Response(
+            data=await self.load_batch_series(
+                services=services,
+                start_time=request_data["start_time"],
+                end_time=request_data["end_time"],
+                with_status_msg=request.user.is_superuser,
+            )
+        )
+
+    @database_sync_to_async
+    def load_batch_series(
+        self, services: QuerySet, start_time: int, end_time: int, with_status_msg: bool
+    ) -> Dict[str, Dict[str, List]]:
+        """
+        load all points in one range query and group them by service
+        """
+
+        columns = {"timestamps": "timestamp", "status": "status", "duration": "duration_ms"}
+        if with_status_msg:
+            columns["status_msg"] = "status_msg_text"
+        series = {service_id: {name: [] for name in columns} for service_id in services.values_list("id", flat=True)}
+        if not series:
+            return series
+        points = (
+            ServiceStatus.objects.filter(service_id__in=series.keys(), timestamp__range=[start_time, end_time])
+            .annotate(duration_ms=ServiceStatus.duration_ms(), status_msg_text=ServiceStatus.status_msg_text())
+            .order_by("service_id", "timestamp")
+            .values_list("service_id", *columns.values())
+        )
+        for service_id, *values in points.iterator(chunk_size=settings.SVC_STATUS_STREAM_CHUNK_SIZE):
+            service_series = series[service_id]
+            for name, value in zip(columns, values):
+                service_series[name].append(value)
+
+        # points moved out of the table are merged for the few services having them
+        cold_service_ids = {
+            *StatusArchive.objects.filter(
+                service_id__in=series.keys(), day__gt=start_time - DAY_SECONDS, day__lte=end_time
+            ).values_list("service_id", flat=True),
+            *ServiceStatusRun.objects.filter(service_id__in=series.keys(), start_time__lte=end_time).values_list(
+                "service_id", flat=True
+            ),
+        }
+        attrs = {"timestamps": "timestamp", "status": "status", "duration": "duration", "status_msg": "status_msg"}
+        for service_id in cold_service_ids:
+            cold_points = self.load_cold_points(service_id, start_time, end_time, with_status_msg)
+            if not cold_points:
+                continue
+            service_series = series[service_id]
+            rows = [
+                *zip(*(service_series[name] for name in columns)),
+                *(tuple(getattr(point, attrs[name]) for name in columns) for point in cold_points),
+            ]
+            rows.sort(key=lambda row: row[0])
+            series[service_id] = {name: [row[index] for row in rows] for index, name in enumerate(columns)}
+        return series
+
+    def stream_columnar(self, request, status_points: QuerySet) -> StreamingHttpResponse:
+        """
+        stream points as parallel arrays, memory stays flat for any range
+        """
+
+        columns = {"timestamps": "timestamp", "status": "status", "duration": "duration_ms"}
+        if request.user.is_superuser:
+            columns["status_msg"] = "status_msg_text"
+        status_points = status_points.annotate(
+            duration_ms=ServiceStatus.duration_ms(), status_msg_text=ServiceStatus.status_msg_text()
+        )
+        stream = ColumnarStatusStream(status_points, columns, trace=getattr(request, "otel_trace_id", None))
+        if settings.SVC_STATUS_STREAM_COMPRESS and "gzip" in request.headers.get("Accept-Encoding", ""):
+            response = StreamingHttpResponse(gzip_stream(stream.__aiter__()), content_type="application/json")
+            response["Content-Encoding"] = "gzip"
+            patch_vary_headers(response, ["Accept-Encoding"])
+            return response
+        return StreamingHttpResponse(stream.__aiter__(), content_type="application/json")
+
+    def load_cold_points(
+        self, service_id: str, start_time: int, end_time: int, with_status_msg: bool
+    ) -> List[ServiceStatus]:
+        """
+        points read back from archives and expanded from runs
+        """
+
+        points = StatusArchiveQuery(service_id=service_id, start_time=start_time, end_time=end_time).load_points(
+            with_status_msg=with_status_msg
+        )
+        run_query = ServiceStatusRunQuery(service_id=service_id, start_time=start_time, end_time=end_time)
+        expand_until = run_query.load_expand_until()
+        if expand_until is not None:
+            points.extend(run_query.load_points(expand_until))
+        return points
+
+    def to_columnar(self, request, status_points: List[ServiceStatus]) -> List[Dict[str, list]]:
+        """
+        loaded points as frames of parallel arrays, same layout as the stream
+        """
+
+        columns = {"timestamps": "timestamp", "status": "status", "duration": "duration"}
+        if request.user.is_superuser:
+            columns["status_msg"] = "status_msg"
+        chunk_size = settings.SVC_STATUS_STREAM_CHUNK_SIZE
+        rows = [tuple(getattr(point, attr) for attr in columns.values()) for point in status_points]
+        return [to_frame(columns, rows[index : index + chunk_size]) for index in range(0, len(rows), chunk_size)]
+
+    def choose_resolution(self, service: Service, request_data: dict) -> Union[int, None]:
+        """
+        finest resolution fitting max points, raw points when they fit
+        """
+
+        if request_data.get("resolution"):
+            return request_data["resolution"]
+        max_points = request_data.get("max_points")
+        if not max_points:
+            return None
+        time_range = request_data["end_time"] - request_data["start_time"]
+        if (
+            time_range <= settings.SVC_STATUS_MAX_TIME_RANGE_DAYS * 60 * 60 * 24
+            and ServiceStatus.objects.filter(
+                service=service, timestamp__range=[request_data["start_time"], request_data["end_time"]]
+            ).count()
+            <= max_points
+        ):
+            return None
+        for resolution in sorted(RollupResolution.values):
+            if time_range // resolution + 1 <= max_points:
+                return resolution
+        return RollupResolution.DAY
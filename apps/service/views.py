@@ -1,7 +1,7 @@
 from typing import Dict
 
 from channels.db import database_sync_to_async
-from django.db.models import Max, Q, QuerySet
+from django.db.models import Q, QuerySet
 from ovinc_client.core.viewsets import (
     CreateMixin,
     DestroyMixin,
@@ -12,7 +12,7 @@ from ovinc_client.core.viewsets import (
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
-from apps.monitor.models import MonitorConfig, ServiceStatus
+from apps.monitor.models import MonitorConfig, ServiceLatestStatus
 from apps.monitor.serializers import MonitorConfigInfoSerializer
 from apps.service.models import Service
 from apps.service.permissions import SuperuserPermission
@@ -71,25 +71,12 @@ class ServiceViewSet(ListMixin, CreateMixin, UpdateMixin, DestroyMixin, MainView
         )
 
     @database_sync_to_async
-    def load_status_records(self, services: QuerySet) -> Dict[str, ServiceStatus]:
+    def load_status_records(self, services: QuerySet) -> Dict[str, ServiceLatestStatus]:
         """
         load service last status
         """
 
-        records = ServiceStatus.objects.filter(
-            id__in=[
-                i["id"]
-                for i in ServiceStatus.objects.filter(service__in=services)
-                .values("service")
-                .annotate(timestamp=Max("timestamp"), id=Max("id"))
-                .order_by()
-            ]
-        )
-        record_map = {}
-        for record in records:
-            if record.service_id not in record_map:
-                record_map[record.service_id] = record
-        return record_map
+        return {record.service_id: record for record in ServiceLatestStatus.objects.filter(service__in=services)}
 
     async def create(self, request, *args, **kwargs):
         """
@@ -1,13 +1,26 @@
 import os
 
-from channels.routing import ProtocolTypeRouter
+from channels.routing import ProtocolTypeRouter, URLRouter
 from django.core.asgi import get_asgi_application
 from opentelemetry.instrumentation.asgi import OpenTelemetryMiddleware
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "entry.settings")
 
+django_asgi_app = get_asgi_application()
+
+# pylint: disable=C0413
+from channels.auth import AuthMiddlewareStack  # noqa: E402
+from channels.security.websocket import OriginValidator  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+from apps.monitor.routing import websocket_urlpatterns  # noqa: E402
+
 application = ProtocolTypeRouter(
     {
-        "http": OpenTelemetryMiddleware(get_asgi_application()),
+        "http": OpenTelemetryMiddleware(django_asgi_app),
+        # browsers connect from the frontend origin, the same origins allowed for http by cors
+        "websocket": OriginValidator(
+            AuthMiddlewareStack(URLRouter(websocket_urlpatterns)), settings.CORS_ORIGIN_WHITELIST
+        ),
     }
 )
@@ -156,6 +156,16 @@ STATIC_URL = "/static/"
 STATIC_ROOT = os.path.join(BASE_DIR, "static")
 STATICFILES_DIRS = [os.path.join(BASE_DIR, "staticfiles")]
 
+# Storage
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    "status_archive": {
+        "BACKEND": os.getenv("SVC_STATUS_ARCHIVE_STORAGE", "django.core.files.storage.FileSystemStorage"),
+        "OPTIONS": {"location": os.getenv("SVC_STATUS_ARCHIVE_DIR", os.path.join(BASE_DIR, "archive"))},
+    },
+}
+
 # Session
 SESSION_COOKIE_NAME = os.getenv("SESSION_COOKIE_NAME", f"{'dev-' if DEBUG else ''}{APP_CODE}-sessionid")
 SESSION_ENGINE = "django.contrib.sessions.backends.cache"
@@ -219,12 +229,52 @@ CAPTCHA_APP_INFO_TIMEOUT = int(os.getenv("CAPTCHA_APP_INFO_TIMEOUT", str(60 * 10
 # Monitor
 MONITOR_CHECK_MIN_SLEEP_TIME = int(os.getenv("MONITOR_CHECK_MIN_SLEEP_TIME", "1"))
 MONITOR_CHECK_MAX_SLEEP_TIME = int(os.getenv("MONITOR_CHECK_MAX_SLEEP_TIME", "60"))
+MONITOR_SCHEDULER_FULL_SYNC_INTERVAL = int(os.getenv("MONITOR_SCHEDULER_FULL_SYNC_INTERVAL", str(60 * 5)))
+MONITOR_SCHEDULER_SHARDS = int(os.getenv("MONITOR_SCHEDULER_SHARDS", "0"))
+MONITOR_SCHEDULER_HEARTBEAT_INTERVAL = int(os.getenv("MONITOR_SCHEDULER_HEARTBEAT_INTERVAL", "5"))
+MONITOR_SCHEDULER_MEMBER_TTL = int(os.getenv("MONITOR_SCHEDULER_MEMBER_TTL", "20"))
+MONITOR_ADAPTIVE_INTERVAL_GROWTH = float(os.getenv("MONITOR_ADAPTIVE_INTERVAL_GROWTH", "1.5"))
+MONITOR_ADAPTIVE_STATUS_LAG = int(os.getenv("MONITOR_ADAPTIVE_STATUS_LAG", "60"))
 MONITOR_CHECK_INTERVAL_MIN = int(os.getenv("MONITOR_CHECK_INTERVAL_MIN", "10"))
 MONITOR_CHECK_INTERVAL_MAX = int(os.getenv("MONITOR_CHECK_INTERVAL_MAX", str(60 * 60)))
 MONITOR_CHECK_TIMEOUT_MIN = int(os.getenv("MONITTOT_CHECK_TIMEOUT_MIN", "1"))
 MONITOR_CHECK_TIMEOUT_MAX = int(os.getenv("MONITTOT_CHECK_TIMEOUT_MAX", "60"))
 MONITOR_CHECK_RETRY_MIN = int(os.getenv("MONITOR_CHECK_RETRY_MIN", "0"))
 MONITOR_CHECK_RETRY_MAX = int(os.getenv("MONITOR_CHECK_RETRY_MAX", "10"))
+MONITOR_CHECK_RETRY_BACKOFF = float(os.getenv("MONITOR_CHECK_RETRY_BACKOFF", "0.5"))
+MONITOR_CHECK_RETRY_MAX_BACKOFF = float(os.getenv("MONITOR_CHECK_RETRY_MAX_BACKOFF", "5"))
+MONITOR_LEASE_EXTRA_TIME = int(os.getenv("MONITOR_LEASE_EXTRA_TIME", "30"))
+MONITOR_LEASE_QUEUE_TIME = int(os.getenv("MONITOR_LEASE_QUEUE_TIME", "300"))
+MONITOR_DISPATCH_BATCH_SIZE = int(os.getenv("MONITOR_DISPATCH_BATCH_SIZE", "50"))
+MONITOR_DISPATCH_MAX_PER_TICK = int(os.getenv("MONITOR_DISPATCH_MAX_PER_TICK", "0"))
+MONITOR_PROBE_CONCURRENCY = int(os.getenv("MONITOR_PROBE_CONCURRENCY", "1000"))
+MONITOR_HTTP_POOL_MAX_CONNECTIONS = int(os.getenv("MONITOR_HTTP_POOL_MAX_CONNECTIONS", "1000"))
+MONITOR_HTTP_POOL_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("MONITOR_HTTP_POOL_MAX_KEEPALIVE_CONNECTIONS", "200"))
+MONITOR_HTTP_POOL_KEEPALIVE_EXPIRY = int(os.getenv("MONITOR_HTTP_POOL_KEEPALIVE_EXPIRY", "60"))
+MONITOR_RESULT_WRITE_BEHIND = strtobool(os.getenv("MONITOR_RESULT_WRITE_BEHIND", "False"))
+MONITOR_RESULT_BATCH_SIZE = int(os.getenv("MONITOR_RESULT_BATCH_SIZE", "500"))
+MONITOR_RESULT_BLOCK_TIME = int(os.getenv("MONITOR_RESULT_BLOCK_TIME", str(5 * 1000)))
+MONITOR_RESULT_CLAIM_IDLE_TIME = int(os.getenv("MONITOR_RESULT_CLAIM_IDLE_TIME", str(60 * 1000)))
+MONITOR_INCIDENT_FAILURE_THRESHOLD = int(os.getenv("MONITOR_INCIDENT_FAILURE_THRESHOLD", "1"))
+MONITOR_INTERN_CACHE_SIZE = int(os.getenv("MONITOR_INTERN_CACHE_SIZE", "10000"))
+MONITOR_STATUS_PUSH_ENABLED = strtobool(os.getenv("MONITOR_STATUS_PUSH_ENABLED", "True"))
+MONITOR_STATUS_PUSH_MAX_SUBSCRIPTIONS = int(os.getenv("MONITOR_STATUS_PUSH_MAX_SUBSCRIPTIONS", "500"))
 
 # Status
 SVC_STATUS_MAX_TIME_RANGE_DAYS = int(os.getenv("SVC_STATUS_MAX_TIME_RANGE_DAYS", "7"))
+SVC_STATUS_MAX_ROLLUP_TIME_RANGE_DAYS = int(os.getenv("SVC_STATUS_MAX_ROLLUP_TIME_RANGE_DAYS", "90"))
+SVC_STATUS_MAX_POINTS = int(os.getenv("SVC_STATUS_MAX_POINTS", "10000"))
+SVC_STATUS_STREAM_CHUNK_SIZE = int(os.getenv("SVC_STATUS_STREAM_CHUNK_SIZE", "2000"))
+SVC_STATUS_STREAM_COMPRESS = strtobool(os.getenv("SVC_STATUS_STREAM_COMPRESS", "True"))
+SVC_STATUS_ROLLUP_CHUNK_SIZE = int(os.getenv("SVC_STATUS_ROLLUP_CHUNK_SIZE", "5000"))
+SVC_STATUS_ROLLUP_SETTLE_TIME = int(os.getenv("SVC_STATUS_ROLLUP_SETTLE_TIME", "60"))
+SVC_STATUS_RAW_RETENTION_DAYS = int(os.getenv("SVC_STATUS_RAW_RETENTION_DAYS", "0"))
+SVC_STATUS_RUN_RAW_RETENTION_HOURS = int(os.getenv("SVC_STATUS_RUN_RAW_RETENTION_HOURS", "24"))
+SVC_STATUS_RUN_MAX_GAP_INTERVALS = int(os.getenv("SVC_STATUS_RUN_MAX_GAP_INTERVALS", "3"))
+SVC_STATUS_PARTITION_PERIOD = int(os.getenv("SVC_STATUS_PARTITION_PERIOD", str(60 * 60 * 24)))
+SVC_STATUS_PARTITION_AHEAD = int(os.getenv("SVC_STATUS_PARTITION_AHEAD", "7"))
+SVC_STATUS_PURGE_CHUNK_SIZE = int(os.getenv("SVC_STATUS_PURGE_CHUNK_SIZE", "1000"))
+SVC_STATUS_SKETCH_RELATIVE_ACCURACY = float(os.getenv("SVC_STATUS_SKETCH_RELATIVE_ACCURACY", "0.01"))
+SVC_STATUS_BATCH_MAX_SERVICES = int(os.getenv("SVC_STATUS_BATCH_MAX_SERVICES", "500"))
+SVC_STATUS_BATCH_MAX_TIME_RANGE_DAYS = int(os.getenv("SVC_STATUS_BATCH_MAX_TIME_RANGE_DAYS", "1"))
+SVC_STATUS_ARCHIVE_AFTER_DAYS = int(os.getenv("SVC_STATUS_ARCHIVE_AFTER_DAYS", "0"))